@@ -0,0 +1,82 @@
+"""Micro-benchmark for decoding Cromwell metadata responses.
+
+The recorded metadata in `fixtures/metadata.json` is scaled up by repeating
+its scattered call so the document resembles a scatter-heavy workflow, then
+decoded the way `CromwellAPI._api_call` used to (`str` then `json.loads`) and
+the way it does now (raw bytes through `jsonutils`). Both the best wall time
+and the peak memory allocated while decoding are reported.
+
+Usage:
+
+    python benchmarks/bench_json.py [--shards N] [--repeat N]
+"""
+
+import argparse
+import copy
+import json
+import os
+import timeit
+import tracemalloc
+
+from typing import Any, Callable
+
+from oliver.lib import jsonutils
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "metadata.json")
+
+
+def build_document(shards: int) -> bytes:
+    with open(FIXTURE, mode="r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    for name, calls in metadata["calls"].items():
+        template = calls[0]
+        scaled = []
+        for i in range(shards):
+            shard = copy.deepcopy(template)
+            shard["shardIndex"] = i
+            scaled.append(shard)
+        metadata["calls"][name] = scaled
+
+    return json.dumps(metadata).encode("utf-8")
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--shards", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = build_document(args.shards)
+    print(f"Document size: {len(body) / 1024 / 1024:.1f} MiB")
+
+    cases = {
+        "str + json.loads (previous)": lambda: json.loads(body.decode("utf-8")),
+        f"jsonutils.loads ({jsonutils.backend()})": lambda: jsonutils.loads(body),
+        "jsonutils.loads_keys (status, labels)": lambda: jsonutils.loads_keys(
+            body, ["status", "labels"]
+        ),
+    }
+
+    baseline = None
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        if baseline is None:
+            baseline = best
+        peak = peak_memory(func) / 1024 / 1024
+        print(
+            f"{name:<40} {best * 1000:>9.1f} ms ({baseline / best:.1f}x) "
+            f"{peak:>8.1f} MiB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Startup benchmark for the oliver command line.
+
+For each command below, a fresh interpreter parses the command line the way
+`oliver` does (without talking to Cromwell) under `python -X importtime`. The
+total import time, the wall time and the slowest top-level imports are
+reported so that a subcommand accidentally pulling in a heavy dependency (like
+boto3 or the Azure SDK) is easy to spot.
+
+Usage:
+
+    python benchmarks/bench_startup.py [--repeat N] [--max-ms MS]
+
+With `--max-ms`, the script exits with a non-zero status if any command takes
+longer than `MS` milliseconds to import everything it needs.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from typing import List, Tuple
+
+COMMANDS = [
+    ["config", "get", "cromwell_server"],
+    ["status"],
+    ["inspect", "00000000-0000-0000-0000-000000000000"],
+    ["aws", "debug", "queue", "-b", "1"],
+    ["azure", "cosmos", "00000000-0000-0000-0000-000000000000"],
+]
+
+SCRIPT = "import sys; from oliver.__main__ import parse_args; parse_args(sys.argv[1:])"
+
+
+def measure(command: List[str]) -> Tuple[float, float, List[Tuple[float, str]]]:
+    """Returns the wall time, total import time and top-level imports (ms)."""
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT, *command],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = (time.perf_counter() - start) * 1000
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented, so only count the top-level ones.
+        if not name.startswith("  "):
+            imports.append((int(cumulative) / 1000, name.strip()))
+
+    return wall, sum(ms for ms, _ in imports), sorted(imports, reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    too_slow = []
+    for command in COMMANDS:
+        wall, total, imports = min(measure(command) for _ in range(args.repeat))
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for ms, name in imports[:3])
+        print(
+            f"oliver {' '.join(command):<50} {total:>7.1f} ms imports "
+            f"{wall:>7.1f} ms wall  ({slowest})"
+        )
+        if args.max_ms is not None and total > args.max_ms:
+            too_slow.append(command)
+
+    if too_slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,22 @@
 #!/usr/bin/env python3
 import asyncio
 import argparse
+import importlib
 import logging
 import sys
 
-from typing import Any, cast, Dict
+from typing import Any, cast, Dict, List, Optional
 import logzero
 
-from oliver.lib import api, args as _args, errors, config as _config
-from oliver.subcommands import (
-    abort,
-    aggregate,
-    aws,
-    azure,
-    batches,
-    configure,
-    config,
-    inputs,
-    inspect,
-    logs,
-    outputs,
-    retry,
-    runtime,
-    status,
-    submit,
+from oliver.lib import (
+    api,
+    args as _args,
+    cache as _cache,
+    errors,
+    config as _config,
+    retry as _retry,
 )
-
-SUBCOMMANDS = {
-    "abort": abort,
-    "aggregate": aggregate,
-    "aws": aws,
-    "azure": azure,
-    "batches": batches,
-    "configure": configure,
-    "config": config,
-    "inputs": inputs,
-    "inspect": inspect,
-    "logs": logs,
-    "outputs": outputs,
-    "retry": retry,
-    "runtime": runtime,
-    "status": status,
-    "submit": submit,
-}
+from oliver import subcommands as _subcommands
 
 
 def ensure_required_args(args: Dict[str, Any]) -> None:
@@ -62,7 +36,41 @@ def ensure_required_args(args: Dict[str, Any]) -> None:
         )
 
 
-async def run() -> None:
+def merge_config(args: Dict[str, Any], config: Dict[str, Any]) -> None:
+    """Adds the values from the config to `args` for each parameter the user has
+    not supplied on the command line.
+
+    Values given on the command line win even if they are falsy, such as
+    `--max-retries 0`. Flags can only be turned on from the command line, so a
+    flag that was not passed (False) takes its value from the config.
+    """
+
+    for k, v in config.items():
+        if args.get(k) is None or args.get(k) is False:
+            args[k] = v
+
+
+def get_subcommand_name(name: Optional[str]) -> Optional[str]:
+    """Resolves a subcommand name or alias to the name of the subcommand."""
+
+    for subcommand, (aliases, _) in _subcommands.SUBCOMMANDS.items():
+        if name == subcommand or name in aliases:
+            return subcommand
+    return None
+
+
+def build_parser(selected: Optional[str] = None) -> argparse.ArgumentParser:
+    """Builds the command line parser.
+
+    Args:
+        selected (str, optional): Name of the subcommand whose module should be
+        imported and fully registered. Every other subcommand is registered as a
+        placeholder that accepts any arguments.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+
     parser = argparse.ArgumentParser(
         description="An opinionated Cromwell orchestration system."
     )
@@ -77,13 +85,39 @@ async def run() -> None:
         action="store_true",
         help="Force running even with missing parameters.",
     )
+    parser.add_argument(
+        "--no-cache",
+        default=False,
+        action="store_true",
+        help="Do not read or write the on-disk workflow metadata cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        default=False,
+        action="store_true",
+        help="Ignore cached workflow metadata and download it again.",
+    )
+    parser.add_argument(
+        "--incremental-json",
+        default=False,
+        action="store_true",
+        help="Decode only the requested fields of large metadata responses (requires `ijson`).",
+    )
+    _args.add_transport_group(parser)
     _args.add_batches_interval_arg(parser)
     _args.add_loglevel_group(parser)
 
     # Subparsers
     subparsers = parser.add_subparsers(dest="subcommand")
 
-    for name, module in SUBCOMMANDS.items():
+    # only the selected subcommand's module is imported; the others are
+    # registered with the name, aliases and help text from `SUBCOMMANDS`.
+    for name in _subcommands.SUBCOMMANDS:
+        if name != selected:
+            _subcommands.add_parser(subparsers, name, add_help=False)
+            continue
+
+        module = importlib.import_module(f"oliver.subcommands.{name}")
         if not hasattr(module, "register_subparser") or not hasattr(module, "call"):
             errors.report(
                 f"Subcommand does not have required methods: {name}!",
@@ -93,19 +127,40 @@ async def run() -> None:
         subparser = cast(Any, module).register_subparser(subparsers)
         _args.add_loglevel_group(subparser)
 
-    args = vars(parser.parse_args())
+    return parser
 
-    for k, v in _config.read_config().items():
-        # if the user has not supplied a parameter on the command line, add the default
-        # value from the config to `args`.
-        if not k in args or not args[k]:
-            args[k] = v
+
+def parse_args(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Parses the command line, importing only the subcommand being run.
+
+    Args:
+        argv (List[str], optional): Arguments to parse. Defaults to `sys.argv`.
+
+    Returns:
+        Dict: Parsed arguments.
+    """
+
+    # the first pass only finds out which subcommand was chosen (and handles
+    # `oliver --help`, which only needs the help text of each subcommand).
+    known, _ = build_parser().parse_known_args(argv)
+    selected = get_subcommand_name(known.subcommand)
+
+    args = vars(build_parser(selected).parse_args(argv))
+    if args.get("subcommand"):
+        args["subcommand"] = selected
+    return args
+
+
+async def run() -> None:
+    args = parse_args()
+
+    merge_config(args, _config.read_config())
 
     if not args.get("force") and args.get("subcommand") not in ["configure", "config"]:
         ensure_required_args(args)
 
     if not args.get("subcommand"):
-        parser.print_help()
+        build_parser().print_help()
         sys.exit(1)
 
     logzero.loglevel(logging.WARN)
@@ -114,8 +169,29 @@ async def run() -> None:
     elif args.get("debug"):
         logzero.loglevel(logging.DEBUG)
 
+    metadata_cache = None
+    if not args.get("no_cache"):
+        metadata_cache = _cache.MetadataCache(
+            location=args.get("metadata_cache_dir"),
+            max_size_mb=args.get("metadata_cache_max_size_mb"),
+        )
+
     cromwell = api.CromwellAPI(
-        server=args["cromwell_server"], version=args["cromwell_api_version"]
+        server=args["cromwell_server"],
+        version=args["cromwell_api_version"],
+        session=api.create_session(
+            limit_per_host=args.get("connection_limit_per_host"),
+            keepalive_timeout=args.get("keepalive_timeout"),
+            dns_cache_ttl=args.get("dns_cache_ttl"),
+            connect_timeout=args.get("connect_timeout"),
+            read_timeout=args.get("read_timeout"),
+            compress_responses=not args.get("no_compression"),
+            unix_socket=args.get("cromwell_socket"),
+        ),
+        retry_policy=_retry.RetryPolicy(max_retries=args.get("max_retries")),
+        metadata_cache=metadata_cache,
+        refresh_cache=args.get("refresh", False),
+        incremental_json=args.get("incremental_json", False),
     )
 
     try:
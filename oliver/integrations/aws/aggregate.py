@@ -1,24 +1,32 @@
+import asyncio
 import os
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+from logzero import logger
 
 from ...lib import (
     api,
     oliver,
     errors,
+    reporting,
+    transfer,
     workflows as _workflows,
 )
 from ...subcommands import outputs as _outputs
 
+METADATA_FIELDS = ["labels"]
+
 
-def process_output(dest_folder: str, output: str) -> None:
-    cmd = None
+def get_transfers(dest_folder: str, output: Any) -> List[Tuple[str, str]]:
+    """Returns the source and destination of each S3 file in a workflow output
+    (which may be a single file or a list of files)."""
 
     if isinstance(output, list):
-        for o in output:
-            process_output(dest_folder, o)
+        return [t for o in output for t in get_transfers(dest_folder, o)]
 
-        return
+    if not output or not isinstance(output, str):
+        return []
 
     if not output.startswith("s3://"):
         errors.report(
@@ -26,11 +34,17 @@ def process_output(dest_folder: str, output: str) -> None:
             fatal=False,
             exitcode=errors.ERROR_INVALID_INPUT,
         )
+        return []
+
+    return [(output, dest_folder + os.path.basename(output))]
 
-    cmd = f"aws s3 cp --sse AES256 {output} {dest_folder}"
-    print(cmd)
 
+def print_command(source: str, destination: str) -> None:
+    # the commands are written to stdout so that they can be piped to a shell.
+    print(f"aws s3 cp --sse AES256 {source} {destination}")
 
+
+# pylint: disable=too-many-branches,too-many-locals
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
     """Execute the subcommand.
 
@@ -40,6 +54,7 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
 
     output_folder = args.get("root-output-folder", "")
     workflows = []
+    transfers = []
 
     if args.get("workflow"):
         workflows = await _workflows.get_workflows(
@@ -78,7 +93,9 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
 
         if args.get("append_job_name"):
             name = oliver.get_oliver_name(
-                await cromwell.get_workflows_metadata(workflow.get("id", ""))
+                await cromwell.get_workflows_metadata(
+                    workflow.get("id", ""), fields=METADATA_FIELDS
+                )
             )
             if not name or name == "<not set>":
                 name = "__UNKNOWN__"
@@ -88,4 +105,75 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
             _this_output_folder = _this_output_folder + os.path.sep
 
         for output in outputs:
-            process_output(_this_output_folder, output["Location"])
+            transfers.extend(get_transfers(_this_output_folder, output["Location"]))
+
+    # the same file can be reported by more than one output.
+    transfers = list(dict.fromkeys(transfers))
+
+    # printing the commands has no side effects: unless asked to resume, S3
+    # isn't consulted and the manifest is neither read nor written.
+    if not args.get("execute") and not args.get("resume"):
+        duplicates = transfer.duplicate_destinations(transfers)
+        for source, destination in transfers:
+            if destination in duplicates:
+                logger.error(
+                    "Not copying %s: %d files would be copied to %s",
+                    source,
+                    len(duplicates[destination]),
+                    destination,
+                )
+                continue
+            print_command(source, destination)
+        return
+
+    # pylint: disable=import-outside-toplevel
+    # boto3 is slow to import and isn't needed to print commands.
+    import boto3
+    from . import s3
+
+    client = boto3.client("s3")
+    # when only printing commands, entries are kept in memory rather than
+    # journaled to the manifest.
+    manifest = s3.load_manifest(
+        client, output_folder, journal=bool(args.get("execute"))
+    )
+    results = await asyncio.to_thread(
+        s3.plan_transfers,
+        client,
+        transfers,
+        manifest,
+        max_workers=args.get("max_workers"),
+    )
+
+    if not args.get("execute"):
+        for result in results:
+            if result["status"] == "pending":
+                print_command(result["source"], result["destination"])
+        summary = transfer.summarize(results)
+        logger.info(
+            "%d files to copy, %d already copied, %d failed.",
+            summary.get("Pending", 0),
+            summary["Skipped"],
+            summary["Failed"],
+        )
+        return
+
+    max_bandwidth = args.get("max_bandwidth")
+    await asyncio.to_thread(
+        s3.execute_transfers,
+        client,
+        results,
+        manifest,
+        max_concurrency=args.get("max_workers"),
+        max_bandwidth=int(max_bandwidth * 1024 * 1024) if max_bandwidth else None,
+    )
+    s3.save_manifest(client, output_folder, manifest)
+
+    summary = transfer.summarize(results)
+    reporting.print_dicts_as_table([summary], grid_style=args.get("grid_style"))
+    if summary["Failed"]:
+        errors.report(
+            f"Could not copy {summary['Failed']} files.",
+            fatal=True,
+            exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
+        )
@@ -1,10 +1,23 @@
 """Remove outputs for all failed or aborted workflows.
 """
 
-from typing import Any, Dict, Mapping
+import asyncio
+
+from typing import Any, Dict, List, Mapping
 from logzero import logger
 
-from ...lib import api, errors, workflows as _workflows
+from ...lib import api, errors, reporting, utils, workflows as _workflows
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals the rows returned by `s3.delete_prefixes`."""
+
+    return {
+        "Workflows": len(results),
+        "Objects": sum(r["Objects"] for r in results),
+        "Size": reporting.size_to_text(sum(r["Bytes"] for r in results)),
+        "Failed": sum(1 for r in results if r.get("Errors")),
+    }
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -43,8 +56,55 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
 
     workflows = await _workflows.get_workflows(cromwell, **kwargs)
 
-    for workflow in workflows:
-        cmd = f"aws s3 rm --recursive {workflow_root_folder}/{workflow.get('id')}/"
-        print(cmd)
-
     logger.info("Found %d workflows.", len(workflows))
+    prefixes = [f"{workflow_root_folder}/{w.get('id')}/" for w in workflows]
+
+    if not args.get("execute") and not args.get("dry_run"):
+        for prefix in prefixes:
+            print(f"aws s3 rm --recursive {prefix}")
+        return
+
+    # pylint: disable=import-outside-toplevel
+    # boto3 is slow to import and isn't needed to print commands.
+    import boto3
+    from . import s3
+
+    client = boto3.client("s3")
+    dry_run = args.get("dry_run", False)
+
+    if not dry_run and not args.get("yes"):
+        # show what would be deleted before anything is.
+        results = await asyncio.to_thread(
+            s3.delete_prefixes,
+            client,
+            prefixes,
+            dry_run=True,
+            max_workers=args.get("max_workers"),
+        )
+        summary = summarize(results)
+        reporting.print_dicts_as_table([summary], grid_style=args.get("grid_style"))
+        if not utils.ask_boolean_question(
+            f"Wishing to delete {summary['Objects']} objects ({summary['Size']}) "
+            f"for {len(prefixes)} workflows. Continue?"
+        ) in ["yes", "y"]:
+            errors.report("User cancelled deletion.", fatal=True, exitcode=0)
+
+    results = await asyncio.to_thread(
+        s3.delete_prefixes,
+        client,
+        prefixes,
+        dry_run=dry_run,
+        max_workers=args.get("max_workers"),
+    )
+
+    summary = summarize(results)
+    if dry_run:
+        logger.info("Dry run: nothing was deleted.")
+    reporting.print_dicts_as_table([summary], grid_style=args.get("grid_style"))
+
+    if summary["Failed"]:
+        errors.report(
+            f"Could not delete every object for {summary['Failed']} workflows.",
+            fatal=True,
+            exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
+        )
@@ -1,115 +1,308 @@
+import asyncio
+import bisect
+import concurrent.futures
+import logging
 import os
+import re
+import time
 
-from typing import Any, cast, Dict, List, Optional, Tuple, Union
-from functools import lru_cache
+from typing import Any, cast, Dict, Iterable, List, Optional, Tuple, Union
 from logzero import logger
 
 import pendulum
 import boto3
 from mypy_boto3_batch import BatchClient
-from mypy_boto3_batch.type_defs import DescribeJobsResponseTypeDef
+from mypy_boto3_batch.type_defs import JobDetailTypeDef, KeyValuesPairTypeDef
 from mypy_boto3_logs import CloudWatchLogsClient
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from ...lib import (
+    api,
+    concurrency,
+    errors,
+    reporting,
+    retry,
+    workflows as _workflows,
+)
+
+METADATA_FIELDS = [
+    "calls.executionStatus",
+    "calls.jobId",
+    "calls.start",
+    "calls.end",
+]
+
+
+# maximum number of job ids accepted by a single DescribeJobs request.
+DESCRIBE_JOBS_BATCH_SIZE = 100
+
+LOG_GROUP_NAME = "/aws/batch/job"
+
+# maximum number of events returned by a single GetLogEvents request.
+MAX_LOG_EVENTS_PER_REQUEST = 10000
+
+# error codes returned by CloudWatch when too many requests are made at once.
+THROTTLING_ERROR_CODES = ["ThrottlingException", "TooManyRequestsException"]
+
+# AWS clients back off and retry when throttled, slowing down for the rest of
+# the run rather than failing requests made by many threads at once.
+CLIENT_CONFIG = Config(retries={"mode": "adaptive", "max_attempts": 10})
+
+# how far apart (in seconds) a failed call's start and the creation of its AWS
+# batch job can be and still be matched.
+DEFAULT_MATCH_TOLERANCE = 300
+
+
+class BatchJobDescriptions:
+    """Cache of AWS Batch job descriptions for a single run, keyed by job id.
+
+    Jobs are described up front with `fetch`, which sends the ids that aren't
+    cached yet in chunks of `DESCRIBE_JOBS_BATCH_SIZE` on a pool of threads. A
+    chunk that fails (even after the client's retries) is logged and its jobs
+    are left undescribed.
+    """
+
+    def __init__(self, batch_client: BatchClient, max_workers: Optional[int] = None):
+        self.batch_client = batch_client
+        self.max_workers = max_workers or concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS
+        self.jobs: Dict[str, JobDetailTypeDef] = {}
+
+    def _describe(self, job_ids: List[str]) -> List[JobDetailTypeDef]:
+        try:
+            return self.batch_client.describe_jobs(jobs=job_ids).get("jobs", [])
+        except ClientError as e:
+            # the jobs in other chunks can still be matched.
+            logger.error("Could not describe %d AWS batch jobs: %s", len(job_ids), e)
+            return []
+
+    def fetch(self, job_ids: Iterable[str]) -> None:
+        """Describes every job in `job_ids` that isn't already cached."""
+
+        missing = [i for i in dict.fromkeys(job_ids) if i and i not in self.jobs]
+        chunks = [
+            missing[i : i + DESCRIBE_JOBS_BATCH_SIZE]
+            for i in range(0, len(missing), DESCRIBE_JOBS_BATCH_SIZE)
+        ]
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as pool:
+            for jobs in pool.map(self._describe, chunks):
+                for job in jobs:
+                    self.jobs[job["jobId"]] = job
 
-from ...lib import api, errors, reporting, workflows as _workflows
+        logger.debug(
+            "Described %d AWS batch jobs in %d requests.", len(missing), len(chunks)
+        )
 
+    def get(self, job_id: str) -> Optional[JobDetailTypeDef]:
+        return self.jobs.get(job_id)
 
-@lru_cache(maxsize=4096)
-def describe_batch_job(
-    batch_client: BatchClient, job_id: str
-) -> DescribeJobsResponseTypeDef:
-    return batch_client.describe_jobs(jobs=[job_id])
 
+def normalize_name(name: str) -> List[str]:
+    """Splits a call or job name into the lowercase words it is made of."""
 
-# pylint: disable=too-many-locals
-def get_aws_batch_jobs(
-    args: Dict[str, Any],
+    return [w for w in re.split(r"[^a-z0-9]+", name.lower()) if w]
+
+
+def get_call_identifier(call_name: str) -> str:
+    """Returns the part of a call's name that shows up in the names of its
+    AWS batch jobs."""
+
+    return call_name.split("_")[0] if "_" in call_name else call_name
+
+
+class BatchJobIndex:
+    """Index for matching failed calls with the AWS batch jobs that ran them.
+
+    Jobs are bucketed by each word of their name, and every bucket is sorted
+    by creation time, so that finding the jobs created around the start of a
+    call is a binary search rather than a scan over every job.
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], tolerance: Optional[int] = None):
+        self.tolerance = DEFAULT_MATCH_TOLERANCE if tolerance is None else tolerance
+        buckets: Dict[str, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            for word in set(normalize_name(job.get("name", ""))):
+                buckets.setdefault(word, []).append(job)
+        # jobs from every bucket, used when a call's name doesn't match a
+        # whole word of any job's name.
+        buckets[""] = list(jobs)
+
+        self.buckets = {}
+        self.created = {}
+        for word, bucket in buckets.items():
+            bucket.sort(key=lambda j: j.get("created") or 0)
+            self.buckets[word] = bucket
+            self.created[word] = [j.get("created") or 0 for j in bucket]
+
+    def candidates(self, call_name: str, start: float) -> List[Dict[str, Any]]:
+        """Returns the jobs created within the tolerance of `start` whose name
+        contains the call's identifier."""
+
+        identifier = get_call_identifier(call_name)
+        words = normalize_name(identifier)
+        word = words[0] if len(words) == 1 and words[0] in self.buckets else ""
+
+        lo = bisect.bisect_left(self.created[word], start - self.tolerance)
+        hi = bisect.bisect_right(self.created[word], start + self.tolerance)
+        return [j for j in self.buckets[word][lo:hi] if identifier in j.get("name", "")]
+
+    def match(self, call_name: str, start: float) -> Optional[Dict[str, Any]]:
+        """Returns the job most likely to have run a call, if any.
+
+        Jobs whose name contains the call's full name are preferred, then jobs
+        created after (rather than before) the call started, then the job
+        created closest to the start of the call.
+        """
+
+        def score(job: Dict[str, Any]) -> Tuple[bool, bool, float]:
+            created = job.get("created") or 0
+            return (
+                call_name not in job.get("name", ""),
+                created < start,
+                abs(created - start),
+            )
+
+        candidates = self.candidates(call_name, start)
+        return min(candidates, key=score) if candidates else None
+
+
+def with_readable_dates(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a copy of a job or call with human readable versions of its
+    `created`, `start` and `end` timestamps.
+
+    Localizing dates is slow, so this is only done for the jobs and calls that
+    are actually written out.
+    """
+
+    result = dict(item)
+    for key in ["created", "start", "end"]:
+        if item.get(key):
+            result[key + "Readable"] = reporting.localize_date_from_timestamp(
+                cast(int, item[key])
+            )
+    return result
+
+
+def get_job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    created = job.get("createdAt")
+    start = job.get("startedAt")
+    end = job.get("stoppedAt")
+
+    return {
+        "name": job.get("jobName", ""),
+        "id": job.get("jobId", ""),
+        "reason": job.get("statusReason", ""),
+        "containerExitCode": job.get("container", {}).get("exitCode", ""),
+        "created": round(created / 1000) if created else None,
+        "start": round(start / 1000) if start else None,
+        "end": round(end / 1000) if end else None,
+    }
+
+
+def list_batch_jobs(
     batch_client: BatchClient,
+    queue: str,
     start_time_filter: Union[int, float],
     end_time_filter: Union[int, float],
+    job_name: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
+    """Lists the jobs in an AWS batch queue created between the given times.
+
+    AWS only accepts a single filter per request, so jobs are filtered by
+    name when `job_name` is given and by creation time otherwise. Either way,
+    filtered results come back newest first, so listing stops as soon as a job
+    created before `start_time_filter` is seen.
+
+    Args:
+        batch_client (BatchClient): boto3 AWS Batch client.
+        queue (str): Name or ARN of the job queue.
+        start_time_filter (Union[int, float]): Earliest creation time (UNIX
+        seconds) of the jobs to list.
+        end_time_filter (Union[int, float]): Latest creation time (UNIX
+        seconds) of the jobs to list.
+        job_name (str, optional): Only list jobs with this name (or, ending in
+        `*`, starting with this prefix).
+
+    Returns:
+        List[Dict]: Summary of each job, including its `status`.
+    """
+
+    job_filter: KeyValuesPairTypeDef
+    if job_name:
+        job_filter = {"name": "JOB_NAME", "values": [job_name]}
+    else:
+        job_filter = {
+            "name": "BEFORE_CREATED_AT",
+            "values": [str(int(end_time_filter * 1000))],
+        }
+
+    jobs: List[Dict[str, Any]] = []
     paginator = batch_client.get_paginator("list_jobs")
-    results = []
+    for item in paginator.paginate(jobQueue=queue, filters=[job_filter]):
+        for job in item.get("jobSummaryList", []):
+            created = job.get("createdAt", 0) / 1000
+            if created < start_time_filter:
+                return jobs
+            if created <= end_time_filter:
+                jobs.append({**get_job_summary(job), "status": job.get("status")})
 
-    for status in args.get("status", []):
-        for item in paginator.paginate(
-            jobQueue=args.get("queue", ""), jobStatus=status
-        ):
-            resp = item.get("jobSummaryList", [])
-            if not resp:
-                errors.report(
-                    "Could not parse AWS API response for listing batch jobs!",
-                    fatal=True,
-                    exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
-                )
+    return jobs
 
-            for job in resp:
-                created = job.get("createdAt")
-                start = job.get("startedAt")
-                end = job.get("stoppedAt")
-
-                new_job = {
-                    "name": job.get("jobName", ""),
-                    "id": job.get("jobId", ""),
-                    "reason": job.get("statusReason", ""),
-                    "containerExitCode": job.get("container", {}).get("exitCode", ""),
-                    "created": round(created / 1000) if created else None,
-                    "start": round(start / 1000) if start else None,
-                    "end": round(end / 1000) if end else None,
-                }
 
-                new_job["createdReadable"] = (
-                    reporting.localize_date_from_timestamp(
-                        cast(int, new_job["created"])
-                    )
-                    if created and new_job.get("created") is not None
-                    else None
-                )
-                new_job["startReadable"] = (
-                    reporting.localize_date_from_timestamp(cast(int, new_job["start"]))
-                    if start and new_job.get("start") is not None
-                    else None
-                )
-                new_job["endReadable"] = (
-                    reporting.localize_date_from_timestamp(cast(int, new_job["end"]))
-                    if end and new_job.get("end") is not None
-                    else None
-                )
+def get_aws_batch_jobs(
+    args: Dict[str, Any],
+    batch_client: BatchClient,
+    start_time_filter: Union[int, float],
+    end_time_filter: Union[int, float],
+) -> List[Dict[str, Any]]:
+    queues = args.get("queue", [])
+    if isinstance(queues, str):
+        queues = [queues]
+    statuses = args.get("status", [])
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=args.get("max_concurrent_requests")
+        or concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS
+    ) as pool:
+        listed = pool.map(
+            lambda queue: list_batch_jobs(
+                batch_client,
+                queue,
+                start_time_filter,
+                end_time_filter,
+                job_name=args.get("job_name"),
+            ),
+            queues,
+        )
+        jobs = [job for queue_jobs in listed for job in queue_jobs]
 
-                this_jobs_start_time = cast(
-                    int,
-                    (
-                        new_job["start"]
-                        if new_job.get("start")
-                        else new_job.get("created")
-                    ),
-                )
-                this_jobs_end_time = cast(
-                    int, (new_job["end"] if new_job.get("end") else pendulum.now())
-                )
+    results = []
+    for job in jobs:
+        status = job.pop("status", None)
+        if status not in statuses:
+            continue
+
+        # Successful jobs can exit container. We don't care about successful jobs
+        # that don't fall into this category.
+        if status == "SUCCEEDED" and "task exited" not in cast(
+            str, job.get("reason", "")
+        ):
+            continue
 
-                # Successful jobs can exit container. We don't care about successful jobs
-                # that don't fall into this category.
-                if status == "SUCCEEDED" and "task exited" not in cast(
-                    str, new_job.get("reason", "")
-                ):
-                    continue
-
-                if start_time_filter > this_jobs_start_time:
-                    logger.debug(
-                        "Job disqualified because %s > %s.",
-                        reporting.localize_date_from_timestamp(start_time_filter),
-                        reporting.localize_date_from_timestamp(this_jobs_start_time),
-                    )
-                elif end_time_filter < this_jobs_end_time:
-                    logger.debug(
-                        "Job disqualified because %s < %s.",
-                        reporting.localize_date_from_timestamp(end_time_filter),
-                        reporting.localize_date_from_timestamp(this_jobs_end_time),
-                    )
-                else:
-                    results.append(new_job)
-
-    return list(sorted(results, key=lambda x: x["start"] if x.get("start") else 0))  # type: ignore
+        this_jobs_start_time = job["start"] if job.get("start") else job.get("created")
+        this_jobs_end_time = job["end"] if job.get("end") else time.time()
+        if start_time_filter > cast(int, this_jobs_start_time):
+            logger.debug("Job %s disqualified: started too early.", job["id"])
+        elif end_time_filter < this_jobs_end_time:
+            logger.debug("Job %s disqualified: ended too late.", job["id"])
+        else:
+            results.append(job)
+
+    return list(sorted(results, key=lambda x: x["start"] if x.get("start") else 0))
 
 
 # pylint: disable=too-many-branches
@@ -143,9 +336,12 @@ async def get_calls_and_times_for_workflows(
 
     start_time_to_filter_by = None
     end_time_to_filter_by = None
-    metadatas = {
-        w["id"]: await cromwell.get_workflows_metadata(w["id"]) for w in workflows
-    }
+    metadatas = await _workflows.get_metadatas(
+        cromwell,
+        [w["id"] for w in workflows],
+        max_concurrent_requests=args.get("max_concurrent_requests"),
+        fields=METADATA_FIELDS,
+    )
 
     failed_calls = []
 
@@ -159,24 +355,15 @@ async def get_calls_and_times_for_workflows(
                 for cur_file in cur_call
                 if cur_file.get("executionStatus") == "Failed"
             ]:
-                failed_call = {
-                    "id": cur_file.get("jobId"),
-                    "name": call_name.split(".")[-1],
-                    "start": pendulum.parse(cur_file.get("start")).timestamp(),
-                    "end": pendulum.parse(cur_file.get("end")).timestamp(),
-                    "workflow_id": w.get("id"),
-                }
-                if failed_call.get("start") is not None:
-                    failed_call[
-                        "startReadable"
-                    ] = reporting.localize_date_from_timestamp(
-                        cast(int, failed_call.get("start"))
-                    )
-                if failed_call.get("end") is not None:
-                    failed_call["endReadable"] = reporting.localize_date_from_timestamp(
-                        cast(int, failed_call.get("end"))
-                    )
-                failed_calls.append(failed_call)
+                failed_calls.append(
+                    {
+                        "id": cur_file.get("jobId"),
+                        "name": call_name.split(".")[-1],
+                        "start": pendulum.parse(cur_file.get("start")).timestamp(),
+                        "end": pendulum.parse(cur_file.get("end")).timestamp(),
+                        "workflow_id": w.get("id"),
+                    }
+                )
 
         # (2) compute earliest start time and latest end time to know what time ranges
         #     to query AWS batch for.
@@ -218,89 +405,206 @@ async def get_calls_and_times_for_workflows(
     )
 
 
+def get_log_events(
+    logs_client: CloudWatchLogsClient,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Calls GetLogEvents, backing off while CloudWatch is throttling us."""
+
+    policy = retry.RetryPolicy()
+    attempt = 0
+    while True:
+        try:
+            return cast(Dict[str, Any], logs_client.get_log_events(**kwargs))
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code not in THROTTLING_ERROR_CODES or attempt >= policy.max_retries:
+                raise
+            time.sleep(policy.delay(attempt))
+            attempt += 1
+
+
+def write_log_stream(
+    logs_client: CloudWatchLogsClient,
+    logstream: str,
+    path: str,
+    tail: Optional[int] = None,
+) -> bool:
+    """Writes the events from a CloudWatch log stream to a file.
+
+    Events are written page by page as they are received. The `-proxy`
+    stream is tried when `logstream` can't be read.
+
+    Args:
+        logs_client (CloudWatchLogsClient): boto3 CloudWatch Logs client.
+        logstream (str): Name of the log stream in `LOG_GROUP_NAME`.
+        path (str): File to write the events to.
+        tail (int, optional): Only write the last `tail` events (at most
+        `MAX_LOG_EVENTS_PER_REQUEST`). Defaults to every event.
+
+    Returns:
+        bool: Whether the logs could be retrieved.
+    """
+
+    with open(path, mode="w", encoding="utf-8") as cur_file:
+        for logstream_name in [logstream, logstream + "-proxy"]:
+            kwargs: Dict[str, Any] = {
+                "logGroupName": LOG_GROUP_NAME,
+                "logStreamName": logstream_name,
+                "startFromHead": not tail,
+            }
+            if tail:
+                kwargs["limit"] = min(tail, MAX_LOG_EVENTS_PER_REQUEST)
+
+            try:
+                while True:
+                    logs = get_log_events(logs_client, **kwargs)
+                    for event in logs.get("events", []):
+                        cur_file.write(event.get("message", "") + "\n")
+
+                    # the same token is returned once the end of the stream
+                    # is reached.
+                    token = logs.get("nextForwardToken")
+                    if tail or not token or token == kwargs.get("nextToken"):
+                        return True
+                    kwargs["nextToken"] = token
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                logger.debug("Could not read log stream %s: %s", logstream_name, e)
+                cur_file.seek(0)
+                cur_file.truncate()
+            # pylint: enable=broad-exception-caught
+
+        cur_file.write("Could not retrive logs!\n")
+    return False
+
+
+# pylint: disable=too-many-arguments,too-many-locals
 def write_log(
-    batch_client: BatchClient,
+    job_descriptions: BatchJobDescriptions,
     logs_client: CloudWatchLogsClient,
     cur_call: Dict[str, Any],
     output_directory: str,
     candidate_batch_jobs: Optional[List[Dict[str, Any]]] = None,
-) -> None:
+    tail: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Writes the summaries and CloudWatch logs for a failed call and its AWS
+    batch jobs.
+
+    Returns:
+        Dict: Row for the final report, with the `Status` of the call and a
+        `Message` if anything couldn't be written.
+    """
+
     if candidate_batch_jobs is None:
         candidate_batch_jobs = []
 
     workflow_id = cur_call.get("workflow_id", "")
     call_name = cur_call.get("name", "")
+    result: Dict[str, Any] = {
+        "Workflow ID": workflow_id,
+        "Call Name": call_name,
+        "Batch Job": ", ".join(j.get("id", "") for j in candidate_batch_jobs),
+        "Status": "Succeeded",
+    }
+    problems = []
 
     calldir = os.path.join(output_directory, workflow_id, call_name)
-    if not os.path.isdir(calldir):
-        os.makedirs(calldir)
+    os.makedirs(calldir, exist_ok=True)
 
     # summary
     with open(
         os.path.join(calldir, "summary.txt"), mode="w", encoding="utf-8"
     ) as cur_file:
         cur_file.write("== Cromwell ==\n\n")
-        for k, v in cur_call.items():
+        for k, v in with_readable_dates(cur_call).items():
             cur_file.write(f"{k.capitalize()}: {v}\n")
 
     for batch_job in candidate_batch_jobs:
-        logger.info("Writing info for %s.", batch_job.get("id"))
+        logger.debug("Writing info for %s.", batch_job.get("id"))
         batchdir = os.path.join(calldir, "batch-job-" + batch_job.get("id", ""))
-        if not os.path.isdir(batchdir):
-            os.makedirs(batchdir)
+        os.makedirs(batchdir, exist_ok=True)
 
         # summary
         with open(
             os.path.join(batchdir, "summary.txt"), mode="w", encoding="utf-8"
         ) as cur_file:
             cur_file.write("== AWS batch ==\n\n")
-            for k, v in batch_job.items():
+            for k, v in with_readable_dates(batch_job).items():
                 cur_file.write(f"{k.capitalize()}: {v}\n")
 
         # logs
-        resp = describe_batch_job(batch_client, batch_job.get("id"))
-        jobs = resp.get("jobs", [])
-        if not jobs:
-            errors.report(
-                "Could not parse AWS API response for describing a batch job!",
-                fatal=True,
-                exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
-            )
-        assert len(jobs) == 1
-        logstream = jobs[0].get("container", {}).get("logStreamName", "")
+        job = job_descriptions.get(batch_job.get("id", ""))
+        if not job:
+            problems.append(f"Could not describe batch job {batch_job.get('id')}.")
+            continue
+
+        logstream = job.get("container", {}).get("logStreamName", "")
+        if not write_log_stream(
+            logs_client,
+            logstream,
+            os.path.join(batchdir, "cloudwatch-logs.txt"),
+            tail=tail,
+        ):
+            problems.append(f"Could not retrieve logstream {logstream}.")
 
-        with open(
-            os.path.join(batchdir, "cloudwatch-logs.txt"), mode="w", encoding="utf-8"
-        ) as cur_file:
-            success = False
+    if problems:
+        result["Status"] = "Failed"
+        result["Message"] = " ".join(problems)
+    return result
 
-            for logstream_name in [logstream, logstream + "-proxy"]:
-                if success:
-                    break
 
-                try:
-                    logs = logs_client.get_log_events(
-                        logGroupName="/aws/batch/job", logStreamName=logstream_name
-                    )
-                    for event in logs.get("events", []):
-                        cur_file.write(event.get("message", "") + "\n")
-                    success = True
-                # pylint: disable=broad-exception-caught
-                except Exception:
-                    pass
-                # pylint: enable=broad-exception-caught
-
-            if not success:
-                cur_file.write("Could not retrive logs!\n")
-                errors.report(
-                    message=f"Could not find logstream reporting by describe-jobs: {logstream}! Skipping.",
-                    fatal=False,
-                )
+# pylint: disable=too-many-arguments
+def write_logs(
+    job_descriptions: BatchJobDescriptions,
+    logs_client: CloudWatchLogsClient,
+    candidates: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    output_directory: str,
+    tail: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Runs `write_log` for many calls on a pool of threads, so that one slow
+    or broken log stream doesn't hold up the rest.
+
+    Returns:
+        List[Dict]: Report row for each call, in the same order as
+        `candidates`.
+    """
 
+    progress = concurrency.Progress(len(candidates), description="calls")
 
+    def write(candidate: Tuple[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        cur_call, candidate_batch_jobs = candidate
+        try:
+            return write_log(
+                job_descriptions,
+                logs_client,
+                cur_call,
+                output_directory,
+                candidate_batch_jobs=candidate_batch_jobs,
+                tail=tail,
+            )
+        except OSError as e:
+            return {
+                "Workflow ID": cur_call.get("workflow_id", ""),
+                "Call Name": cur_call.get("name", ""),
+                "Status": "Failed",
+                "Message": str(e),
+            }
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers or concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS
+    ) as pool:
+        futures = [pool.submit(write, candidate) for candidate in candidates]
+        for _ in concurrent.futures.as_completed(futures):
+            progress.update()
+        return [f.result() for f in futures]
+
+
+# pylint: disable=too-many-locals
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
-    batch_client: BatchClient = boto3.client("batch")
-    logs_client: CloudWatchLogsClient = boto3.client("logs")
+    batch_client: BatchClient = boto3.client("batch", config=CLIENT_CONFIG)
+    logs_client: CloudWatchLogsClient = boto3.client("logs", config=CLIENT_CONFIG)
 
     (
         failed_calls,
@@ -312,61 +616,86 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         "Attempting to match up %s failed calls with associated AWS logs.",
         len(failed_calls),
     )
-    for cur_call in failed_calls:
-        logger.debug(
-            "  [*] %s (%s -> %s)",
-            cur_call.get("name"),
-            cur_call.get("startReadable"),
-            cur_call.get("endReadable"),
-        )
+    if logger.isEnabledFor(logging.DEBUG):
+        for cur_call in map(with_readable_dates, failed_calls):
+            logger.debug(
+                "  [*] %s (%s -> %s)",
+                cur_call.get("name"),
+                cur_call.get("startReadable"),
+                cur_call.get("endReadable"),
+            )
     logger.info(
         "Searching from %s -> %s.",
         reporting.localize_date_from_timestamp(start_time_filter),
         reporting.localize_date_from_timestamp(end_time_filter),
     )
-    aws_batch_jobs = get_aws_batch_jobs(
-        args, batch_client, start_time_filter, end_time_filter
+    aws_batch_jobs = await asyncio.to_thread(
+        get_aws_batch_jobs, args, batch_client, start_time_filter, end_time_filter
     )
 
     logger.info("Found %s matching AWS batch jobs.", len(aws_batch_jobs))
 
-    for job in aws_batch_jobs:
-        logger.debug(
-            "  [*] %s-%s (%s -> %s)",
-            job.get("name"),
-            job.get("id"),
-            job.get("startReadable"),
-            job.get("endReadable"),
-        )
+    if logger.isEnabledFor(logging.DEBUG):
+        for job in map(with_readable_dates, aws_batch_jobs):
+            logger.debug(
+                "  [*] %s-%s (%s -> %s)",
+                job.get("name"),
+                job.get("id"),
+                job.get("startReadable"),
+                job.get("endReadable"),
+            )
 
+    index = BatchJobIndex(aws_batch_jobs, tolerance=args.get("match_tolerance"))
+    candidates = []
+    unmatched = []
     for cur_call in failed_calls:
-        candidate_batch_jobs = []
-
-        call_name = cur_call.get("name", "")
-        easy_call_identifier = (
-            call_name.split("_")[0] if "_" in call_name else call_name
-        )
-        for batch_job in [
-            j for j in aws_batch_jobs if easy_call_identifier in j.get("name", "")
-        ]:
-            # created at for the batch job is a better indicator than the start time because
-            # once Cromwell submits the job (start time for Cromwell), the job may pend in AWS batch
-            dist = abs(cur_call.get("start", 0) - batch_job.get("created", 0))
-            if dist < 300:
-                candidate_batch_jobs.append(batch_job)
-
-        if candidate_batch_jobs:
+        # created at for the batch job is a better indicator than the start time because
+        # once Cromwell submits the job (start time for Cromwell), the job may pend in AWS batch
+        batch_job = index.match(cur_call.get("name", ""), cur_call.get("start", 0))
+        if batch_job:
             logger.debug(
-                "Found %s candidate batch jobs for %s/%s.",
-                len(candidate_batch_jobs),
+                "Matched %s/%s with AWS batch job %s.",
                 cur_call.get("workflow_id"),
                 cur_call.get("name"),
+                batch_job.get("id"),
             )
-
-            write_log(
-                batch_client,
-                logs_client,
-                cur_call,
-                args.get("output_folder", ""),
-                candidate_batch_jobs=candidate_batch_jobs,
+            candidates.append((cur_call, [batch_job]))
+        else:
+            unmatched.append(
+                {
+                    "Workflow ID": cur_call.get("workflow_id", ""),
+                    "Call Name": cur_call.get("name", ""),
+                    "Status": "Unmatched",
+                }
             )
+
+    # every candidate is described up front so that the jobs can be sent to
+    # AWS in batches.
+    job_descriptions = BatchJobDescriptions(
+        batch_client, max_workers=args.get("max_concurrent_requests")
+    )
+    await asyncio.to_thread(
+        job_descriptions.fetch,
+        [j.get("id", "") for _, jobs in candidates for j in jobs],
+    )
+
+    results = await asyncio.to_thread(
+        write_logs,
+        job_descriptions,
+        logs_client,
+        candidates,
+        args.get("output_folder", ""),
+        tail=args.get("tail"),
+        max_workers=args.get("max_concurrent_requests"),
+    )
+
+    reporting.print_dicts_as_table(
+        results + unmatched, grid_style=args.get("grid_style")
+    )
+    failed = sum(1 for r in results if r["Status"] == "Failed")
+    logger.info(
+        "Wrote logs for %d calls (%d failed, %d without a matching AWS batch job).",
+        len(results) - failed,
+        failed,
+        len(unmatched),
+    )
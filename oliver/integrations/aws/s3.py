@@ -0,0 +1,383 @@
+"""Helpers for reading and writing S3 objects from the AWS integrations."""
+
+import concurrent.futures
+import os
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from logzero import logger
+from s3transfer.futures import TransferFuture
+from s3transfer.manager import TransferManager
+from s3transfer.subscribers import BaseSubscriber
+
+from ...lib import concurrency, transfer
+
+# maximum number of keys accepted by a single DeleteObjects request.
+DELETE_BATCH_SIZE = 1000
+
+# extra arguments for every object written to S3, matching the `--sse
+# AES256` of the commands printed when not executing transfers.
+EXTRA_ARGS = {"ServerSideEncryption": "AES256"}
+
+
+def is_s3_url(url: str) -> bool:
+    return url.startswith("s3://")
+
+
+def parse_url(url: str) -> Tuple[str, str]:
+    """Splits an `s3://bucket/key` URL into its bucket and key."""
+
+    parsed = urlparse(url)
+    return parsed.netloc, parsed.path.lstrip("/")
+
+
+def head(client: Any, url: str) -> Optional[Tuple[int, str]]:
+    """Returns the size and ETag of an S3 object, or None if it doesn't exist."""
+
+    bucket, key = parse_url(url)
+    try:
+        response = client.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return response.get("ContentLength", 0), response.get("ETag", "").strip('"')
+
+
+def stat(client: Any, path: str) -> Optional[Tuple[int, str]]:
+    """Returns the size and fingerprint (ETag for S3 objects, see
+    `transfer.fingerprint` for local files) of a file, or None if it doesn't
+    exist."""
+
+    if is_s3_url(path):
+        return head(client, path)
+    try:
+        return transfer.fingerprint(path)
+    except FileNotFoundError:
+        return None
+
+
+def manifest_location(folder: str) -> str:
+    if is_s3_url(folder):
+        return folder.rstrip("/") + "/" + transfer.MANIFEST_NAME
+    return os.path.join(folder, transfer.MANIFEST_NAME)
+
+
+def load_manifest(client: Any, folder: str, journal: bool = True) -> transfer.Manifest:
+    """Loads the transfer manifest kept in `folder` (local or on S3). With
+    `journal`, entries recorded in a local manifest are also appended to it
+    (see `transfer.Manifest.load`)."""
+
+    location = manifest_location(folder)
+    if not is_s3_url(location):
+        return transfer.Manifest.load(location, journal=journal)
+
+    bucket, key = parse_url(location)
+    try:
+        body = client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            return transfer.Manifest()
+        raise
+    return transfer.Manifest(transfer.Manifest.parse(body.decode("utf-8")))
+
+
+def save_manifest(client: Any, folder: str, manifest: transfer.Manifest) -> None:
+    """Writes the transfer manifest to `folder` (local or on S3)."""
+
+    location = manifest_location(folder)
+    if not is_s3_url(location):
+        manifest.save(location)
+        return
+
+    bucket, key = parse_url(location)
+    client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=manifest.dumps().encode("utf-8"),
+        ServerSideEncryption="AES256",
+    )
+
+
+def plan_transfers(
+    client: Any,
+    pairs: Iterable[Tuple[str, str]],
+    manifest: transfer.Manifest,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Works out which files still need to be transferred.
+
+    Each source is looked up on S3 and compared with the manifest and with the
+    destination. Files that were already transferred are marked "skipped":
+    objects on S3 whose size and ETag match the source (such as those copied
+    by running the printed commands), and local files of the right size that
+    the manifest records as copied from the same version of the source (same
+    ETag). Files that share a
+    destination with another file "failed" and everything else "pending".
+    Every entry is recorded in `manifest`.
+
+    Args:
+        client (S3Client): boto3 S3 client.
+        pairs (Iterable[Tuple[str, str]]): Source and destination of each file.
+        manifest (transfer.Manifest): Manifest from the output folder.
+        max_workers (int, optional): Number of files looked up at once.
+        Defaults to `transfer.DEFAULT_MAX_WORKERS`.
+
+    Returns:
+        List[Dict]: Manifest entries for each file, in the same order as
+        `pairs`.
+    """
+
+    _pairs = list(pairs)
+    duplicates = transfer.duplicate_destinations(_pairs)
+
+    def plan(pair: Tuple[str, str]) -> Dict[str, Any]:
+        source, destination = pair
+        result: Dict[str, Any] = {"source": source, "destination": destination}
+        if destination in duplicates:
+            result["status"] = "failed"
+            result["error"] = (
+                f"{len(duplicates[destination])} files would be copied to "
+                f"{destination}"
+            )
+            logger.error("Could not copy %s: %s", source, result["error"])
+            # the destination's manifest entry belongs to neither file.
+            return result
+
+        try:
+            source_stat = head(client, source)
+            if source_stat is None:
+                raise FileNotFoundError(f"{source} does not exist")
+            result["size"], result["fingerprint"] = source_stat
+
+            # a local copy has no ETag of its own, so it is only known to
+            # match the object if the manifest says it was copied from this
+            # version of it.
+            destination_stat = stat(client, destination)
+            if (
+                destination_stat is not None
+                and destination_stat[0] == source_stat[0]
+                and (
+                    manifest.is_complete(source, destination, *source_stat)
+                    or (
+                        is_s3_url(destination) and destination_stat[1] == source_stat[1]
+                    )
+                )
+            ):
+                result["status"] = "skipped"
+            else:
+                result["status"] = "pending"
+        except (ClientError, OSError) as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+
+        manifest.record(result)
+        return result
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers or transfer.DEFAULT_MAX_WORKERS
+    ) as pool:
+        return list(pool.map(plan, _pairs))
+
+
+class _KnownSize(BaseSubscriber):
+    """Tells the transfer manager the size of an object we already looked up
+    so it doesn't need another HeadObject request."""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def on_queued(self, future: Any, **kwargs: Any) -> None:
+        future.meta.provide_transfer_size(self.size)
+
+
+def _submit(
+    manager: TransferManager, client: Any, result: Dict[str, Any]
+) -> TransferFuture:
+    bucket, key = parse_url(result["source"])
+    subscribers = [_KnownSize(int(result["size"]))]
+
+    if is_s3_url(result["destination"]):
+        dest_bucket, dest_key = parse_url(result["destination"])
+        return manager.copy(
+            {"Bucket": bucket, "Key": key},
+            dest_bucket,
+            dest_key,
+            extra_args=EXTRA_ARGS,
+            subscribers=subscribers,
+            source_client=client,
+        )
+
+    os.makedirs(os.path.dirname(result["destination"]) or ".", exist_ok=True)
+    return manager.download(bucket, key, result["destination"], subscribers=subscribers)
+
+
+def execute_transfers(
+    client: Any,
+    results: List[Dict[str, Any]],
+    manifest: transfer.Manifest,
+    max_concurrency: Optional[int] = None,
+    max_bandwidth: Optional[int] = None,
+) -> None:
+    """Performs the "pending" transfers from `plan_transfers`.
+
+    All transfers share a single boto3 managed transfer, so large objects are
+    split into parts and `max_concurrency` and `max_bandwidth` apply across
+    every file at once. Objects are copied server-side when the destination is
+    on S3 and downloaded otherwise. Each result's status is updated to
+    "copied" or "failed" and recorded in `manifest` as soon as it is known.
+
+    Args:
+        client (S3Client): boto3 S3 client.
+        results (List[Dict]): Entries returned by `plan_transfers`.
+        manifest (transfer.Manifest): Manifest from the output folder.
+        max_concurrency (int, optional): Number of requests (or parts) in
+        flight at once. Defaults to `transfer.DEFAULT_MAX_WORKERS`.
+        max_bandwidth (int, optional): Maximum bytes per second downloaded
+        across all transfers. Defaults to no limit.
+    """
+
+    pending = [r for r in results if r["status"] == "pending"]
+    progress = concurrency.Progress(len(pending), description="files")
+    config = TransferConfig(
+        max_concurrency=max_concurrency or transfer.DEFAULT_MAX_WORKERS,
+        max_bandwidth=max_bandwidth,
+    )
+
+    def finish(result: Dict[str, Any], error: Optional[Exception] = None) -> None:
+        if error is None:
+            result["status"] = "copied"
+        else:
+            result["status"] = "failed"
+            result["error"] = str(error)
+            logger.error(
+                "Could not copy %s to %s: %s",
+                result["source"],
+                result["destination"],
+                error,
+            )
+        manifest.record(result)
+        progress.update()
+
+    with TransferManager(client, config) as manager:
+        # a transfer that can't even be started (such as one whose folder
+        # can't be created) fails on its own rather than losing the outcome of
+        # those already submitted.
+        futures = []
+        for result in pending:
+            try:
+                futures.append((_submit(manager, client, result), result))
+            except Exception as e:  # pylint: disable=broad-except
+                finish(result, e)
+
+        for future, result in futures:
+            try:
+                future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                finish(result, e)
+            else:
+                finish(result)
+
+
+def delete_prefixes(
+    client: Any,
+    prefixes: List[str],
+    dry_run: bool = False,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Deletes every object under each of the given S3 prefixes.
+
+    Prefixes are listed concurrently and each page of the listing (up to
+    `DELETE_BATCH_SIZE` keys) is deleted with a single DeleteObjects request
+    on a separate pool of workers, so deletion overlaps with listing.
+
+    Args:
+        client (S3Client): boto3 S3 client.
+        prefixes (List[str]): `s3://bucket/prefix/` URLs to delete.
+        dry_run (bool, optional): Only count the objects and bytes that would
+        be deleted. Defaults to False.
+        max_workers (int, optional): Number of prefixes listed, and requests
+        to delete objects made, at once. Defaults to
+        `transfer.DEFAULT_MAX_WORKERS`.
+
+    Returns:
+        List[Dict]: The `Prefix`, number of `Objects` and `Bytes` deleted (or
+        that would be deleted) and any `Errors` for each prefix, in the same
+        order as `prefixes`. Objects that could not be deleted are not
+        counted.
+    """
+
+    workers = max_workers or transfer.DEFAULT_MAX_WORKERS
+    progress = concurrency.Progress(len(prefixes), description="prefixes")
+
+    def delete_batch(
+        bucket: str, objects: Dict[str, int]
+    ) -> Tuple[int, int, List[str]]:
+        """Deletes a page of objects (keyed by key, with their sizes) and
+        returns the number and bytes of those actually deleted and any
+        errors."""
+
+        try:
+            response = client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": k} for k in objects], "Quiet": True},
+            )
+        except ClientError as e:
+            return 0, 0, [str(e)]
+
+        failed = {e.get("Key"): e for e in response.get("Errors", [])}
+        deleted = [k for k in objects if k not in failed]
+        return (
+            len(deleted),
+            sum(objects[k] for k in deleted),
+            [f"{k}: {e.get('Message', e.get('Code'))}" for k, e in failed.items()],
+        )
+
+    def delete_prefix(
+        deleter: concurrent.futures.ThreadPoolExecutor, url: str
+    ) -> Dict[str, Any]:
+        bucket, prefix = parse_url(url)
+        result: Dict[str, Any] = {"Prefix": url, "Objects": 0, "Bytes": 0}
+        errors: List[str] = []
+        batches = []
+
+        try:
+            paginator = client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(
+                Bucket=bucket,
+                Prefix=prefix,
+                PaginationConfig={"PageSize": DELETE_BATCH_SIZE},
+            ):
+                objects = {o["Key"]: o.get("Size", 0) for o in page.get("Contents", [])}
+                if not objects:
+                    continue
+                if dry_run:
+                    result["Objects"] += len(objects)
+                    result["Bytes"] += sum(objects.values())
+                else:
+                    batches.append(deleter.submit(delete_batch, bucket, objects))
+        except ClientError as e:
+            errors.append(str(e))
+
+        # only objects that were actually deleted are counted.
+        for batch in batches:
+            deleted, size, batch_errors = batch.result()
+            result["Objects"] += deleted
+            result["Bytes"] += size
+            errors.extend(batch_errors)
+
+        if errors:
+            logger.error("Could not delete everything under %s: %s", url, errors[0])
+            result["Errors"] = len(errors)
+        return result
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers
+    ) as lister, concurrent.futures.ThreadPoolExecutor(max_workers=workers) as deleter:
+        futures = [lister.submit(delete_prefix, deleter, p) for p in prefixes]
+        for _ in concurrent.futures.as_completed(futures):
+            progress.update()
+        return [f.result() for f in futures]
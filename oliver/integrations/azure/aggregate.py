@@ -1,47 +1,186 @@
+import asyncio
 import os
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
-from ...lib import api, errors
+import aiohttp
+from logzero import logger
+
+from ...lib import (
+    api,
+    concurrency,
+    errors,
+    reporting,
+    transfer,
+)
 from ...subcommands import outputs as _outputs
+from . import cli
+
+DEFAULT_ENDPOINT = "https://{account}.blob.core.windows.net"
+
+# version of the Blob service REST API that requests are made against.
+API_VERSION = "2021-08-06"
+
+# resource to request an Azure AD access token for when no SAS token is given.
+STORAGE_RESOURCE = "https://storage.azure.com/"
+
+CHUNK_SIZE = 1024 * 1024
+
 
+def get_transfers(dest_folder: str, output: Any) -> List[Tuple[str, str]]:
+    """Returns the blob path and destination of each file in a workflow output
+    (which may be a single file or a list of files)."""
 
-def process_output_azure(
-    dest_folder: str,
-    output: str,
-    azure_storage_account: str,
-    sas_token: Optional[str] = "",
-    dry_run: Optional[bool] = False,
-) -> None:
     if isinstance(output, list):
-        for o in output:
-            process_output_azure(
-                dest_folder, o, azure_storage_account, sas_token, dry_run
-            )
-        return
+        return [t for o in output for t in get_transfers(dest_folder, o)]
 
-    if not output:
-        return
+    if not output or not isinstance(output, str):
+        return []
 
-    if not azure_storage_account:
-        errors.report(
-            "Must include Azure blob storage account name in config!",
-            fatal=True,
-            exitcode=errors.ERROR_INVALID_INPUT,
-        )
+    return [(output, os.path.join(dest_folder, os.path.basename(output)))]
+
+
+class BlobDownloader:
+    """Downloads blobs over the Blob service REST API.
+
+    Requests are authorized with a SAS token if one is given, and with a
+    single Azure AD access token from the Azure CLI otherwise, so that
+    credentials are only looked up once for all of the files.
+
+    With a `manifest`, files downloaded by an earlier run are requested with
+    `If-None-Match` and skipped when the blob hasn't changed since, so an
+    interrupted run can simply be run again.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        sas_token: Optional[str] = None,
+        access_token: Optional[str] = None,
+        manifest: Optional[transfer.Manifest] = None,
+    ):
+        self.session = session
+        self.endpoint = endpoint.rstrip("/")
+        self.query = ""
+        if sas_token:
+            self.query = sas_token if sas_token.startswith("?") else "?" + sas_token
+        self.headers = {"x-ms-version": API_VERSION}
+        if access_token:
+            self.headers["Authorization"] = f"Bearer {access_token}"
+        self.manifest = manifest or transfer.Manifest()
+
+    def url(self, path: str) -> str:
+        return self.endpoint + quote(path)
+
+    def _unchanged_etag(self, source: str, destination: str) -> Optional[str]:
+        """Returns the ETag recorded for a complete download of `source` to
+        `destination`, if the file is still there."""
+
+        entry = self.manifest.entries.get(destination)
+        if not entry or not os.path.exists(destination):
+            return None
+
+        etag = entry.get("fingerprint")
+        if self.manifest.is_complete(
+            self.url(source), destination, os.path.getsize(destination), etag
+        ):
+            return etag
+        return None
+
+    async def download(self, pair: Tuple[str, str]) -> Dict[str, Any]:
+        """Downloads a single blob, writing it next to its destination and only
+        moving it into place once complete."""
 
-    source_url = f"https://{azure_storage_account}.blob.core.windows.net{output}"
-    file_name = os.path.basename(output)
+        source, destination = pair
+        result: Dict[str, Any] = {
+            "source": self.url(source),
+            "destination": destination,
+        }
+        headers = dict(self.headers)
+        etag = self._unchanged_etag(source, destination)
+        if etag:
+            headers["If-None-Match"] = f'"{etag}"'
 
-    if not sas_token:
-        cmd = f"az storage copy -s {source_url} -d {dest_folder}/{file_name}"
-    else:
-        cmd = f"azcopy copy --recursive '{source_url}{sas_token}' {dest_folder}/{file_name}"
+        partial = destination + transfer.PARTIAL_SUFFIX
+        try:
+            async with self.session.get(
+                self.url(source) + self.query, headers=headers
+            ) as response:
+                if response.status == 304:
+                    result.update(
+                        size=os.path.getsize(destination),
+                        fingerprint=etag,
+                        status="skipped",
+                    )
+                elif response.status != 200:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=response.reason or "",
+                    )
+                else:
+                    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+                    size = 0
+                    with open(partial, mode="wb") as f:
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            f.write(chunk)
+                            size += len(chunk)
+                    os.replace(partial, destination)
+                    result.update(
+                        size=size,
+                        fingerprint=response.headers.get("ETag", "").strip('"'),
+                        status="copied",
+                    )
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            if os.path.lexists(partial):
+                os.remove(partial)
+            result.update(status="failed", error=str(e) or type(e).__name__)
+            logger.error("Could not download %s: %s", result["source"], e)
 
-    if dry_run:
-        print(cmd)
-    else:
-        os.system(cmd)
+        self.manifest.record(result)
+        return result
+
+    async def download_all(
+        self,
+        pairs: List[Tuple[str, str]],
+        max_concurrent_requests: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Downloads many blobs, keeping at most `max_concurrent_requests` in
+        flight at once, and then saves the manifest. Blobs sharing a
+        destination with another blob are not downloaded and are reported as
+        failed, since they would overwrite each other.
+
+        Returns:
+            List[Dict]: Manifest entry for each file, in the same order as
+            `pairs`.
+        """
+
+        duplicates = transfer.duplicate_destinations(pairs)
+
+        async def download(pair: Tuple[str, str]) -> Dict[str, Any]:
+            source, destination = pair
+            if destination not in duplicates:
+                return await self.download(pair)
+            error = (
+                f"{len(duplicates[destination])} files would be downloaded to "
+                f"{destination}"
+            )
+            logger.error("Could not download %s: %s", self.url(source), error)
+            return {
+                "source": self.url(source),
+                "destination": destination,
+                "status": "failed",
+                "error": error,
+            }
+
+        results = await concurrency.gather_with_limit(
+            download, pairs, limit=max_concurrent_requests, description="files"
+        )
+        self.manifest.save()
+        return results
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -54,18 +193,63 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
     outputs = await _outputs.get_outputs(
         cromwell, args["workflow-id"], output_prefix=args.get("output_prefix", "")
     )
-    if not args.get("storage_account_name"):
-        errors.report(
-            "Must include Azure blob storage account name in config! [oliver config set storage_account_name cromwell-XXXXX]",
-            fatal=True,
-            exitcode=errors.ERROR_INVALID_INPUT,
-        )
+    endpoint = args.get("blob_endpoint")
+    if not endpoint:
+        if not args.get("storage_account_name"):
+            errors.report(
+                "Must include Azure blob storage account name in config! [oliver config set storage_account_name cromwell-XXXXX]",
+                fatal=True,
+                exitcode=errors.ERROR_INVALID_INPUT,
+            )
+        endpoint = DEFAULT_ENDPOINT.format(account=args.get("storage_account_name"))
 
+    output_folder = args.get("output-folder", "")
+    transfers = []
     for output in outputs:
-        process_output_azure(
-            args.get("output-folder", ""),
-            output["Location"],
-            args.get("storage_account_name", ""),
-            args.get("sas_token"),
-            args.get("dry_run"),
+        transfers.extend(get_transfers(output_folder, output["Location"]))
+    # the same file can be reported by more than one output.
+    transfers = list(dict.fromkeys(transfers))
+
+    manifest = transfer.Manifest.load(
+        os.path.join(output_folder, transfer.MANIFEST_NAME)
+    )
+    if args.get("dry_run"):
+        for source, destination in transfers:
+            print(f"{endpoint.rstrip('/')}{quote(source)} {destination}")
+        return
+
+    access_token = None
+    if not args.get("sas_token"):
+        access_token = cli.run_az(
+            "account", "get-access-token", "--resource", STORAGE_RESOURCE
+        )["accessToken"]
+
+    # large blobs can take much longer than aiohttp's default total timeout
+    # to download, so only bound connecting and each read.
+    async with api.create_session(
+        connect_timeout=args.get("connect_timeout"),
+        read_timeout=args.get("read_timeout"),
+        compress_responses=False,
+    ) as session:
+        downloader = BlobDownloader(
+            session,
+            endpoint,
+            sas_token=args.get("sas_token"),
+            access_token=access_token,
+            manifest=manifest,
+        )
+        results = await downloader.download_all(
+            transfers, max_concurrent_requests=args.get("max_concurrent_requests")
+        )
+
+    reporting.print_dicts_as_table(
+        [transfer.summarize(results)], grid_style=args.get("grid_style")
+    )
+
+    failed = [r for r in results if r["status"] == "failed"]
+    if failed:
+        errors.report(
+            f"Could not download {len(failed)} files.",
+            fatal=True,
+            exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
         )
@@ -0,0 +1,29 @@
+"""Helpers for running the Azure CLI."""
+
+import json
+import subprocess
+
+from typing import Any
+
+from ...lib import errors
+
+
+def run_az(*command: str) -> Any:
+    """Runs an Azure CLI command and decodes its JSON output."""
+
+    try:
+        process = subprocess.run(
+            ["az", *command, "--output", "json"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return json.loads(process.stdout)
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        stderr = getattr(e, "stderr", None) or str(e)
+        errors.report(
+            f"Could not run `az {' '.join(command)}`: {stderr.strip()}",
+            fatal=True,
+            exitcode=errors.ERROR_INVALID_INPUT,
+        )
+    return None
@@ -1,44 +1,220 @@
+import concurrent.futures
 import os
 import json
+import sys
+import tempfile
+import time
 
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 from azure.cosmos import cosmos_client
+from logzero import logger
 
-from ...lib import api, reporting
+from ...lib import api, config, errors, reporting
+from . import cli
 
+# kept next to the config file rather than in the metadata cache, so that
+# clearing the cache doesn't mean looking the credentials up again.
+CREDENTIALS_FILE_NAME = ".oliver_cosmos_credentials.json"
+# the CosmosDB key is never stored in the config file.
+COSMOS_KEY_ENV = "OLIVER_COSMOS_KEY"
+DEFAULT_PAGE_SIZE = 100
 
-class CosmosAPI:
-    def __init__(self, cosmos_name: str = "", resource_group: str = "") -> None:
-        stream = os.popen(
-            "az cosmosdb show --name "
-            + cosmos_name
-            + " --resource-group "
-            + resource_group
-        )
-        server = stream.read()
-        server_obj = json.loads(server)
-        self.server = server_obj["documentEndpoint"]
-        stream = os.popen(
-            "az cosmosdb keys list --name "
-            + cosmos_name
-            + " --resource-group "
-            + resource_group
+# projection of the fields shown in the table of tasks.
+TABLE_FIELDS = ", ".join(
+    [
+        "r.name",
+        "r.state",
+        "IS_DEFINED(r.resources) AS has_resources",
+        "r.resources.vm_info.vm_size AS vm_size",
+        "r.logs[0].system_logs[0] AS system_log",
+    ]
+)
+DEFAULT_CREDENTIALS_TTL_HOURS = 24
+
+
+def fetch_credentials(cosmos_name: str, resource_group: str) -> Tuple[str, str]:
+    """Looks up the endpoint and primary key of a CosmosDB account with the
+    Azure CLI. Both commands are run at once."""
+
+    args = ["--name", cosmos_name, "--resource-group", resource_group]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        server = pool.submit(cli.run_az, "cosmosdb", "show", *args)
+        keys = pool.submit(cli.run_az, "cosmosdb", "keys", "list", *args)
+        return server.result()["documentEndpoint"], keys.result()["primaryMasterKey"]
+
+
+class CredentialCache:
+    """Cache of CosmosDB endpoints and keys, so that the Azure CLI (which is
+    slow to start) doesn't have to be run every time.
+
+    Credentials are kept for `ttl_hours` in a file that only the current user
+    can read, in `location` (by default, the folder of the config file).
+    """
+
+    def __init__(
+        self, location: Optional[str] = None, ttl_hours: Optional[float] = None
+    ):
+        self.location = os.path.join(
+            location or os.path.dirname(os.path.expanduser(config.DEFAULT_LOCATION)),
+            CREDENTIALS_FILE_NAME,
         )
-        key = stream.read()
-        key_obj = json.loads(key)
-        self.key = key_obj["primaryMasterKey"]
+        self.ttl = (
+            DEFAULT_CREDENTIALS_TTL_HOURS if ttl_hours is None else ttl_hours
+        ) * 3600
+
+    @staticmethod
+    def key(cosmos_name: str, resource_group: str) -> str:
+        return f"{resource_group}/{cosmos_name}"
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.location, mode="r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, cosmos_name: str, resource_group: str) -> Optional[Tuple[str, str]]:
+        """Returns the cached endpoint and key, unless they have expired."""
+
+        entry = self._read().get(self.key(cosmos_name, resource_group))
+        if not entry or time.time() - entry.get("fetched", 0) > self.ttl:
+            return None
+        return entry["endpoint"], entry["key"]
+
+    def put(
+        self, cosmos_name: str, resource_group: str, endpoint: str, key: str
+    ) -> None:
+        credentials = self._read()
+        credentials[self.key(cosmos_name, resource_group)] = {
+            "endpoint": endpoint,
+            "key": key,
+            "fetched": time.time(),
+        }
+
+        partial = None
+        try:
+            os.makedirs(os.path.dirname(self.location), mode=0o700, exist_ok=True)
+            # mkstemp always creates a new file that only we can read, whatever
+            # was left behind by an earlier run.
+            fd, partial = tempfile.mkstemp(
+                dir=os.path.dirname(self.location),
+                prefix=CREDENTIALS_FILE_NAME,
+                suffix=".tmp",
+            )
+            with os.fdopen(fd, mode="w", encoding="utf-8") as f:
+                json.dump(credentials, f)
+            os.replace(partial, self.location)
+        except OSError as e:
+            logger.warning("Could not cache CosmosDB credentials: %s", e)
+            if partial and os.path.exists(partial):
+                os.remove(partial)
+
+
+class CosmosAPI:
+    def __init__(self, endpoint: str, key: str) -> None:
+        self.server = endpoint
+        self.key = key
         self.client = cosmos_client.CosmosClient(self.server, {"masterKey": self.key})
 
+    # pylint: disable=too-many-arguments
     def query(
-        self, database_id: str = "TES", container_id: str = "Tasks", where: str = ""
-    ) -> Any:
-        # pylint: disable=no-member
-        return self.client.QueryItems(  # type: ignore
-            "dbs/" + database_id + "/colls/" + container_id,
-            "SELECT * FROM " + container_id + " r " + where,
-            {"enableCrossPartitionQuery": True},
+        self,
+        database_id: str = "TES",
+        container_id: str = "Tasks",
+        where: str = "",
+        fields: str = "*",
+        parameters: Optional[List[Dict[str, Any]]] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Runs a query across every partition of a container.
+
+        Results are fetched `page_size` items at a time by following the
+        continuation token, and yielded as each page arrives.
+
+        Args:
+            database_id (str, optional): Database to query. Defaults to "TES".
+            container_id (str, optional): Container to query (aliased as `r`).
+            Defaults to "Tasks".
+            where (str, optional): `WHERE` clause of the query.
+            fields (str, optional): Projection of the query. Defaults to "*".
+            parameters (List[Dict], optional): Values for the `@parameters` in
+            the query.
+            page_size (int, optional): Items per page. Defaults to
+            `DEFAULT_PAGE_SIZE`.
+        """
+
+        container = self.client.get_database_client(database_id).get_container_client(
+            container_id
         )
-        # pylint: enable=no-member
+        pages: Any = container.query_items(
+            query=f"SELECT {fields} FROM {container_id} r {where}",
+            parameters=parameters or [],
+            enable_cross_partition_query=True,
+            max_item_count=page_size or DEFAULT_PAGE_SIZE,
+        ).by_page()
+
+        for page in pages:
+            yield from page
+            logger.debug("Next CosmosDB page: %s", pages.continuation_token)
+
+
+def write_json(items: Iterable[Any], f: TextIO, ndjson: bool = False) -> None:
+    """Writes items as a JSON array (or as newline-delimited JSON) one at a
+    time, so that the whole output never has to be held in memory."""
+
+    if ndjson:
+        for item in items:
+            f.write(json.dumps(item) + "\n")
+        return
+
+    f.write("[")
+    for i, item in enumerate(items):
+        f.write(",\n" if i else "\n")
+        f.write(json.dumps(item, indent=True))
+    f.write("\n]\n")
+
+
+# clients are reused by every query in the same process.
+_clients: Dict[Tuple[str, str], CosmosAPI] = {}
+
+
+def get_cosmos_api(args: Dict[str, Any]) -> CosmosAPI:
+    """Returns a client for the CosmosDB account given in `args`.
+
+    The endpoint and key are taken from `cosmos_endpoint` and `cosmos_key` (or
+    the `OLIVER_COSMOS_KEY` environment variable) if both are set. Otherwise they are looked up for `cosmos_account_name` in
+    `azure_resource_group` with the Azure CLI and cached (see
+    `CredentialCache`) unless `refresh_credentials` is set.
+    """
+
+    endpoint = args.get("cosmos_endpoint")
+    key = args.get("cosmos_key") or os.environ.get(COSMOS_KEY_ENV)
+    if not endpoint or not key:
+        cosmos_name = args.get("cosmos_account_name", "")
+        resource_group = args.get("azure_resource_group", "")
+        if not cosmos_name or not resource_group:
+            errors.report(
+                "Must include `cosmos_account_name` and `azure_resource_group` "
+                "(or `cosmos_endpoint` in config and `--cosmos-key`)!",
+                fatal=True,
+                exitcode=errors.ERROR_INVALID_INPUT,
+            )
+
+        credentials = CredentialCache(
+            ttl_hours=args.get("cosmos_credentials_ttl_hours")
+        )
+        cached = None
+        if not args.get("refresh_credentials"):
+            cached = credentials.get(cosmos_name, resource_group)
+        if cached:
+            endpoint, key = cached
+        else:
+            endpoint, key = fetch_credentials(cosmos_name, resource_group)
+            credentials.put(cosmos_name, resource_group, endpoint, key)
+
+    if (endpoint, key) not in _clients:
+        _clients[(endpoint, key)] = CosmosAPI(endpoint, key)
+    return _clients[(endpoint, key)]
 
 
 async def call(
@@ -50,47 +226,42 @@ async def call(
         args (Dict): Arguments parsed from the command line.
     """
 
-    client = CosmosAPI(
-        cosmos_name=args["cosmos_account_name"],
-        resource_group=args["azure_resource_group"],
-    )
+    client = get_cosmos_api(args)
     workflow_prefix = args["workflow-id"][0:8]
     res = []
 
-    query = 'WHERE STARTSWITH(r.description, "' + workflow_prefix + '")'
+    query = "WHERE STARTSWITH(r.description, @prefix)"
     if args["failures"]:
         query += " AND r.state = 'SYSTEM_ERROR'"
-    results = client.query("TES", "Tasks", query)
+    output_json = args.get("json") or args.get("ndjson")
+    results = client.query(
+        "TES",
+        "Tasks",
+        query,
+        fields="*" if output_json else TABLE_FIELDS,
+        parameters=[{"name": "@prefix", "value": workflow_prefix}],
+        page_size=args.get("page_size"),
+    )
 
-    if args["json"]:
-        output = ""
-        for item in results:
-            output += json.dumps(item, indent=True)
-        if args["outfile"] and args["outfile"] is not None:
-            f = open(args["outfile"], mode="w", encoding="utf-8")
-            f.write(output)
-            f.close()
+    if output_json:
+        if args.get("outfile"):
+            with open(args["outfile"], mode="w", encoding="utf-8") as f:
+                write_json(results, f, ndjson=args.get("ndjson", False))
         else:
-            print(output)
+            write_json(results, sys.stdout, ndjson=args.get("ndjson", False))
     else:
         for item in results:
-            log = ""
-            if item.get("logs"):
-                log = item.get("logs", [])[0]["system_logs"][0]
             size = ""
-            if item.get("resources"):
-                vm_info = item.get("resources", {}).get("vm_info", {})
-                size = "<not set>"
-                if vm_info:
-                    size = vm_info.get("vm_size", "<not set>")
+            if item.get("has_resources"):
+                size = item.get("vm_size") or "<not set>"
 
             res.append(
                 {
                     "Call Name": item["name"],
                     "State": item["state"],
                     "VM": size,
-                    "Log": log,
+                    "Log": item.get("system_log") or "",
                 }
             )
 
-        reporting.print_dicts_as_table(res)
+        reporting.print_dicts_as_table(res, grid_style=args.get("grid_style"))
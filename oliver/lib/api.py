@@ -1,15 +1,43 @@
+import asyncio
 import datetime
 import json
 import os
-
-from typing import Any, cast, Dict, List, Optional, Tuple, Union
+import socket
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    cast,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import urljoin
 from logzero import logger
 
 import aiohttp
-from . import errors, utils
+from . import cache, errors, jsonutils, retry, utils
 
 FILE_PARAMS = ["workflowSource", "workflowDependencies"]
+DEFAULT_QUERY_PAGE_SIZE = 1000
+METADATA_ALWAYS_INCLUDE = ["id", "status"]
+
+# requests have no overall time limit (large responses can take a long time
+# to download), so connecting and each read are bounded instead.
+DEFAULT_CONNECT_TIMEOUT = 30.0
+DEFAULT_READ_TIMEOUT = 300.0
+
+
+class APIError(Exception):
+    """Raised instead of exiting when a request made with `fatal=False` gets
+    an error response from Cromwell."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 def remove_none_values(d: Dict[str, Any]) -> Dict[str, Any]:
@@ -25,22 +53,192 @@ def remove_none_values(d: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
+def metadata_projection(fields: List[str]) -> List[str]:
+    """Turns the metadata fields a caller needs into the smallest set of
+    `includeKey` values for the metadata endpoint.
+
+    Fields are given as dotted paths (e.g. `labels`, `submittedFiles.inputs` or
+    `calls.executionStatus`). Cromwell matches `includeKey` against any key
+    _starting with_ the value at every level of the response, so:
+
+    - `calls.<key>` becomes `<key>`, which Cromwell applies within each call.
+    - any other path is reduced to its top-level key (`submittedFiles`).
+    - keys already covered by a shorter prefix are dropped.
+
+    `id` and `status` are always included so that results can be identified
+    and cached.
+
+    Args:
+        fields (List[str]): Metadata fields needed by the caller.
+
+    Returns:
+        List[str]: Values to send as `includeKey`.
+    """
+
+    keys = set(METADATA_ALWAYS_INCLUDE)
+    for field in fields:
+        parts = field.split(".")
+        if parts[0] == "calls" and len(parts) > 1:
+            keys.add(parts[1])
+        else:
+            keys.add(parts[0])
+
+    return sorted(k for k in keys if not any(k != o and k.startswith(o) for o in keys))
+
+
+# pylint: disable=too-many-arguments
+def create_session(
+    limit_per_host: Optional[int] = None,
+    keepalive_timeout: Optional[float] = None,
+    dns_cache_ttl: Optional[int] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+    compress_responses: bool = True,
+    unix_socket: Optional[str] = None,
+) -> aiohttp.ClientSession:
+    """Creates the HTTP session used to talk to Cromwell.
+
+    Any other option left as `None` keeps aiohttp's default.
+
+    Args:
+        limit_per_host (int, optional): Maximum number of simultaneous
+        connections to the Cromwell server.
+        keepalive_timeout (float, optional): Seconds to keep an idle connection
+        open for reuse.
+        dns_cache_ttl (int, optional): Seconds to cache DNS lookups for.
+        connect_timeout (float, optional): Seconds to wait for a connection to
+        be established. Defaults to `DEFAULT_CONNECT_TIMEOUT`.
+        read_timeout (float, optional): Seconds to wait between reads of a
+        response. Defaults to `DEFAULT_READ_TIMEOUT`.
+        compress_responses (bool, optional): Ask Cromwell to gzip responses.
+        Defaults to True.
+        unix_socket (str, optional): Path of a Unix domain socket to connect
+        through instead of TCP (e.g. when running on the Cromwell host).
+
+    Returns:
+        aiohttp.ClientSession: the session.
+    """
+
+    connector_kwargs: Dict[str, Any] = {}
+    if limit_per_host is not None:
+        connector_kwargs["limit_per_host"] = limit_per_host
+    if keepalive_timeout is not None:
+        connector_kwargs["keepalive_timeout"] = keepalive_timeout
+
+    if connect_timeout is None:
+        connect_timeout = DEFAULT_CONNECT_TIMEOUT
+    if read_timeout is None:
+        read_timeout = DEFAULT_READ_TIMEOUT
+
+    connector: aiohttp.BaseConnector
+    if unix_socket:
+        connector = aiohttp.UnixConnector(path=unix_socket, **connector_kwargs)
+    else:
+        if dns_cache_ttl is not None:
+            connector_kwargs["ttl_dns_cache"] = dns_cache_ttl
+        connector = aiohttp.TCPConnector(**connector_kwargs)
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout, sock_read=read_timeout
+        ),
+        headers={
+            "Accept-Encoding": "gzip, deflate" if compress_responses else "identity"
+        },
+    )
+
+
+# pylint: disable=too-many-instance-attributes
 class CromwellAPI:
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         server: str,
         version: str,
         headers: Optional[Dict[str, str]] = None,
         route_override: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        retry_policy: Optional[retry.RetryPolicy] = None,
+        metadata_cache: Optional[cache.MetadataCache] = None,
+        refresh_cache: bool = False,
+        incremental_json: bool = False,
     ):
         self.server = server
         self.version = version
         self.headers = headers or {"Accept": "application/json"}
-        self.session = aiohttp.ClientSession()
+        self.session = session or create_session()
+        self.retry_policy = retry_policy or retry.RetryPolicy()
+        self.circuit_breaker = retry.CircuitBreaker()
         self.route_override = route_override
+        self.metadata_cache = metadata_cache
+        self.refresh_cache = refresh_cache
+        self.incremental_json = incremental_json
 
     async def close(self) -> None:
+        if self.retry_policy.retries or self.circuit_breaker.trips:
+            logger.info(
+                "Retried %d requests to Cromwell. Paused requests %d times due to errors.",
+                self.retry_policy.retries,
+                self.circuit_breaker.trips,
+            )
         await self.session.close()
+        if self.metadata_cache is not None:
+            self.metadata_cache.close()
+
+    async def _send(
+        self,
+        func: Callable[..., Any],
+        url: str,
+        kwargs: Dict[str, Any],
+        retryable: bool,
+    ) -> Tuple[int, bytes]:
+        """Sends a request, retrying transient failures if `retryable`."""
+
+        attempt = 0
+        while True:
+            await self.circuit_breaker.wait()
+            retry_after = None
+
+            try:
+                response = await func(url, **kwargs)
+                status_code = response.status
+                body = await response.read()
+                retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.circuit_breaker.record(False)
+                # a name that doesn't resolve isn't going to start resolving.
+                dns_failure = isinstance(getattr(e, "os_error", None), socket.gaierror)
+                if (
+                    not retryable
+                    or dns_failure
+                    or attempt >= self.retry_policy.max_retries
+                ):
+                    raise
+                reason = type(e).__name__
+            else:
+                transient = status_code in retry.RETRY_STATUS_CODES
+                self.circuit_breaker.record(not transient)
+                if (
+                    not transient
+                    or not retryable
+                    or attempt >= self.retry_policy.max_retries
+                ):
+                    return status_code, body
+                reason = f"status code {status_code}"
+
+            delay = self.retry_policy.delay(attempt, retry_after)
+            attempt += 1
+            self.retry_policy.retries += 1
+            logger.info(
+                "Retrying %s in %.1fs after %s (retry %d of %d).",
+                url,
+                delay,
+                reason,
+                attempt,
+                self.retry_policy.max_retries,
+            )
+            await asyncio.sleep(delay)
 
     # pylint: disable=too-many-locals,too-many-branches,too-many-statements
     async def _api_call(
@@ -49,6 +247,8 @@ class CromwellAPI:
         params: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
         method: str = "GET",
+        keys: Optional[List[str]] = None,
+        fatal: bool = True,
     ) -> Tuple[int, Dict[str, Any]]:
         # only used when testing
         if self.route_override:
@@ -75,6 +275,8 @@ class CromwellAPI:
             func = self.session.get
         elif method == "POST":
             func = self.session.post
+        elif method == "PATCH":
+            func = self.session.patch
         else:
             errors.report(
                 "Unhandled API call type! This is an internal error with oliver.",
@@ -88,11 +290,17 @@ class CromwellAPI:
         if params:
             kwargs["params"] = utils.dict_to_aiohttp_tuples(params)
 
-        # format data as multipart-form
-        if data:
+        # Cromwell only expects a JSON body for PATCH requests, everything else
+        # is sent as multipart-form.
+        if data and method == "PATCH":
+            kwargs["json"] = data
+        elif data:
             _data = aiohttp.FormData()
             for k, v in data.items():
-                if k in FILE_PARAMS:
+                if k in FILE_PARAMS and isinstance(v, bytes):
+                    # already read into memory so it can be reused across requests.
+                    _data.add_field(k, v, filename=k)
+                elif k in FILE_PARAMS:
                     filename = os.path.basename(v)
                     # pylint: disable=R1732
                     _data.add_field(k, open(v, "rb"), filename=filename)
@@ -100,16 +308,26 @@ class CromwellAPI:
                     _data.add_field(k, v, filename=k, content_type="application/json")
             kwargs["data"] = _data
 
+        # only requests that are safe to repeat are retried.
+        retryable = method in ("GET", "PATCH") or route.endswith("/abort")
+
         try:
             assert func is not None
-            response = await func(url, **kwargs)
-        except aiohttp.client_exceptions.ClientConnectorError:
+            status_code, body = await self._send(func, url, kwargs, retryable)
+        except aiohttp.client_exceptions.ClientConnectionError:
             await self.close()
             errors.report(
                 message=f"Could not connect to {self.server}. Is the Cromwell server reachable?",
                 fatal=True,
                 exitcode=errors.ERROR_NO_RESPONSE,
             )
+        except asyncio.TimeoutError:
+            await self.close()
+            errors.report(
+                message=f"Timed out waiting for {self.server}. Is the Cromwell server overloaded?",
+                fatal=True,
+                exitcode=errors.ERROR_NO_RESPONSE,
+            )
         except aiohttp.client_exceptions.InvalidURL:
             await self.close()
             errors.report(
@@ -117,12 +335,13 @@ class CromwellAPI:
                 fatal=True,
                 exitcode=errors.ERROR_INVALID_INPUT,
             )
-        status_code = response.status
-        response_text = await response.text()
+
         content: Dict[str, Any] = {}
         try:
-            if response_text:
-                content = json.loads(response_text)
+            if body and keys and status_code // 200 == 1:
+                content = jsonutils.loads_keys(body, keys)
+            elif body:
+                content = jsonutils.loads(body)
         # pylint: disable=broad-exception-caught
         except Exception:
             pass
@@ -131,19 +350,21 @@ class CromwellAPI:
         if not status_code // 200 == 1:
             message = f"Server returned status code {status_code}."
             if content:
-                fatal = content.get("status") == "fail"
+                failed = content.get("status") == "fail"
             else:
-                fatal = True
+                failed = True
             suggest = (
-                not fatal
+                not failed
             )  # we have never experienced a case where the status wasn't "fail".
             # if such a case is encountered, we'd like to handle it here.
             if content and content.get("message"):
                 message += f" Message: \"{content.get('message')}\""
 
+            if not fatal:
+                raise APIError(message, status_code)
             errors.report(
                 message=message,
-                fatal=fatal,
+                fatal=failed,
                 exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
                 suggest_report=suggest,
             )
@@ -153,14 +374,21 @@ class CromwellAPI:
     # pylint: disable=too-many-arguments
     async def post_workflows(
         self,
-        workflowSource: Optional[str] = None,
+        workflowSource: Optional[Union[str, bytes]] = None,
         workflowUrl: Optional[str] = None,
         workflowInputs: Optional[Dict[str, str]] = None,
         workflowOptions: Optional[Dict[str, str]] = None,
         labels: Optional[Dict[str, str]] = None,
-        workflowDependencies: Optional[Dict[str, str]] = None,
+        workflowDependencies: Optional[Union[str, bytes]] = None,
+        workflowOnHold: bool = False,
+        fatal: bool = True,
     ) -> Dict[str, Any]:
-        "POST /api/workflows/{version}"
+        """POST /api/workflows/{version}
+
+        With `fatal=False`, an error response from Cromwell raises `APIError`
+        instead of exiting, so that callers submitting many workflows can
+        carry on with the rest.
+        """
 
         if workflowInputs is None:
             workflowInputs = {}
@@ -183,6 +411,7 @@ class CromwellAPI:
             "workflowOptions": workflowOptions,
             "labels": labels,
             "workflowDependencies": workflowDependencies,
+            "workflowOnHold": "true" if workflowOnHold else None,
         }
 
         logger.debug("workflowSource: %s", workflowSource)
@@ -196,32 +425,123 @@ class CromwellAPI:
             "api/workflows/{version}",
             method="POST",
             data=data,
+            fatal=fatal,
         )
         return data
 
-    async def post_workflows_batch(self) -> None:
-        "POST /api/workflows/{version}/batch"
-        raise NotImplementedError()
+    # pylint: disable=too-many-arguments
+    async def post_workflows_batch(
+        self,
+        workflowInputs: List[Dict[str, Any]],
+        workflowSource: Optional[Union[str, bytes]] = None,
+        workflowUrl: Optional[str] = None,
+        workflowOptions: Optional[Dict[str, Any]] = None,
+        labels: Optional[Dict[str, Any]] = None,
+        workflowDependencies: Optional[Union[str, bytes]] = None,
+        workflowOnHold: bool = False,
+        fatal: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """POST /api/workflows/{version}/batch
+
+        Submits one workflow for each item in `workflowInputs`. The workflow
+        source, options, labels and dependencies are shared by every workflow
+        in the batch. `workflowSource` and `workflowDependencies` may either be
+        paths or the contents of the files. With `workflowOnHold`, the workflows
+        wait to be released with `post_workflows_release_hold`. With
+        `fatal=False`, an error response raises `APIError` instead of exiting.
+
+        Returns:
+            List[Dict]: The id and status of each submitted workflow, in the same
+            order as `workflowInputs`.
+        """
+
+        if workflowSource is None and workflowUrl is None:
+            errors.report(
+                "Expected either 'workflowSource' or 'workflowUrl'!",
+                fatal=True,
+                exitcode=errors.ERROR_INVALID_INPUT,
+            )
+
+        data = {
+            "workflowSource": workflowSource,
+            "workflowUrl": workflowUrl,
+            "workflowInputs": json.dumps(workflowInputs),
+            "workflowOptions": json.dumps(workflowOptions or {}),
+            "labels": json.dumps(labels or {}),
+            "workflowDependencies": workflowDependencies,
+            "workflowOnHold": "true" if workflowOnHold else None,
+        }
+
+        logger.debug("Submitting a batch of %d workflows.", len(workflowInputs))
+
+        status_code, results = await self._api_call(
+            "api/workflows/{version}/batch",
+            method="POST",
+            data=data,
+            fatal=fatal,
+        )
+
+        if not isinstance(results, list):
+            message = f"Expected a list of workflows in response to a batch submission, got: {results}"
+            if not fatal:
+                raise APIError(message, status_code)
+            errors.report(
+                message,
+                fatal=True,
+                exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
+            )
+        return cast(List[Dict[str, Any]], results)
 
     async def get_workflows_labels(self) -> None:
         "GET /api/workflows/{version}/{id}/labels"
         raise NotImplementedError()
 
-    async def patch_workflows_labels(self) -> None:
-        "PATCH /api/workflows/{version}/{id}/labels"
-        raise NotImplementedError()
+    async def patch_workflows_labels(
+        self, workflow_id: str, labels: Dict[str, str], fatal: bool = True
+    ) -> Dict[str, Any]:
+        """PATCH /api/workflows/{version}/{id}/labels
+
+        With `fatal=False`, an error response raises `APIError` instead of
+        exiting.
+        """
 
-    async def post_workflows_abort(self, workflow_id: str) -> Dict[str, Any]:
-        "POST /api/workflows/{version}/{id}/abort"
+        _, data = await self._api_call(
+            f"api/workflows/{{version}}/{workflow_id}/labels",
+            method="PATCH",
+            data=labels,
+            fatal=fatal,
+        )
+        # cached metadata of a finished workflow would otherwise keep its old
+        # labels.
+        if self.metadata_cache is not None:
+            await asyncio.to_thread(
+                self.metadata_cache.invalidate, self.server, workflow_id
+            )
+        return data
+
+    async def post_workflows_abort(
+        self, workflow_id: str, fatal: bool = True
+    ) -> Dict[str, Any]:
+        """POST /api/workflows/{version}/{id}/abort
+
+        With `fatal=False`, an error response (e.g. for a workflow that has
+        already finished) raises `APIError` instead of exiting.
+        """
 
         _, data = await self._api_call(
-            f"api/workflows/{{version}}/{workflow_id}/abort", method="POST"
+            f"api/workflows/{{version}}/{workflow_id}/abort",
+            method="POST",
+            fatal=fatal,
         )
         return data
 
-    async def post_workflows_release_hold(self) -> None:
+    async def post_workflows_release_hold(self, workflow_id: str) -> Dict[str, Any]:
         "POST /api/workflows/{version}/{id}/releaseHold"
-        raise NotImplementedError()
+
+        _, data = await self._api_call(
+            f"api/workflows/{{version}}/{workflow_id}/releaseHold", method="POST"
+        )
+        return data
 
     async def get_workflows_status(self) -> None:
         "GET /api/workflows/{version}/{id}/status"
@@ -276,7 +596,97 @@ class CromwellAPI:
             List: All workflows that match the provided parameters.
         """
 
-        params = {
+        params = self._workflows_query_params(
+            submission=submission,
+            start=start,
+            end=end,
+            statuses=statuses,
+            names=names,
+            ids=ids,
+            labels=labels,
+            labelors=labelors,
+            excludeLabelAnds=excludeLabelAnds,
+            excludeLabelOrs=excludeLabelOrs,
+            additionalQueryResultFields=additionalQueryResultFields,
+            includeSubworkflows=includeSubworkflows,
+        )
+
+        results, _ = await self._workflows_query_page(params)
+        return results
+
+    async def iter_workflows_query(
+        self,
+        page_size: int = DEFAULT_QUERY_PAGE_SIZE,
+        prefetch: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """GET /api/workflows/{version}/query, one page at a time.
+
+        Args:
+            page_size (int, optional): Number of workflows to request per page.
+            Defaults to DEFAULT_QUERY_PAGE_SIZE.
+            prefetch (bool, optional): Request the next page while the caller is
+            still consuming the current one. Defaults to True.
+            **kwargs: Any of the filters accepted by `get_workflows_query`.
+
+        Yields:
+            Dict: Each workflow that matches the provided parameters.
+        """
+
+        params = self._workflows_query_params(**kwargs)
+        params["pageSize"] = page_size
+
+        def fetch(
+            page: int,
+        ) -> "asyncio.Future[Tuple[List[Dict[str, Any]], Optional[int]]]":
+            return asyncio.ensure_future(
+                self._workflows_query_page({**params, "page": page})
+            )
+
+        page = 1
+        pending: Optional[
+            "asyncio.Future[Tuple[List[Dict[str, Any]], Optional[int]]]"
+        ] = fetch(page)
+        try:
+            while pending is not None:
+                results, total = await pending
+                pending = None
+
+                # stop on a short page or once the server's reported total is
+                # reached (in case `pageSize` is ignored by the server).
+                more = len(results) >= page_size and (
+                    total is None or page * page_size < total
+                )
+                if more and prefetch:
+                    pending = fetch(page + 1)
+
+                for result in results:
+                    yield result
+
+                if more:
+                    page += 1
+                    if pending is None:
+                        pending = fetch(page)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    @staticmethod
+    def _workflows_query_params(
+        submission: Optional[Union[datetime.datetime, str]] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        statuses: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        labels: Optional[List[str]] = None,
+        labelors: Optional[List[str]] = None,
+        excludeLabelAnds: Optional[List[str]] = None,
+        excludeLabelOrs: Optional[List[str]] = None,
+        additionalQueryResultFields: Optional[List[str]] = None,
+        includeSubworkflows: Optional[bool] = True,
+    ) -> Dict[str, Any]:
+        return {
             "submission": submission,
             "start": start,
             "end": end,
@@ -291,23 +701,35 @@ class CromwellAPI:
             "includeSubworkflows": str(includeSubworkflows),
         }
 
+    async def _workflows_query_page(
+        self, params: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         _, data = await self._api_call("api/workflows/{version}/query", params=params)
         results = cast(List[Dict[str, Any]], data.get("results"))
-        if not results:
-            if not isinstance(results, list):
-                errors.report(
-                    "Expected 'results' key in response!",
-                    fatal=True,
-                    exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
-                )
-            else:
-                errors.report(
-                    "No results found in response!",
-                    fatal=True,
-                    exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
-                )
+        if not isinstance(results, list):
+            errors.report(
+                "Expected 'results' key in response!",
+                fatal=True,
+                exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
+            )
 
-        return results
+        return results, data.get("totalResultsCount")
+
+    async def count_workflows_query(self, **kwargs: Any) -> int:
+        """Counts the workflows matching a query without downloading them.
+
+        Args:
+            **kwargs: Any of the filters accepted by `get_workflows_query`.
+
+        Returns:
+            int: Number of matching workflows.
+        """
+
+        params = self._workflows_query_params(**kwargs)
+        params["pageSize"] = 1
+        params["page"] = 1
+        results, total = await self._workflows_query_page(params)
+        return total if total is not None else len(results)
 
     async def post_workflows_query(self) -> None:
         "POST /api/workflows/{version}/query"
@@ -324,6 +746,7 @@ class CromwellAPI:
         includeKey: Optional[List[str]] = None,
         excludeKey: Optional[List[str]] = None,
         expandSubWorkflows: Optional[bool] = False,
+        fields: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """GET /api/workflows/{version}/{id}/metadata
 
@@ -332,20 +755,46 @@ class CromwellAPI:
             includeKey (List[str], optional): Keys to include in results. Defaults to None.
             excludeKey (List[str], optional): Keys to exclude in results. Defaults to None.
             expandSubWorkflows (bool, optional): Whether to expand subworkflows in results. Defaults to False.
+            fields (List[str], optional): Metadata fields needed by the caller (see
+            `metadata_projection`), added to `includeKey`. Defaults to None.
 
         Returns:
             List: Metadata of specified workflow.
         """
 
+        keys = None
+        if fields:
+            includeKey = metadata_projection(fields + (includeKey or []))
+            if self.incremental_json:
+                keys = sorted(
+                    {f.split(".")[0] for f in fields} | set(METADATA_ALWAYS_INCLUDE)
+                )
+
         params = {
             "includeKey": includeKey,
             "excludeKey": excludeKey,
             "expandSubWorkflows": expandSubWorkflows,
         }
 
+        cache_key = None
+        if self.metadata_cache is not None:
+            cache_key = self.metadata_cache.key(self.server, id, params)
+            if not self.refresh_cache:
+                cached = await asyncio.to_thread(self.metadata_cache.get, cache_key)
+                if cached is not None:
+                    logger.debug("Using cached metadata for %s.", id)
+                    return cached
+
         _, data = await self._api_call(
-            f"api/workflows/{{version}}/{id}/metadata", params=params
+            f"api/workflows/{{version}}/{id}/metadata", params=params, keys=keys
         )
+
+        if cache_key is not None and data.get("status") in cache.TERMINAL_STATUSES:
+            assert self.metadata_cache is not None
+            await asyncio.to_thread(
+                self.metadata_cache.put, cache_key, self.server, id, data
+            )
+
         return data
 
     async def get_workflows_call_caching_diff(self) -> None:
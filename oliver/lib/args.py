@@ -44,6 +44,95 @@ def add_batches_interval_arg(
     )
 
 
+def add_max_concurrent_requests_arg(
+    parser: argparse._ActionsContainer,  # pylint: disable=protected-access
+) -> None:
+    parser.add_argument(
+        "--max-concurrent-requests",
+        help="Maximum number of requests to the Cromwell server in flight at once.",
+        type=int,
+    )
+
+
+def add_submissions_per_second_arg(
+    parser: argparse._ActionsContainer,  # pylint: disable=protected-access
+) -> None:
+    parser.add_argument(
+        "--submissions-per-second",
+        help="Maximum number of workflows to submit to the Cromwell server each second.",
+        type=float,
+    )
+
+
+def add_scheduling_group(parser: argparse.ArgumentParser) -> None:
+    """Adds arguments for holding back submissions while Cromwell is busy."""
+
+    scheduling = parser.add_argument_group("scheduling")
+    scheduling.add_argument(
+        "--high-water-mark",
+        help="Only submit (or release) workflows while fewer than this many "
+        "workflows are Submitted or Running on the Cromwell server.",
+        type=int,
+    )
+    scheduling.add_argument(
+        "--poll-interval",
+        help="Seconds between checks of how busy the Cromwell server is.",
+        type=float,
+    )
+    scheduling.add_argument(
+        "--on-hold",
+        help="Submit workflows on hold. With --high-water-mark, they are then "
+        "released in waves as the server has room for them.",
+        default=False,
+        action="store_true",
+    )
+
+
+def add_transport_group(parser: argparse.ArgumentParser) -> None:
+    """Adds arguments for tuning the connection to the Cromwell server."""
+
+    transport = parser.add_argument_group("transport")
+    transport.add_argument(
+        "--cromwell-socket",
+        help="Connect to Cromwell through this Unix domain socket instead of TCP.",
+    )
+    transport.add_argument(
+        "--connection-limit-per-host",
+        help="Maximum number of simultaneous connections to the Cromwell server.",
+        type=int,
+    )
+    transport.add_argument(
+        "--keepalive-timeout",
+        help="Seconds to keep idle connections open for reuse.",
+        type=float,
+    )
+    transport.add_argument(
+        "--dns-cache-ttl", help="Seconds to cache DNS lookups for.", type=int
+    )
+    transport.add_argument(
+        "--connect-timeout",
+        help="Seconds to wait for a connection to the Cromwell server (default: 30).",
+        type=float,
+    )
+    transport.add_argument(
+        "--read-timeout",
+        help="Seconds to wait between reads of a response from the Cromwell server "
+        "(default: 300).",
+        type=float,
+    )
+    transport.add_argument(
+        "--max-retries",
+        help="Maximum number of times to retry a request after a transient failure.",
+        type=int,
+    )
+    transport.add_argument(
+        "--no-compression",
+        help="Do not ask the Cromwell server to compress responses.",
+        default=False,
+        action="store_true",
+    )
+
+
 def add_batches_group(
     parser: argparse._ActionsContainer,  # pylint: disable=protected-access
     required: bool = False,
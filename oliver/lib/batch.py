@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import pendulum
 from logzero import logger
@@ -7,7 +7,7 @@ from . import errors
 
 
 def get_workflow_batches(
-    workflows: List[Dict[str, Any]],
+    workflows: Iterable[Dict[str, Any]],
     batches: Union[int, List[int], bool],
     batch_interval_mins: Optional[int] = 5,
     relative: Optional[bool] = False,
@@ -15,8 +15,8 @@ def get_workflow_batches(
     """Returns all workflows where the derived batch number is included in `batches`.
 
     args:
-        workflows (List[dict]): list of workflows returned from cromwell. must
-                                contain the `submission` key.
+        workflows (Iterable[dict]): workflows returned from cromwell, sorted by
+                                submission time. must contain the `submission` key.
         batches(Union[bool, int, List[int]]): batches to be returned. if `True`, returns all batches.
                                         if a single integer, returns a single batch. if a list of integers,
                                         batches that match the specified numbers.
@@ -62,7 +62,7 @@ def get_workflow_batches(
 
 
 def batch_workflows(
-    workflows: List[Dict[str, Any]], batch_interval_mins: Optional[int] = 5
+    workflows: Iterable[Dict[str, Any]], batch_interval_mins: Optional[int] = 5
 ) -> Tuple[List[Dict[str, Any]], int]:
     """Batches workflows based on their `submission` key and a time interval.
 
@@ -72,19 +72,23 @@ def batch_workflows(
     and the last job's submission time. If the difference is `batch_interval_mins`
     or more, we increase the batch count by 1.
 
+    `workflows` is only iterated over once, so it can be a generator that
+    streams results from Cromwell.
+
     Args:
-        workflows (List[Dict]): list of workflows returned from Cromwell. Must
-                                contain the `submission` key.
+        workflows (Iterable[Dict]): workflows returned from Cromwell, sorted by
+                                    submission time. Must contain the `submission` key.
         batch_interval_mins (int, optional): interval to constitute a new batch
                                              in minutes. Defaults to 5.
 
     Returns:
-        List[Dict], int: The first returned value is the `workflows` list that was
-                         passed in, but with a new `batch` key added to each entry
+        List[Dict], int: The first returned value is a list of the `workflows`
+                         that were passed in, but with a new `batch` key added to each entry
                          denoting the computed batch. The second returned value is the
                          maximum batch number.
     """
 
+    results = []
     batch_num = 0
     last_submission_time = None
     for w in workflows:
@@ -110,5 +114,6 @@ def batch_workflows(
                 batch_num += 1
         w["batch"] = batch_num
         last_submission_time = t
+        results.append(w)
 
-    return workflows, batch_num
+    return results, batch_num
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from typing import Any, Dict, Optional
+
+from logzero import logger
+
+DEFAULT_LOCATION = "~/.oliver_cache"
+DEFAULT_MAX_SIZE_MB = 1024
+DATABASE_NAME = "metadata.sqlite3"
+
+# metadata for workflows in these statuses never changes, so it is safe to cache.
+TERMINAL_STATUSES = ["Succeeded", "Failed", "Aborted"]
+
+
+class MetadataCache:
+    """On-disk cache of workflow metadata backed by SQLite.
+
+    Payloads are stored zlib-compressed and keyed by the Cromwell server, the
+    workflow id and the parameters of the metadata request (e.g. the
+    `includeKey`/`excludeKey` projection). Once the total size of the stored
+    payloads exceeds `max_size_mb`, the least recently used entries are
+    evicted.
+
+    The database is only opened on first use. If it can't be opened or used
+    (e.g. the cache directory isn't writable), the error is logged and the
+    cache is disabled for the rest of the run, so a broken cache never stops
+    oliver from working.
+    """
+
+    def __init__(
+        self,
+        location: Optional[str] = None,
+        max_size_mb: Optional[int] = None,
+    ):
+        self.location = os.path.expanduser(location or DEFAULT_LOCATION)
+        self.max_size = (max_size_mb or DEFAULT_MAX_SIZE_MB) * 1024 * 1024
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.disabled = False
+
+    def _disable(self, error: Exception) -> None:
+        logger.warning("Disabling the metadata cache: %s", error)
+        self.disabled = True
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def key(server: str, workflow_id: str, params: Dict[str, Any]) -> str:
+        """Computes the cache key for a metadata request."""
+
+        normalized = {
+            k: sorted(v) if isinstance(v, list) else v for k, v in params.items() if v
+        }
+        raw = json.dumps([server, workflow_id, normalized], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(self.location, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.path.join(self.location, DATABASE_NAME),
+                check_same_thread=False,
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "key TEXT PRIMARY KEY, "
+                "server TEXT, "
+                "workflow_id TEXT, "
+                "payload BLOB, "
+                "size INTEGER, "
+                "last_accessed REAL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached metadata for `key`, if any."""
+
+        with self._lock:
+            if self.disabled:
+                return None
+            try:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT payload FROM metadata WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute(
+                    "UPDATE metadata SET last_accessed = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                connection.commit()
+            except (OSError, sqlite3.Error) as e:
+                self._disable(e)
+                return None
+
+        try:
+            return json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError) as e:
+            logger.warning("Could not read from metadata cache: %s", e)
+            return None
+
+    def put(
+        self, key: str, server: str, workflow_id: str, metadata: Dict[str, Any]
+    ) -> None:
+        """Stores `metadata` under `key`, evicting old entries if needed."""
+
+        payload = zlib.compress(json.dumps(metadata).encode("utf-8"))
+        with self._lock:
+            if self.disabled:
+                return
+            try:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, server, workflow_id, payload, len(payload), time.time()),
+                )
+                self._evict(connection)
+                connection.commit()
+            except (OSError, sqlite3.Error) as e:
+                self._disable(e)
+
+    def invalidate(self, server: str, workflow_id: str) -> None:
+        """Removes every entry for a workflow (e.g. after its labels change)."""
+
+        with self._lock:
+            if self.disabled:
+                return
+            try:
+                connection = self._connect()
+                connection.execute(
+                    "DELETE FROM metadata WHERE server = ? AND workflow_id = ?",
+                    (server, workflow_id),
+                )
+                connection.commit()
+            except (OSError, sqlite3.Error) as e:
+                self._disable(e)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        (total,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM metadata"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+
+        evicted = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM metadata ORDER BY last_accessed"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            evicted.append((key,))
+            total -= size
+
+        connection.executemany("DELETE FROM metadata WHERE key = ?", evicted)
+        logger.debug("Evicted %d entries from the metadata cache.", len(evicted))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,182 @@
+import asyncio
+import time
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from logzero import logger
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 20
+DEFAULT_SUBMISSIONS_PER_SECOND = 10.0
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Progress:
+    """Reports progress of a fixed number of tasks to the log.
+
+    A message is logged each time another `step` percent of the tasks have
+    completed (and once more when everything is done) so that large fan-outs
+    don't flood the terminal.
+    """
+
+    def __init__(self, total: int, description: str = "tasks", step: int = 10):
+        self.total = total
+        self.description = description
+        self.step = max(step, 1)
+        self.completed = 0
+        self._last_reported = 0
+
+    def update(self, n: int = 1) -> None:
+        self.completed += n
+        if self.total <= 0:
+            return
+
+        percent = (self.completed * 100) // self.total
+        if percent - self._last_reported >= self.step or self.completed == self.total:
+            self._last_reported = percent
+            logger.info(
+                "Completed %d/%d %s (%d%%).",
+                self.completed,
+                self.total,
+                self.description,
+                percent,
+            )
+
+
+async def gather_with_limit(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    limit: Optional[int] = None,
+    description: str = "requests",
+) -> List[R]:
+    """Applies `func` to every item in `items`, keeping at most `limit` calls
+    in flight at any one time.
+
+    Args:
+        func (Callable): Coroutine function to call with each item.
+        items (Iterable): Items to process.
+        limit (int, optional): Maximum number of calls in flight. Defaults to
+        `DEFAULT_MAX_CONCURRENT_REQUESTS`.
+        description (str, optional): Description of the work used when
+        reporting progress. Defaults to "requests".
+
+    Returns:
+        List: Results of each call, in the same order as `items`.
+    """
+
+    _items = list(items)
+    if not limit or limit < 1:
+        limit = DEFAULT_MAX_CONCURRENT_REQUESTS
+
+    results: List[Optional[R]] = [None] * len(_items)
+    progress = Progress(len(_items), description=description)
+    pending = iter(enumerate(_items))
+
+    async def worker() -> None:
+        # the iterator is shared between workers, which is safe because
+        # there is no `await` between pulling the next item and claiming it.
+        for idx, item in pending:
+            results[idx] = await func(item)
+            progress.update()
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(limit, len(_items)))]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for w in workers:
+            w.cancel()
+        raise
+
+    return results  # type: ignore
+
+
+async def iter_with_limit(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    limit: Optional[int] = None,
+    description: str = "requests",
+) -> AsyncIterator[Tuple[T, R]]:
+    """Like `gather_with_limit`, but yields `(item, result)` pairs as soon as
+    each call completes rather than waiting for all of them.
+
+    Args:
+        func (Callable): Coroutine function to call with each item.
+        items (Iterable): Items to process.
+        limit (int, optional): Maximum number of calls in flight. Defaults to
+        `DEFAULT_MAX_CONCURRENT_REQUESTS`.
+        description (str, optional): Description of the work used when
+        reporting progress. Defaults to "requests".
+
+    Yields:
+        Tuple: Each item and the result of calling `func` with it, in order of
+        completion.
+    """
+
+    _items = list(items)
+    if not limit or limit < 1:
+        limit = DEFAULT_MAX_CONCURRENT_REQUESTS
+
+    progress = Progress(len(_items), description=description)
+    pending = iter(_items)
+    completed: "asyncio.Queue[Tuple[T, R]]" = asyncio.Queue()
+
+    async def worker() -> None:
+        for item in pending:
+            completed.put_nowait((item, await func(item)))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(limit, len(_items)))]
+    workers_done = asyncio.gather(*workers)
+    try:
+        for _ in _items:
+            getter = asyncio.ensure_future(completed.get())
+            waiting: List["asyncio.Future[Any]"] = [getter, workers_done]
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if workers_done.done() and workers_done.exception() is not None:
+                getter.cancel()
+                workers_done.result()
+            item_and_result = await getter
+            progress.update()
+            yield item_and_result
+    finally:
+        for w in workers:
+            w.cancel()
+
+
+class RateLimiter:
+    """Spaces calls out so that at most `rate` of them start each second.
+
+    `rate` defaults to `DEFAULT_SUBMISSIONS_PER_SECOND`, and a `rate` of zero
+    disables the limit.
+    """
+
+    def __init__(self, rate: Optional[float] = None):
+        if rate is None:
+            rate = DEFAULT_SUBMISSIONS_PER_SECOND
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next_start = 0.0
+
+    async def wait(self, n: int = 1) -> None:
+        """Waits until the next `n` calls are allowed to start (e.g. when `n`
+        workflows are sent in a single request)."""
+
+        if not self.interval:
+            return
+
+        # claim the next slots before sleeping so that concurrent callers
+        # queue up behind each other.
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval * n
+        if start > now:
+            await asyncio.sleep(start - now)
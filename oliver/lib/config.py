@@ -8,9 +8,44 @@ DEFAULT_CONFIG = {
     "cromwell_server": (str, "http://localhost:8000"),
     "cromwell_api_version": (str, "v1"),
     "batch_interval_mins": (int, 2),
+    "max_concurrent_requests": (int, 20),
 }
 REQUIRED_ARGS = ["cromwell_server", "cromwell_api_version", "batch_interval_mins"]
 
+# keys that are not part of the default config (and so are not asked about by
+# `oliver configure`), but whose values should still be stored as these types.
+OPTIONAL_CONFIG = {
+    "metadata_cache_dir": str,
+    "metadata_cache_max_size_mb": int,
+    "no_cache": bool,
+    "incremental_json": bool,
+    "cromwell_socket": str,
+    "connection_limit_per_host": int,
+    "keepalive_timeout": float,
+    "dns_cache_ttl": int,
+    "connect_timeout": float,
+    "read_timeout": float,
+    "no_compression": bool,
+    "max_retries": int,
+    "submissions_per_second": float,
+    "high_water_mark": int,
+    "poll_interval": float,
+    "cosmos_endpoint": str,
+    "cosmos_credentials_ttl_hours": float,
+    "blob_endpoint": str,
+}
+
+# secrets that are never read from or written to the config file (which is
+# readable by anyone the user's umask allows), only passed on the command line
+# or in the environment.
+SECRET_KEYS = ["cosmos_key"]
+
+
+def _coerce(value: Any, _type: Any) -> Any:
+    if _type is bool and isinstance(value, str):
+        return value.lower() in ["true", "yes", "y", "1"]
+    return _type(value)
+
 
 def get_default_config() -> Dict[str, Any]:
     default_config = {}
@@ -26,18 +61,24 @@ def read_config(config_file: str = DEFAULT_LOCATION) -> Any:
         return {}
 
     with open(path, mode="r", encoding="utf-8") as f:
-        return json.load(f)
+        config = json.load(f)
+    return {k: v for k, v in config.items() if k not in SECRET_KEYS}
 
 
 def write_config(
     config: Dict[str, Tuple[Any, Any]], config_file: str = DEFAULT_LOCATION
 ) -> None:
     path = os.path.expanduser(config_file)
+    config = {k: v for k, v in config.items() if k not in SECRET_KEYS}
     for key in config.keys():
+        _type = None
         if DEFAULT_CONFIG.get(key):
             (_type, _default) = DEFAULT_CONFIG[key]
-            if not isinstance(config.get(key), _type):
-                config[key] = _type(config.get(key))
+        elif OPTIONAL_CONFIG.get(key):
+            _type = OPTIONAL_CONFIG[key]
+
+        if _type is not None and not isinstance(config.get(key), _type):
+            config[key] = _coerce(config.get(key), _type)
 
     with open(path, mode="w", encoding="utf-8") as f:
         json.dump(config, f, indent=4, sort_keys=True)
@@ -0,0 +1,94 @@
+"""JSON decoding for Cromwell responses.
+
+Responses are decoded straight from the raw bytes with the fastest parser
+available: `orjson` or `msgspec` when installed, the standard library
+otherwise. For very large responses, `loads_keys` can pull out a handful of
+top-level keys incrementally with `ijson` (when installed) without ever
+building the rest of the document. All three are installed by the
+`fast-json` extra.
+"""
+
+import io
+import json
+
+from typing import Any, Dict, Iterable
+
+# pylint: disable=invalid-name
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # pragma: no cover
+    ijson = None  # type: ignore
+# pylint: enable=invalid-name
+
+
+def backend() -> str:
+    """Returns the name of the library used by `loads`."""
+
+    if orjson is not None:
+        return "orjson"
+    if msgspec is not None:
+        return "msgspec"
+    return "json"
+
+
+def loads(data: bytes) -> Any:
+    """Decodes a JSON document from raw bytes."""
+
+    if orjson is not None:
+        return orjson.loads(data)  # pylint: disable=no-member
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def loads_keys(data: bytes, keys: Iterable[str]) -> Dict[str, Any]:
+    """Decodes only the given top-level keys of a JSON object.
+
+    With `ijson` installed, the document is parsed as a stream of events and
+    only the values for `keys` are built, so memory usage does not depend on
+    the size of the keys that are skipped. Without it, this falls back to
+    decoding the whole document with `loads`.
+
+    Args:
+        data (bytes): A JSON object.
+        keys (Iterable[str]): Top-level keys to keep.
+
+    Returns:
+        Dict: The requested keys that were present in the document.
+    """
+
+    wanted = set(keys)
+
+    if ijson is None:
+        document = loads(data)
+        return {k: v for k, v in document.items() if k in wanted}
+
+    result: Dict[str, Any] = {}
+    key = ""
+    builder = None
+
+    for prefix, event, value in ijson.parse(io.BytesIO(data), use_float=True):
+        if prefix == "" and event in ("map_key", "end_map"):
+            # the previous top-level value (if any) is complete.
+            if builder is not None:
+                result[key] = builder.value
+                builder = None
+            if event == "map_key":
+                key = value
+                if key in wanted:
+                    builder = ObjectBuilder()
+        elif builder is not None:
+            builder.event(event, value)
+
+    return result
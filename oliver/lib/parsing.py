@@ -1,3 +1,4 @@
+import csv
 import json
 import os
 import re
@@ -78,6 +79,68 @@ def parse_workflow_inputs(
     return json.dumps(inputs), json.dumps(options), json.dumps(labels)
 
 
+def parse_manifest(path: str) -> List[Dict[str, Dict[str, Any]]]:
+    """Parses a tab-separated manifest describing one workflow per row.
+
+    The first row is a header naming each column. Columns follow the same
+    conventions as inputs on the command line: columns starting with `%` are
+    labels, columns starting with `@` are workflow options and every other
+    column is a workflow input. The `job_name` and `job_group` columns set the
+    oliver job name and group of each workflow. Empty cells are skipped, and
+    cells holding a JSON array or object are decoded.
+
+    Args:
+        path (str): Path to the manifest.
+
+    Returns:
+        List[Dict]: The `inputs`, `options` and `labels` for each row.
+    """
+
+    rows = []
+    with open(path, mode="r", encoding="utf-8", newline="") as f:
+        for line, row in enumerate(csv.DictReader(f, delimiter="\t"), start=2):
+            inputs: Dict[str, Any] = {}
+            options: Dict[str, Any] = {}
+            labels: Dict[str, Any] = {}
+
+            for column, value in row.items():
+                if column is None or not isinstance(value, str):
+                    errors.report(
+                        f"Row {line} of {path} has "
+                        f"{'more' if column is None else 'fewer'} cells than the header.",
+                        fatal=True,
+                        exitcode=errors.ERROR_INVALID_INPUT,
+                    )
+
+                value = value.strip()
+                if not value:
+                    continue
+                if value[0] in "[{":
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        errors.report(
+                            f"Could not parse JSON in column '{column}' on row {line} of {path}.",
+                            fatal=True,
+                            exitcode=errors.ERROR_INVALID_INPUT,
+                        )
+
+                if column == "job_name":
+                    labels[constants.OLIVER_JOB_NAME_KEY] = value
+                elif column == "job_group":
+                    labels[constants.OLIVER_JOB_GROUP_KEY] = value
+                elif column.startswith("%"):
+                    labels[column[1:]] = value
+                elif column.startswith("@"):
+                    options[column[1:]] = value
+                else:
+                    inputs[column] = value
+
+            rows.append({"inputs": inputs, "options": options, "labels": labels})
+
+    return rows
+
+
 def parse_cmdline_arg(arg: str) -> Tuple[str, str, Dict[str, Any]]:
     # We step through this list in order and check if it matches. In this scenario, its
     # important that `inputs` remains last as it matches the patterns before it
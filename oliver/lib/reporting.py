@@ -65,6 +65,16 @@ def duration_to_text(duration: timedelta) -> str:
     return " ".join(parts)
 
 
+def size_to_text(size: Union[int, float]) -> str:
+    "Returns a human readable size given a number of bytes."
+
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if abs(size) < 1024 or unit == "TiB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+
+
 # pylint: disable=too-many-locals,too-many-branches
 def print_dicts_as_table(
     rows: List[Dict[str, Any]],
@@ -0,0 +1,113 @@
+import asyncio
+import email.utils
+import random
+import time
+
+from collections import deque
+from typing import Deque, Optional
+
+from logzero import logger
+
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+
+# status codes that indicate a transient problem with the server.
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a `Retry-After` header (either seconds or an HTTP date).
+
+    Returns:
+        float: seconds to wait, or None if the header is missing or invalid.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient request failures.
+
+    Each retry waits a random amount of time between zero and
+    `base_delay * 2 ** attempt` (capped at `max_delay`), unless the server
+    told us how long to wait with a `Retry-After` header.
+    """
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self.max_retries = DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Returns how long to wait before retry number `attempt` (from 0)."""
+
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return server_delay
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """Pauses all requests to a struggling server.
+
+    The outcome of the last `window` requests is tracked. Once at least
+    `threshold` of them have failed, the breaker opens and every request
+    waits for `cooldown` seconds before being sent, so that a server which is
+    already overloaded isn't hit by every worker retrying at once.
+    """
+
+    def __init__(
+        self, window: int = 20, threshold: float = 0.5, cooldown: float = 10.0
+    ):
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.trips = 0
+
+    async def wait(self) -> None:
+        """Waits until the breaker is closed."""
+
+        delay = self.open_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, success: bool) -> None:
+        """Records the outcome of a request, opening the breaker if needed."""
+
+        self.outcomes.append(success)
+        if success or len(self.outcomes) < (self.outcomes.maxlen or 0) // 2:
+            return
+
+        failures = self.outcomes.count(False)
+        now = time.monotonic()
+        if failures / len(self.outcomes) >= self.threshold and now >= self.open_until:
+            self.open_until = now + self.cooldown
+            self.trips += 1
+            self.outcomes.clear()
+            logger.warning(
+                "%d of the last requests to Cromwell failed. Pausing all requests for %.0f seconds.",
+                failures,
+                self.cooldown,
+            )
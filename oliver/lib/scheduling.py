@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+from typing import Any, Dict, List, Optional
+
+from logzero import logger
+
+from . import api, concurrency
+
+DEFAULT_POLL_INTERVAL = 30.0
+
+# workflows in these statuses are competing for the server's resources.
+ACTIVE_STATUSES = ["Submitted", "Running"]
+
+
+class BackpressureScheduler:
+    """Holds back new work while the Cromwell server is busy.
+
+    Before each submission (or release of a workflow on hold), the number of
+    `Submitted` and `Running` workflows on the server is compared to
+    `high_water_mark`, and the caller waits until there is room. The count is
+    polled at most every `poll_interval` seconds; in between, workflows
+    released by this scheduler are added to the last count so that concurrent
+    callers cannot overshoot the mark.
+    """
+
+    def __init__(
+        self,
+        cromwell: api.CromwellAPI,
+        high_water_mark: int,
+        poll_interval: Optional[float] = None,
+    ):
+        self.cromwell = cromwell
+        self.high_water_mark = high_water_mark
+        self.poll_interval = (
+            DEFAULT_POLL_INTERVAL if poll_interval is None else poll_interval
+        )
+        self._active: Optional[int] = None
+        self._polled_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _poll(self) -> int:
+        if (
+            self._active is None
+            or time.monotonic() - self._polled_at >= self.poll_interval
+        ):
+            self._active = await self.cromwell.count_workflows_query(
+                statuses=ACTIVE_STATUSES, includeSubworkflows=False
+            )
+            self._polled_at = time.monotonic()
+        return self._active
+
+    async def acquire(self, n: int = 1) -> None:
+        """Waits until `n` more workflows can be started without exceeding the
+        high-water mark.
+
+        A request for more workflows than the mark allows is let through once
+        the server is idle, so that large batches still make progress.
+        """
+
+        async with self._lock:
+            while True:
+                active = await self._poll()
+                if active + n <= self.high_water_mark or active == 0:
+                    self._active = active + n
+                    return
+
+                logger.info(
+                    "%d workflows are active (high-water mark is %d). Waiting %.0f seconds.",
+                    active,
+                    self.high_water_mark,
+                    self.poll_interval,
+                )
+                await asyncio.sleep(self.poll_interval)
+
+    async def release_holds(
+        self,
+        workflow_ids: List[str],
+        max_concurrent_requests: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Releases workflows that were submitted on hold in waves, keeping the
+        server below the high-water mark.
+
+        Args:
+            workflow_ids (List[str]): Workflows to release, in order.
+            max_concurrent_requests (int, optional): maximum number of release
+            requests in flight at once. Defaults to
+            `concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS`.
+
+        Returns:
+            List[Dict]: Cromwell's response for each workflow, in the same order
+            as `workflow_ids`.
+        """
+
+        async def release(workflow_id: str) -> Dict[str, Any]:
+            await self.acquire()
+            return await self.cromwell.post_workflows_release_hold(workflow_id)
+
+        return await concurrency.gather_with_limit(
+            release,
+            workflow_ids,
+            limit=max_concurrent_requests,
+            description="workflow releases",
+        )
+
+
+def get_scheduler(
+    cromwell: api.CromwellAPI, args: Dict[str, Any]
+) -> Optional[BackpressureScheduler]:
+    """Returns a scheduler if a high-water mark was given in `args`."""
+
+    if not args.get("high_water_mark"):
+        return None
+
+    return BackpressureScheduler(
+        cromwell, args["high_water_mark"], poll_interval=args.get("poll_interval")
+    )
@@ -0,0 +1,374 @@
+import concurrent.futures
+import csv
+import errno
+import io
+import os
+import shutil
+import threading
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from logzero import logger
+
+from . import concurrency
+
+COPY_MODES = ["copy", "hardlink", "reflink"]
+DEFAULT_MAX_WORKERS = 8
+MANIFEST_NAME = ".oliver-manifest.tsv"
+MANIFEST_FIELDS = ["source", "destination", "size", "fingerprint", "status", "error"]
+
+# statuses of a file that doesn't need to be transferred again.
+COMPLETE_STATUSES = ["copied", "skipped"]
+
+# ioctl request to share the blocks of one file with another on filesystems
+# that support it (btrfs, XFS, ...), from <linux/fs.h>.
+FICLONE = 0x40049409
+
+# errors meaning a fast path isn't available for this pair of files, so the
+# next one should be tried.
+FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EPERM,
+}
+
+# suffix of a file that is still being written.
+PARTIAL_SUFFIX = ".oliver-partial"
+
+
+def is_up_to_date(source: str, destination: str) -> bool:
+    """Whether `destination` already holds a copy of `source`, judged by its
+    size and modification time."""
+
+    try:
+        src, dst = os.stat(source), os.stat(destination)
+    except FileNotFoundError:
+        return False
+    return src.st_size == dst.st_size and int(src.st_mtime) == int(dst.st_mtime)
+
+
+def is_transferred(
+    source: str, destination: str, manifest: Optional["Manifest"] = None
+) -> bool:
+    """Whether `source` was already copied to `destination`, either according
+    to `manifest` or because `is_up_to_date` says so."""
+
+    if manifest and os.path.exists(destination):
+        try:
+            size, version = fingerprint(source)
+        except FileNotFoundError:
+            return False
+        if manifest.is_complete(source, destination, size, version):
+            return True
+    return is_up_to_date(source, destination)
+
+
+def duplicate_destinations(pairs: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Returns the sources of every destination that more than one file would
+    be transferred to (such as outputs of different shards that share a
+    basename), keyed by destination."""
+
+    sources: Dict[str, List[str]] = {}
+    for source, destination in pairs:
+        sources.setdefault(destination, []).append(source)
+    return {d: s for d, s in sources.items() if len(s) > 1}
+
+
+def fingerprint(path: str) -> Tuple[int, str]:
+    """Returns the size of a local file and a fingerprint of its version.
+
+    This is its modification time (`mtime:<seconds>`) rather than a digest of
+    its contents, which would mean reading every byte of large files on each
+    run."""
+
+    st = os.stat(path)
+    return st.st_size, f"mtime:{int(st.st_mtime)}"
+
+
+class Manifest:
+    """Record of the files transferred into an output folder.
+
+    Each entry holds the `source`, `destination`, `size`, `fingerprint` (the
+    ETag of a blob or S3 object, or the modification time of a local file, see
+    `fingerprint`) and `status` of a file, keyed by its destination. A rerun consults the manifest to transfer only files
+    that are missing or have changed since they were last transferred.
+
+    With a `journal`, every entry is appended to that file as soon as it is
+    recorded, so an interrupted run loses nothing; the manifest is compacted
+    to a single entry per file by `save`.
+    """
+
+    def __init__(
+        self,
+        entries: Optional[Dict[str, Dict[str, Any]]] = None,
+        journal: Optional[str] = None,
+    ):
+        self.entries = entries or {}
+        self.journal = journal
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse(text: str) -> Dict[str, Dict[str, Any]]:
+        """Parses manifest entries. Later entries for a destination replace
+        earlier ones."""
+
+        entries = {}
+        for row in csv.DictReader(io.StringIO(text), delimiter="\t"):
+            if row.get("destination"):
+                entries[row["destination"]] = dict(row)
+        return entries
+
+    @classmethod
+    def load(cls, path: str, journal: bool = True) -> "Manifest":
+        """Loads the local manifest at `path` (if it exists) and, with
+        `journal`, journals new entries to it."""
+
+        entries = {}
+        if os.path.exists(path):
+            with open(path, mode="r", encoding="utf-8", newline="") as f:
+                entries = cls.parse(f.read())
+        return cls(entries, journal=path if journal else None)
+
+    def is_complete(
+        self, source: str, destination: str, size: Any, version: Optional[str]
+    ) -> bool:
+        """Whether `source` was already transferred to `destination` and has not
+        changed since."""
+
+        entry = self.entries.get(destination)
+        return (
+            entry is not None
+            and entry.get("status") in COMPLETE_STATUSES
+            and entry.get("source") == source
+            and str(entry.get("size")) == str(size)
+            and bool(version)
+            and entry.get("fingerprint") == version
+        )
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Adds (or replaces) the entry for a destination."""
+
+        with self._lock:
+            self.entries[entry["destination"]] = entry
+            if self.journal:
+                os.makedirs(os.path.dirname(self.journal) or ".", exist_ok=True)
+                new = not os.path.exists(self.journal)
+                with open(self.journal, mode="a", encoding="utf-8", newline="") as f:
+                    writer = self._writer(f)
+                    if new:
+                        writer.writeheader()
+                    writer.writerow(entry)
+
+    @staticmethod
+    def _writer(f: Any) -> csv.DictWriter:
+        return csv.DictWriter(
+            f, fieldnames=MANIFEST_FIELDS, delimiter="\t", extrasaction="ignore"
+        )
+
+    def dumps(self) -> str:
+        """Serializes the manifest with one entry per destination."""
+
+        f = io.StringIO()
+        writer = self._writer(f)
+        writer.writeheader()
+        writer.writerows(self.entries.values())
+        return f.getvalue()
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically writes the compacted manifest to `path` (defaults to the
+        journal)."""
+
+        path = path or self.journal
+        if not path:
+            return
+
+        with self._lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path + PARTIAL_SUFFIX, mode="w", encoding="utf-8") as f:
+                f.write(self.dumps())
+            os.replace(path + PARTIAL_SUFFIX, path)
+
+
+def _reflink(fsrc: int, fdst: int) -> bool:
+    try:
+        import fcntl  # pylint: disable=import-outside-toplevel
+
+        fcntl.ioctl(fdst, FICLONE, fsrc)
+        return True
+    except (ImportError, OSError) as e:
+        if isinstance(e, OSError) and e.errno not in FALLBACK_ERRNOS:
+            raise
+        return False
+
+
+def _copy_range(fsrc: int, fdst: int, size: int) -> None:
+    """Copies `size` bytes inside the kernel, falling back to `sendfile` and
+    then to a userspace copy when the faster calls aren't supported."""
+
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                n = os.copy_file_range(fsrc, fdst, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            if copied >= size:
+                return
+        except OSError as e:
+            if e.errno not in FALLBACK_ERRNOS:
+                raise
+
+    if hasattr(os, "sendfile"):
+        try:
+            while copied < size:
+                n = os.sendfile(fdst, fsrc, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            if copied >= size:
+                return
+        except OSError as e:
+            if e.errno not in FALLBACK_ERRNOS:
+                raise
+
+    os.lseek(fsrc, copied, os.SEEK_SET)
+    os.lseek(fdst, copied, os.SEEK_SET)
+    with open(fsrc, "rb", closefd=False) as src, open(fdst, "wb", closefd=False) as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def copy_file(source: str, destination: str, mode: str = "copy") -> None:
+    """Copies a single file.
+
+    The file is written next to `destination` and only moved into place once
+    complete, and its modification time is preserved so that
+    `is_up_to_date` recognizes it on the next run.
+
+    Args:
+        source (str): File to copy.
+        destination (str): Where to copy it to.
+        mode (str, optional): One of `COPY_MODES`. `hardlink` and `reflink`
+        fall back to a regular copy when the source and destination are not on
+        a filesystem that supports them. Defaults to "copy".
+    """
+
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    partial = destination + PARTIAL_SUFFIX
+    if os.path.lexists(partial):
+        os.remove(partial)
+
+    if mode == "hardlink":
+        try:
+            os.link(source, partial)
+            os.replace(partial, destination)
+            return
+        except OSError as e:
+            if e.errno not in FALLBACK_ERRNOS:
+                raise
+
+    try:
+        with open(source, "rb") as src, open(partial, "wb") as dst:
+            if mode != "reflink" or not _reflink(src.fileno(), dst.fileno()):
+                _copy_range(src.fileno(), dst.fileno(), os.fstat(src.fileno()).st_size)
+        shutil.copystat(source, partial)
+        os.replace(partial, destination)
+    except BaseException:
+        if os.path.lexists(partial):
+            os.remove(partial)
+        raise
+
+
+def copy_files(
+    pairs: Iterable[Tuple[str, str]],
+    mode: str = "copy",
+    max_workers: Optional[int] = None,
+    manifest: Optional[Manifest] = None,
+) -> List[Dict[str, Any]]:
+    """Copies many files on a pool of threads.
+
+    Files whose destination already has the same size and modification time,
+    or that `manifest` shows were already copied and haven't changed since,
+    are skipped. Files sharing a destination with another file are not copied
+    at all and are reported as failed, since they would overwrite each other.
+
+    Args:
+        pairs (Iterable[Tuple[str, str]]): Source and destination of each file.
+        mode (str, optional): One of `COPY_MODES`. Defaults to "copy".
+        max_workers (int, optional): Number of files copied at once. Defaults
+        to `DEFAULT_MAX_WORKERS`.
+        manifest (Manifest, optional): If given, the outcome for each file is
+        recorded here as soon as it is known.
+
+    Returns:
+        List[Dict]: The `source`, `destination`, `size`, `fingerprint` and
+        `status` (one of "copied", "skipped" or "failed", with an `error`) of
+        each file, in the same order as `pairs`.
+    """
+
+    _pairs = list(pairs)
+    progress = concurrency.Progress(len(_pairs), description="files")
+    duplicates = duplicate_destinations(_pairs)
+
+    def transfer(pair: Tuple[str, str]) -> Dict[str, Any]:
+        source, destination = pair
+        result: Dict[str, Any] = {"source": source, "destination": destination}
+        if destination in duplicates:
+            result["status"] = "failed"
+            result["error"] = (
+                f"{len(duplicates[destination])} files would be copied to "
+                f"{destination}"
+            )
+            logger.error("Could not copy %s: %s", source, result["error"])
+            # the destination's manifest entry belongs to neither file.
+            return result
+
+        try:
+            result["size"], result["fingerprint"] = fingerprint(source)
+            if is_transferred(source, destination, manifest):
+                result["status"] = "skipped"
+            else:
+                copy_file(source, destination, mode=mode)
+                result["status"] = "copied"
+        except OSError as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+            logger.error("Could not copy %s to %s: %s", source, destination, e)
+
+        if manifest:
+            manifest.record(result)
+        return result
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers or DEFAULT_MAX_WORKERS
+    ) as pool:
+        futures = [pool.submit(transfer, pair) for pair in _pairs]
+        for _ in concurrent.futures.as_completed(futures):
+            progress.update()
+        results = [f.result() for f in futures]
+
+    if manifest:
+        manifest.save()
+
+    return results
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Counts the files (and bytes) copied, skipped and failed (and any other
+    status, such as "pending")."""
+
+    summary: Dict[str, Any] = {
+        "Copied": 0,
+        "Skipped": 0,
+        "Failed": 0,
+        "Bytes Copied": 0,
+    }
+    for r in results:
+        status = r["status"].capitalize()
+        summary[status] = summary.get(status, 0) + 1
+        if r["status"] == "copied":
+            summary["Bytes Copied"] += int(r.get("size", 0))
+    return summary
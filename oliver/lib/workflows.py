@@ -1,13 +1,67 @@
+import asyncio
 import datetime
-from typing import Any, Dict, List, Optional, Union
+import functools
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import pendulum
 from logzero import logger
 
-from . import api, batch, constants
+from . import api, batch, concurrency, constants
 
 
-# pylint: disable=too-many-arguments,too-many-locals
+# keys needed to assign a workflow to a batch.
+BATCHING_KEYS = ["id", "submission", "start"]
+
+
+def sort_by_submission(workflows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sorts workflows in place by their submission time (earliest first)."""
+
+    workflows.sort(
+        key=lambda k: pendulum.parse(k.get("submission", "")).timestamp()
+        if "submission" in k
+        else 0,
+    )
+    return workflows
+
+
+async def collect_workflows(
+    stream: AsyncIterator[Dict[str, Any]], keys: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """Consumes a stream of workflows from `CromwellAPI.iter_workflows_query`.
+
+    Only one page of the response is held at a time while the stream is read,
+    so memory grows with the number of workflows kept rather than with the
+    size of Cromwell's response. The workflows are then sorted in place.
+
+    Args:
+        stream (AsyncIterator[Dict]): workflows returned from Cromwell.
+        keys (List[str], optional): if provided, only these keys are kept for
+        each workflow, which keeps memory usage low when only a handful of
+        fields are needed from a large server history.
+
+    Returns:
+        List[Dict]: the workflows sorted by submission time.
+    """
+
+    workflows = []
+    async for w in stream:
+        if keys:
+            w = {k: w[k] for k in keys if k in w}
+        workflows.append(w)
+
+    return sort_by_submission(workflows)
+
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches
 async def get_workflows(
     cromwell: api.CromwellAPI,
     submission_time_hours_ago: Optional[int] = None,
@@ -22,6 +76,8 @@ async def get_workflows(
     opt_into_reporting_aborted_jobs: bool = False,
     opt_into_reporting_failed_jobs: bool = False,
     opt_into_reporting_succeeded_jobs: bool = False,
+    opt_into_reporting_submitted_jobs: bool = False,
+    opt_into_reporting_on_hold_jobs: bool = False,
 ) -> List[Dict[str, Any]]:
     """Retrieves a list of workflows and filter based on provided parameters.
 
@@ -91,28 +147,29 @@ async def get_workflows(
         explicitly opted into seeing `Succeeded` statuses. See the method's
         documentation for an explanation of how this works. Defaults to False.
 
+        opt_into_reporting_submitted_jobs (bool, optional): Whether the user
+        explicitly opted into seeing `Submitted` statuses. See the method's
+        documentation for an explanation of how this works. Defaults to False.
+
+        opt_into_reporting_on_hold_jobs (bool, optional): Whether the user
+        explicitly opted into seeing `On Hold` statuses. See the method's
+        documentation for an explanation of how this works. Defaults to False.
+
     Returns:
         List[Dict]: a list of workflows returned from the api and filtered per
         the given parameters.
     """
 
-    statuses = None  # none will show everything by default.
-
-    if (
-        opt_into_reporting_running_jobs
-        or opt_into_reporting_aborted_jobs
-        or opt_into_reporting_failed_jobs
-        or opt_into_reporting_succeeded_jobs
-    ):
-        statuses = []
-        if opt_into_reporting_running_jobs:
-            statuses.append("Running")
-        if opt_into_reporting_aborted_jobs:
-            statuses.append("Aborted")
-        if opt_into_reporting_failed_jobs:
-            statuses.append("Failed")
-        if opt_into_reporting_succeeded_jobs:
-            statuses.append("Succeeded")
+    opted_into_statuses = {
+        "Running": opt_into_reporting_running_jobs,
+        "Aborted": opt_into_reporting_aborted_jobs,
+        "Failed": opt_into_reporting_failed_jobs,
+        "Succeeded": opt_into_reporting_succeeded_jobs,
+        "Submitted": opt_into_reporting_submitted_jobs,
+        "On Hold": opt_into_reporting_on_hold_jobs,
+    }
+    # none will show everything by default.
+    statuses = [s for s, opted_in in opted_into_statuses.items() if opted_in] or None
 
     labels = []
     if oliver_job_name:
@@ -128,36 +185,227 @@ async def get_workflows(
             - datetime.timedelta(hours=submission_time_hours_ago)
         ).replace(microsecond=0).isoformat("T") + "Z"
 
-    workflows = await cromwell.get_workflows_query(
-        includeSubworkflows=False,
-        labels=labels,
-        ids=[cromwell_workflow_uuid] if cromwell_workflow_uuid else None,
-        names=[cromwell_workflow_name] if cromwell_workflow_name else None,
-        submission=submission,
-    )
-
-    workflows = sorted(
-        workflows,
-        key=lambda k: pendulum.parse(k.get("submission", "")).timestamp()
-        if "submission" in k
-        else 0,
-    )
-
-    if batches is not None:
+    query: Dict[str, Any] = {
+        "includeSubworkflows": False,
+        "labels": labels,
+        "ids": [cromwell_workflow_uuid] if cromwell_workflow_uuid else None,
+        "names": [cromwell_workflow_name] if cromwell_workflow_name else None,
+        "submission": submission,
+    }
+
+    if batches is None:
+        # without batching, every filter is handed straight to Cromwell, so
+        # only the workflows that are returned to the caller are ever held
+        # (never the rest of the server's history).
+        workflows = await collect_workflows(
+            cromwell.iter_workflows_query(statuses=statuses, **query)
+        )
+    else:
+        # batches are computed over _every_ workflow regardless of status, so
+        # we first stream the full set keeping only what is needed to assign
+        # batches. Unless every batch was requested without a status filter,
+        # a second query restricted to the requested statuses and to the
+        # submission window of the selected batches then fetches the
+        # workflows themselves.
+        two_phase = bool(statuses) or batches is not True
         workflows = batch.get_workflow_batches(
-            workflows,
+            await collect_workflows(
+                cromwell.iter_workflows_query(**query),
+                keys=BATCHING_KEYS if two_phase else None,
+            ),
             batches,
             batch_interval_mins=batch_interval_mins,
             relative=relative_batching,
         )
 
-    if statuses:
-        workflows = list(filter(lambda x: x["status"] in statuses, workflows))
+        if two_phase and workflows:
+            batch_by_id = {w["id"]: w["batch"] for w in workflows}
+            submission_times = [w.get("submission") for w in workflows]
+            if all(submission_times):
+                query["submission"] = submission_times[0]
+
+            workflows = []
+            for w in await collect_workflows(
+                cromwell.iter_workflows_query(statuses=statuses, **query)
+            ):
+                if w.get("id") in batch_by_id:
+                    w["batch"] = batch_by_id[w["id"]]
+                    workflows.append(w)
 
     logger.info("Found %d eligible workflows given search criteria.", len(workflows))
     return workflows
 
 
+async def get_metadatas(
+    cromwell: api.CromwellAPI,
+    workflow_ids: List[str],
+    max_concurrent_requests: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Get the metadata for many workflows concurrently.
+
+    Args:
+        cromwell (api.CromwellAPI): cromwell api connected to the cromwell
+        instance in question.
+
+        workflow_ids (List[str]): Cromwell-assigned UUIDs of the workflows in
+        question.
+
+        max_concurrent_requests (int, optional): maximum number of metadata
+        requests in flight at once. Defaults to
+        `concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS`.
+
+        fields (List[str], optional): metadata fields needed by the caller.
+        Only these fields are requested from Cromwell (see
+        `api.metadata_projection`). Defaults to all fields.
+
+    Returns:
+        Dict[str, Dict]: metadata for each workflow indexed by workflow id, in
+        the same order as `workflow_ids`.
+    """
+
+    metadatas = await concurrency.gather_with_limit(
+        functools.partial(cromwell.get_workflows_metadata, fields=fields),
+        workflow_ids,
+        limit=max_concurrent_requests,
+        description="workflow metadata requests",
+    )
+    return dict(zip(workflow_ids, metadatas))
+
+
+async def iter_calls(
+    cromwell: api.CromwellAPI,
+    workflow_id: str,
+    fields: Optional[List[str]] = None,
+    max_concurrent_requests: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, str, Dict[str, Any]]]:
+    """Walks the calls of a workflow and, recursively, of its sub-workflows.
+
+    Sub-workflows are fetched concurrently as soon as the call that launched
+    them is seen, and each sub-workflow is only fetched once even if several
+    calls refer to it. Calls are yielded as soon as the metadata for their
+    workflow arrives, so the order between workflows is not deterministic.
+
+    Args:
+        cromwell (api.CromwellAPI): cromwell api connected to the cromwell
+        instance in question.
+
+        workflow_id (str): Cromwell-assigned UUID of the root workflow.
+
+        fields (List[str], optional): metadata fields needed by the caller
+        (see `api.metadata_projection`). `calls.subWorkflowId` is always
+        requested. Defaults to all fields.
+
+        max_concurrent_requests (int, optional): maximum number of metadata
+        requests in flight at once. Defaults to
+        `concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS`.
+
+    Yields:
+        Tuple[str, str, Dict]: the id of the workflow the call belongs to, the
+        name of the call and the call itself (including calls that launched a
+        sub-workflow, which have a `subWorkflowId`).
+    """
+
+    if fields is not None and "calls.subWorkflowId" not in fields:
+        fields = fields + ["calls.subWorkflowId"]
+
+    slots = asyncio.Semaphore(
+        max_concurrent_requests or concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS
+    )
+    fetched: "asyncio.Queue[Union[Dict[str, Any], BaseException]]" = asyncio.Queue()
+    tasks = []
+
+    async def fetch(_id: str) -> None:
+        try:
+            async with slots:
+                metadata = await cromwell.get_workflows_metadata(_id, fields=fields)
+            fetched.put_nowait({"id": _id, **metadata})
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            fetched.put_nowait(e)
+
+    seen = {workflow_id}
+    tasks.append(asyncio.ensure_future(fetch(workflow_id)))
+    pending = 1
+
+    try:
+        while pending:
+            metadata = await fetched.get()
+            pending -= 1
+            if isinstance(metadata, BaseException):
+                raise metadata
+
+            for name, calls in metadata.get("calls", {}).items():
+                for _call in calls:
+                    sub_workflow_id = _call.get("subWorkflowId")
+                    if sub_workflow_id and sub_workflow_id not in seen:
+                        seen.add(sub_workflow_id)
+                        tasks.append(asyncio.ensure_future(fetch(sub_workflow_id)))
+                        pending += 1
+                    yield metadata["id"], name, _call
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def abort_workflows(
+    cromwell: api.CromwellAPI,
+    workflow_ids: List[str],
+    max_concurrent_requests: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Abort many workflows concurrently.
+
+    Aborts are retried by `cromwell` if they fail for a transient reason (see
+    `retry.RetryPolicy`). A workflow that Cromwell refuses to abort (e.g.
+    because it has already finished) is reported in the results rather than
+    stopping the remaining aborts.
+
+    Args:
+        cromwell (api.CromwellAPI): cromwell api connected to the cromwell
+        instance in question.
+
+        workflow_ids (List[str]): Cromwell-assigned UUIDs of the workflows to
+        abort.
+
+        max_concurrent_requests (int, optional): maximum number of abort
+        requests in flight at once. Defaults to
+        `concurrency.DEFAULT_MAX_CONCURRENT_REQUESTS`.
+
+        on_result (Callable, optional): called with the result for each
+        workflow as soon as its abort completes.
+
+    Returns:
+        List[Dict]: the result for each workflow (`Workflow ID`, `Status` and,
+        if the abort failed, `Message`), in the same order as `workflow_ids`.
+    """
+
+    async def abort(workflow_id: str) -> Dict[str, Any]:
+        try:
+            resp = await cromwell.post_workflows_abort(workflow_id, fatal=False)
+        except api.APIError as e:
+            resp = {"status": "error", "message": str(e)}
+
+        if resp.get("id"):
+            result = {"Workflow ID": resp["id"], "Status": resp.get("status")}
+        else:
+            result = {
+                "Workflow ID": workflow_id,
+                "Status": resp.get("status", "error"),
+                "Message": resp.get("message", ""),
+            }
+
+        if on_result:
+            on_result(result)
+        return result
+
+    return await concurrency.gather_with_limit(
+        abort,
+        workflow_ids,
+        limit=max_concurrent_requests,
+        description="workflow aborts",
+    )
+
+
 async def get_outputs(
     cromwell: api.CromwellAPI, cromwell_workflow_uuid: str
 ) -> Dict[str, Any]:
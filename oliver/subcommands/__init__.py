@@ -0,0 +1,54 @@
+"""Subcommands of `oliver`, one module each.
+
+Subcommands are registered lazily: only the module for the subcommand being
+run is imported (along with its dependencies, such as boto3 or the Azure SDK).
+Every other subcommand is registered with just the name, aliases and help text
+listed here, which each module's `register_subparser` also uses through
+`add_parser`.
+"""
+
+import argparse
+
+from typing import Any, Dict, List, Tuple
+
+SUBCOMMANDS: Dict[str, Tuple[List[str], str]] = {
+    "abort": (["kill", "k"], "Abort workflows running on a Cromwell server."),
+    "aggregate": ([], "Aggregate outputs from local cromwell run"),
+    "aws": ([], "All subcommands related to Cromwell on AWS."),
+    "azure": ([], "All subcommands related to Cromwell on Azure."),
+    "batches": (["b"], "Explore batches of jobs submitted to Cromwell."),
+    "configure": ([], "Configure Oliver with default options."),
+    "config": ([], "Set or get a single config value from Oliver."),
+    "inputs": ([], "Find all reported inputs for a given workflow."),
+    "inspect": (["i"], "Describe the state of a Cromwell workflow."),
+    "logs": (["l"], "Find all reported logs for a given workflow."),
+    "outputs": (["o"], "Find all reported outputs for a given workflow."),
+    "retry": (
+        ["re"],
+        "Resubmit a workflow with the same parameters. By default, only restarts workflows which are 'Failed' or 'Aborted'.",
+    ),
+    "runtime": (["ru"], "Get the runtime attributes used for a specific call."),
+    "status": (["st"], "Report various statistics about a running Cromwell server."),
+    "submit": (["su"], "Submit a workflow to the Cromwell server."),
+}
+
+
+def add_parser(
+    subparser: argparse._SubParsersAction,  # pylint: disable=protected-access
+    name: str,
+    **kwargs: Any,
+) -> argparse.ArgumentParser:
+    """Adds the parser for a subcommand, with its aliases and help text from
+    `SUBCOMMANDS`.
+
+    Args:
+        subparser (argparse._SubParsersAction): Subparsers action.
+        name (str): Name of the subcommand.
+        **kwargs: Passed to `add_parser` of the subparsers action.
+
+    Returns:
+        argparse.ArgumentParser: The subcommand's parser.
+    """
+
+    aliases, _help = SUBCOMMANDS[name]
+    return subparser.add_parser(name, aliases=aliases, help=_help, **kwargs)
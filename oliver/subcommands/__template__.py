@@ -3,12 +3,13 @@
 
 import argparse
 
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 from ..lib import api
+from ..subcommands import add_parser
 
+# the subcommand's aliases and help text are listed in `SUBCOMMANDS`.
 SUBCOMMAND_NAME = "__template__"
-SUBCOMMAND_ALIASES: List[str] = []
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -32,11 +33,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        SUBCOMMAND_NAME,
-        aliases=SUBCOMMAND_ALIASES,
-        help=__doc__.split("\n", maxsplit=1)[0],
-    )
+    subcommand = add_parser(subparser, SUBCOMMAND_NAME)
 
     subcommand.set_defaults(func=call)
     return subcommand
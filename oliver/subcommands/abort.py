@@ -1,9 +1,11 @@
 import argparse
+import json
 
 from typing import Any, Dict
 from logzero import logger
 
 from ..lib import api, reporting, args as _args, workflows as _workflows
+from ..subcommands import add_parser
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -14,49 +16,57 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
     """
 
     if args.get("cromwell_workflow_uuid"):
-        resp = await cromwell.post_workflows_abort(args["cromwell_workflow_uuid"])
-
-        if not resp.get("id"):
-            reporting.print_error_as_table(resp["status"], resp["message"])
-        else:
-            results = [{"Workflow ID": resp["id"], "Status": resp["status"]}]
-            reporting.print_dicts_as_table(results)
-        return
-
-    batches = None
-    relative = None
-
-    if args.get("batches_relative"):
-        batches = args.get("batches_relative")
-        relative = True
-    elif args.get("batches_absolute"):
-        batches = args.get("batches_absolute")
-        relative = False
-
-    workflows = await _workflows.get_workflows(
-        cromwell=cromwell,
-        oliver_job_name=args["job_name"],
-        oliver_job_group_name=args["job_group"],
-        cromwell_workflow_uuid=args["cromwell_workflow_uuid"],
-        batches=batches,
-        batch_interval_mins=args["batch_interval_mins"],
-        relative_batching=relative,
-        opt_into_reporting_running_jobs=True,
+        workflow_ids = [args["cromwell_workflow_uuid"]]
+    else:
+        batches = None
+        relative = None
+
+        if args.get("batches_relative"):
+            batches = args.get("batches_relative")
+            relative = True
+        elif args.get("batches_absolute"):
+            batches = args.get("batches_absolute")
+            relative = False
+
+        # only workflows that haven't finished can be aborted, so let Cromwell
+        # filter out everything else.
+        workflows = await _workflows.get_workflows(
+            cromwell=cromwell,
+            oliver_job_name=args["job_name"],
+            oliver_job_group_name=args["job_group"],
+            batches=batches,
+            batch_interval_mins=args["batch_interval_mins"],
+            relative_batching=relative,
+            opt_into_reporting_running_jobs=True,
+            opt_into_reporting_submitted_jobs=True,
+            opt_into_reporting_on_hold_jobs=True,
+        )
+
+        if not workflows:
+            logger.warning("No running jobs matching criteria found.")
+            return
+
+        workflow_ids = [w["id"] for w in workflows]
+
+    def print_ndjson(result: Dict[str, Any]) -> None:
+        print(json.dumps(result), flush=True)
+
+    results = await _workflows.abort_workflows(
+        cromwell,
+        workflow_ids,
+        max_concurrent_requests=args.get("max_concurrent_requests"),
+        on_result=print_ndjson if args.get("ndjson") else None,
     )
 
-    if not workflows:
-        logger.warning("No running jobs matching criteria found.")
-        return
+    if not args.get("ndjson"):
+        reporting.print_dicts_as_table(results, args.get("grid_style"))
 
-    for w in workflows:
-        resp = await cromwell.post_workflows_abort(w["id"])
-
-        if not resp.get("id"):
-            reporting.print_error_as_table(resp["status"], resp["message"])
-            continue
-
-        results = [{"Workflow ID": resp["id"], "Status": resp["status"]}]
-        reporting.print_dicts_as_table(results)
+    failed = sum(1 for r in results if "Message" in r)
+    logger.info(
+        "Aborted %d workflows (%d could not be aborted).",
+        len(results) - failed,
+        failed,
+    )
 
 
 def register_subparser(
@@ -68,11 +78,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "abort",
-        aliases=["kill", "k"],
-        help="Abort workflows running on a Cromwell server.",
-    )
+    subcommand = add_parser(subparser, "abort")
     scope_predicate = subcommand.add_mutually_exclusive_group(required=True)
     _args.add_batches_group(scope_predicate)
     _args.add_batches_interval_arg(subcommand)
@@ -88,5 +94,12 @@ def register_subparser(
         help="Any valid `tablefmt` for python-tabulate.",
         default="fancy_grid",
     )
+    subcommand.add_argument(
+        "--ndjson",
+        help="Print the result of each abort as a line of JSON as soon as it completes instead of a table.",
+        default=False,
+        action="store_true",
+    )
+    _args.add_max_concurrent_requests_arg(subcommand)
     subcommand.set_defaults(func=call)
     return subcommand
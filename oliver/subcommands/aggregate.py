@@ -1,30 +1,30 @@
 import argparse
+import asyncio
 import os
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 from ..lib import (
     api,
+    errors,
+    reporting,
+    transfer,
     workflows as _workflows,
 )
-from ..subcommands import outputs as _outputs
+from ..subcommands import add_parser, outputs as _outputs
 
 
-def process_output(dest_folder: str, output: str, dry_run: bool = False) -> None:
-    cmd = None
+def get_transfers(dest_folder: str, output: Any) -> List[Tuple[str, str]]:
+    """Returns the source and destination of each file in a workflow output
+    (which may be a single file or a list of files)."""
 
     if isinstance(output, list):
-        for o in output:
-            process_output(dest_folder, o, dry_run)
+        return [t for o in output for t in get_transfers(dest_folder, o)]
 
-        return
+    if not output or not isinstance(output, str):
+        return []
 
-    if output:
-        cmd = f"cp {output} {dest_folder}"
-        if dry_run:
-            print(cmd)
-        else:
-            os.system(cmd)
+    return [(output, os.path.join(dest_folder, os.path.basename(output)))]
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -43,20 +43,46 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         cromwell_workflow_uuid=args.get("workflow-id"),
     )
 
+    transfers = []
     for workflow in workflows:
         outputs = await _outputs.get_outputs(
             cromwell,
             workflow.get("id", ""),
         )
-        _this_output_folder = output_folder
+        for output in outputs:
+            transfers.extend(get_transfers(output_folder, output["Location"]))
 
-        if _this_output_folder and not _this_output_folder.endswith(os.path.sep):
-            _this_output_folder = _this_output_folder + os.path.sep
+    # the same file can be reported by more than one output.
+    transfers = list(dict.fromkeys(transfers))
 
-        for output in outputs:
-            process_output(
-                _this_output_folder, output["Location"], args.get("dry_run", False)
-            )
+    mode = args.get("mode", "copy")
+    manifest = transfer.Manifest.load(
+        os.path.join(output_folder, transfer.MANIFEST_NAME)
+    )
+    if args.get("dry_run"):
+        for source, destination in transfers:
+            if not transfer.is_transferred(source, destination, manifest):
+                print(f"{mode} {source} {destination}")
+        return
+
+    results = await asyncio.to_thread(
+        transfer.copy_files,
+        transfers,
+        mode=mode,
+        max_workers=args.get("max_workers"),
+        manifest=manifest,
+    )
+    reporting.print_dicts_as_table(
+        [transfer.summarize(results)], grid_style=args.get("grid_style")
+    )
+
+    failed = [r for r in results if r["status"] == "failed"]
+    if failed:
+        errors.report(
+            f"Could not copy {len(failed)} files.",
+            fatal=True,
+            exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
+        )
 
 
 def register_subparser(
@@ -67,9 +93,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "aggregate", help="Aggregate outputs from local cromwell run"
-    )
+    subcommand = add_parser(subparser, "aggregate")
     subcommand.add_argument("workflow-id", help="Cromwell workflow ID.")
     subcommand.add_argument(
         "output-folder", help="Output folder to aggregate outputs to."
@@ -77,10 +101,22 @@ def register_subparser(
     subcommand.add_argument(
         "--dry-run",
         "-d",
-        help="Print the copy commands instead of running them.",
+        help="Print the files that would be copied instead of copying them.",
         default=False,
         action="store_true",
     )
+    subcommand.add_argument(
+        "--mode",
+        help="How to copy files. `hardlink` and `reflink` fall back to a copy "
+        "when the output folder is on a different filesystem.",
+        choices=transfer.COPY_MODES,
+        default="copy",
+    )
+    subcommand.add_argument(
+        "--max-workers",
+        help=f"Number of files to copy at once (default: {transfer.DEFAULT_MAX_WORKERS}).",
+        type=int,
+    )
     subcommand.add_argument(
         "--grid-style",
         help="Any valid `tablefmt` for python-tabulate.",
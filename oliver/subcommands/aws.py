@@ -3,8 +3,9 @@ import argparse
 
 from typing import Any, Dict
 
-from ..integrations.aws import aggregate, clean, debug
+from ..integrations.aws import clean
 from ..lib import api, args as _args, errors
+from ..subcommands import add_parser
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -16,11 +17,18 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
 
     aws_subcommand = args.get("aws-subcommand")
 
+    # pylint: disable=import-outside-toplevel
+    # the boto3 client libraries are slow to import, so only the integration
+    # being run is imported.
     if aws_subcommand == "aggregate":
+        from ..integrations.aws import aggregate
+
         await aggregate.call(args, cromwell)
     elif aws_subcommand == "clean":
         await clean.call(args, cromwell)
     elif aws_subcommand == "debug":
+        from ..integrations.aws import debug
+
         await debug.call(args, cromwell)
     else:
         errors.report(
@@ -39,10 +47,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "aws",
-        help="All subcommands related to Cromwell on AWS.",
-    )
+    subcommand = add_parser(subparser, "aws")
 
     aws_subcommands = subcommand.add_subparsers(dest="aws-subcommand")
     # https://bugs.python.org/issue9253#msg186387
@@ -71,6 +76,33 @@ def register_subparser(
         default=False,
         action="store_true",
     )
+    aggregate_subcommand.add_argument(
+        "-x",
+        "--execute",
+        help="Copy the files instead of printing `aws s3 cp` commands.",
+        default=False,
+        action="store_true",
+    )
+    aggregate_subcommand.add_argument(
+        "-r",
+        "--resume",
+        help="Only print commands for files that are missing from the output "
+        "folder or have changed since they were copied (looks up every file on "
+        "S3).",
+        default=False,
+        action="store_true",
+    )
+    aggregate_subcommand.add_argument(
+        "--max-workers",
+        help="Number of files looked up, and requests made when copying, at "
+        "once (default: 8).",
+        type=int,
+    )
+    aggregate_subcommand.add_argument(
+        "--max-bandwidth",
+        help="Maximum download speed in MiB/s when copying to a local folder.",
+        type=float,
+    )
     aggregate_subcommand.add_argument(
         "--grid-style",
         help="Any valid `tablefmt` for python-tabulate.",
@@ -94,6 +126,40 @@ def register_subparser(
         default=False,
         action="store_true",
     )
+    clean_mode = clean_subcommand.add_mutually_exclusive_group()
+    clean_mode.add_argument(
+        "-x",
+        "--execute",
+        help="Delete the objects instead of printing `aws s3 rm` commands.",
+        default=False,
+        action="store_true",
+    )
+    clean_mode.add_argument(
+        "-d",
+        "--dry-run",
+        help="Count the objects (and bytes) that would be deleted.",
+        default=False,
+        action="store_true",
+    )
+    clean_subcommand.add_argument(
+        "-y",
+        "--yes",
+        help="With `--execute`, delete the objects without first counting them "
+        "and asking for confirmation.",
+        default=False,
+        action="store_true",
+    )
+    clean_subcommand.add_argument(
+        "--max-workers",
+        help="Number of workflows listed, and delete requests made, at once "
+        "(default: 8).",
+        type=int,
+    )
+    clean_subcommand.add_argument(
+        "--grid-style",
+        help="Any valid `tablefmt` for python-tabulate.",
+        default="fancy_grid",
+    )
     _args.add_loglevel_group(clean_subcommand)
 
     # debug subcommand
@@ -104,7 +170,7 @@ def register_subparser(
         + "and puts them in a folder for analysis.",
     )
     debug_subcommand.add_argument(
-        "queue", help="Which AWS batch queue to query?", type=str
+        "queue", help="Which AWS batch queue(s) to query?", nargs="+", type=str
     )
     _args.add_batches_group(debug_subcommand, required=True)
     debug_subcommand.add_argument(
@@ -129,6 +195,32 @@ def register_subparser(
         default=None,
         type=int,
     )
+    debug_subcommand.add_argument(
+        "--job-name",
+        help="Only query AWS batch jobs with this name (or, ending in `*`, "
+        "starting with this prefix).",
+        default=None,
+        type=str,
+    )
+    debug_subcommand.add_argument(
+        "--tail",
+        help="Only write the last N events of each job's logs.",
+        default=None,
+        type=int,
+    )
+    debug_subcommand.add_argument(
+        "--match-tolerance",
+        help="Maximum number of seconds between a failed call starting and an "
+        "AWS batch job being created for them to be matched (default: 300).",
+        default=None,
+        type=int,
+    )
+    debug_subcommand.add_argument(
+        "--grid-style",
+        help="Any valid `tablefmt` for python-tabulate.",
+        default="fancy_grid",
+    )
+    _args.add_max_concurrent_requests_arg(debug_subcommand)
     _args.add_loglevel_group(debug_subcommand)
 
     subcommand.set_defaults(func=call)
@@ -2,8 +2,8 @@ import argparse
 
 from typing import Any, Dict
 
-from ..integrations.azure import aggregate, cosmos
-from ..lib import api, errors
+from ..lib import api, args as _args, errors
+from ..subcommands import add_parser
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -15,9 +15,16 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
 
     azure_subcommand = args.get("azure-subcommand")
 
+    # pylint: disable=import-outside-toplevel
+    # the Azure SDK is slow to import, so only the integration being run is
+    # imported.
     if azure_subcommand == "cosmos":
+        from ..integrations.azure import cosmos
+
         await cosmos.call(args, cromwell)
     elif azure_subcommand == "aggregate":
+        from ..integrations.azure import aggregate
+
         await aggregate.call(args, cromwell)
     else:
         errors.report(
@@ -36,10 +43,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "azure",
-        help="All subcommands related to Cromwell on Azure.",
-    )
+    subcommand = add_parser(subparser, "azure")
 
     azure_subcommands = subcommand.add_subparsers(dest="azure-subcommand")
     # https://bugs.python.org/issue9253#msg186387
@@ -59,12 +63,39 @@ def register_subparser(
         help="Any valid `tablefmt` for python-tabulate.",
         default="fancy_grid",
     )
-    cosmos_parser.add_argument(
+    cosmos_output = cosmos_parser.add_mutually_exclusive_group()
+    cosmos_output.add_argument(
         "--json",
         help="Print the full JSON objects for Cosmos records",
         action="store_true",
     )
+    cosmos_output.add_argument(
+        "--ndjson",
+        help="Print the full JSON objects for Cosmos records, one per line",
+        action="store_true",
+    )
+    cosmos_parser.add_argument(
+        "--page-size",
+        help="Number of Cosmos records fetched per request (default: 100).",
+        type=int,
+    )
     cosmos_parser.add_argument("-o", "--outfile", help="File to save JSON records to")
+    cosmos_parser.add_argument(
+        "--cosmos-endpoint",
+        help="CosmosDB endpoint to use instead of looking it up with the Azure CLI.",
+    )
+    cosmos_parser.add_argument(
+        "--cosmos-key",
+        help="CosmosDB key to use instead of looking it up with the Azure CLI. "
+        "Can also be set with the `OLIVER_COSMOS_KEY` environment variable.",
+    )
+    cosmos_parser.add_argument(
+        "--refresh-credentials",
+        help="Look up the CosmosDB endpoint and key again rather than using the "
+        "cached ones.",
+        default=False,
+        action="store_true",
+    )
 
     aggregate_parser = azure_subcommands.add_parser(
         "aggregate", description="Aggregate outputs from Azure blob container."
@@ -76,13 +107,24 @@ def register_subparser(
     aggregate_parser.add_argument(
         "--sas-token", help="Valid SAS token for the `cromwell-executions` container."
     )
+    aggregate_parser.add_argument(
+        "--blob-endpoint",
+        help="Blob service endpoint to download from (defaults to the one for "
+        "`storage_account_name`).",
+    )
     aggregate_parser.add_argument(
         "-d",
         "--dry-run",
-        help="Print what would be submitted rather than actually submitting.",
+        help="Print the files that would be downloaded instead of downloading them.",
         default=False,
         action="store_true",
     )
+    aggregate_parser.add_argument(
+        "--grid-style",
+        help="Any valid `tablefmt` for python-tabulate.",
+        default="fancy_grid",
+    )
+    _args.add_max_concurrent_requests_arg(aggregate_parser)
 
     subcommand.set_defaults(func=call)
     return subcommand
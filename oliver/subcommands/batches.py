@@ -14,12 +14,12 @@ from ..lib import (
     reporting,
     workflows as _workflows,
 )
+from ..subcommands import add_parser
 
-SUBCOMMAND_NAME = "batches"
-SUBCOMMAND_ALIASES = ["b"]
+METADATA_FIELDS = ["labels"]
 
 
-# pylint: disable=too-many-locals
+# pylint: disable=too-many-locals,too-many-branches
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
     """Execute the subcommand.
 
@@ -62,6 +62,19 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         )
     # pylint: enable=logging-not-lazy
 
+    metadatas: Dict[str, Dict[str, Any]] = {}
+    if args.get("show_oliver_job_groups"):
+        metadatas = await _workflows.get_metadatas(
+            cromwell,
+            [
+                w["id"]
+                for batch_workflows in aggregation.values()
+                for w in batch_workflows
+            ],
+            max_concurrent_requests=args.get("max_concurrent_requests"),
+            fields=METADATA_FIELDS,
+        )
+
     for batch_num, batch_workflows in aggregation.items():
         r = {"Batch": batch_num, "# of Jobs": len(batch_workflows)}
 
@@ -76,10 +89,6 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
 
         # job groups
         if args.get("show_oliver_job_groups"):
-            metadatas = {
-                w.get("id"): await cromwell.get_workflows_metadata(w.get("id"))
-                for w in batch_workflows
-            }
             r["Job Groups"] = ", ".join(
                 list(
                     {
@@ -123,11 +132,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        SUBCOMMAND_NAME,
-        aliases=SUBCOMMAND_ALIASES,
-        help=__doc__.split("\n", maxsplit=1)[0],
-    )
+    subcommand = add_parser(subparser, "batches")
 
     _args.add_batches_group(subcommand)
     subcommand.add_argument(
@@ -137,6 +142,7 @@ def register_subparser(
         default=False,
         action="store_true",
     )
+    _args.add_max_concurrent_requests_arg(subcommand)
     subcommand.add_argument(
         "--grid-style",
         help="Any valid `tablefmt` for python-tabulate.",
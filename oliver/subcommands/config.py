@@ -3,7 +3,8 @@ import argparse
 from typing import Any, Dict
 
 from ..lib import api, errors
-from ..lib.config import read_config, write_config
+from ..lib.config import read_config, write_config, SECRET_KEYS
+from ..subcommands import add_parser
 
 
 async def call(
@@ -53,6 +54,13 @@ async def call(
                 exitcode=errors.ERROR_INVALID_INPUT,
             )
         [key, value] = args["value"]
+        if key in SECRET_KEYS:
+            errors.report(
+                f'"{key}" is a secret and is not stored in the config. Pass it '
+                "on the command line or in the environment instead.",
+                fatal=True,
+                exitcode=errors.ERROR_INVALID_INPUT,
+            )
         config[key] = value
         write_config(config)
     else:
@@ -72,9 +80,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "config", help="Set or get a single config value from Oliver."
-    )
+    subcommand = add_parser(subparser, "config")
     subcommand.add_argument(
         "action",
         choices=["list", "rm", "get", "set"],
@@ -4,11 +4,13 @@ from typing import Any, Dict
 
 from ..lib import api
 from ..lib.config import get_default_config, read_config, write_config
+from ..subcommands import add_parser
 
 QUESTION_MAPPING = {
     "cromwell_server": "What is the Cromwell server address",
     "cromwell_api_version": "What is the Cromwell API version",
     "batch_interval_mins": "When splitting batches, how many minutes apart should two jobs be",
+    "max_concurrent_requests": "How many requests should be sent to the Cromwell server at once",
 }
 
 
@@ -51,9 +53,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "configure", help="Configure Oliver with default options."
-    )
+    subcommand = add_parser(subparser, "configure")
     subcommand.add_argument(
         "--defaults",
         help="Store the default values without prompting the user.",
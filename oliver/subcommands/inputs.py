@@ -4,6 +4,9 @@ import json
 from typing import Any, Dict
 
 from ..lib import api, errors
+from ..subcommands import add_parser
+
+METADATA_FIELDS = ["submittedFiles"]
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -13,7 +16,9 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         args (Dict): Arguments parsed from the command line.
     """
 
-    metadata = await cromwell.get_workflows_metadata(args["workflow-id"])
+    metadata = await cromwell.get_workflows_metadata(
+        args["workflow-id"], fields=METADATA_FIELDS
+    )
 
     if not metadata.get("submittedFiles", {}).get("inputs"):
         errors.report(
@@ -34,9 +39,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "inputs", help="Find all reported inputs for a given workflow."
-    )
+    subcommand = add_parser(subparser, "inputs")
     subcommand.add_argument("workflow-id", help="Cromwell workflow ID.")
     subcommand.add_argument(
         "--grid-style",
@@ -5,6 +5,21 @@ from typing import Any, Dict
 import pendulum
 
 from ..lib import api, constants, errors, reporting
+from ..subcommands import add_parser
+
+METADATA_FIELDS = [
+    "labels",
+    "workflowName",
+    "actualWorkflowLanguage",
+    "actualWorkflowLanguageVersion",
+    "submission",
+    "start",
+    "end",
+    "failures",
+    "calls.attempt",
+    "calls.shardIndex",
+    "calls.executionStatus",
+]
 
 
 def report_failure(
@@ -23,7 +38,9 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         args (Dict): Arguments parsed from the command line.
     """
 
-    metadata = await cromwell.get_workflows_metadata(args["workflow-id"])
+    metadata = await cromwell.get_workflows_metadata(
+        args["workflow-id"], fields=METADATA_FIELDS
+    )
 
     oliver_job_name = metadata.get("labels", {}).get(constants.OLIVER_JOB_NAME_KEY, "")
     oliver_group_name = metadata.get("labels", {}).get(
@@ -150,9 +167,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "inspect", aliases=["i"], help="Describe the state of a Cromwell workflow."
-    )
+    subcommand = add_parser(subparser, "inspect")
     subcommand.add_argument("workflow-id", help="Cromwell workflow ID.")
     subcommand.add_argument(
         "-l",
@@ -1,56 +1,101 @@
 import argparse
 
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from ..lib import api, reporting
+from ..lib import api, args as _args, reporting, workflows as _workflows
+from ..subcommands import add_parser
 
+LOG_NAMES = ["stdout", "stderr"]
 
-async def get_logs(cromwell: api.CromwellAPI, workflow_id: str) -> List[Dict[str, str]]:
-    """Get logs from a workflow ID.
+METADATA_FIELDS = [
+    "calls.attempt",
+    "calls.shardIndex",
+    "calls.stdout",
+    "calls.stderr",
+    "calls.subWorkflowId",
+]
+
+
+async def iter_logs(
+    cromwell: api.CromwellAPI,
+    workflow_id: str,
+    max_concurrent_requests: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Get logs from a workflow ID as they are found.
 
     Cromwell has REST API for getting logs, but it excludes sub-workflows.
-    To obtain sub-workflows as well, use the metadata API recursively when
-    calls to sub-worfklows are encountered.
+    To obtain sub-workflows as well, the metadata API is walked recursively
+    (see `workflows.iter_calls`).
 
     Args:
         cromwell (api.CromwellAPI): Cromwell API
         workflow_id (str): Workflow ID
+        max_concurrent_requests (int, optional): Maximum number of metadata
+        requests in flight at once.
+
+    Yields:
+        Dict: Each log file for the workflow and its sub-workflows.
+    """
+
+    async for _, name, process in _workflows.iter_calls(
+        cromwell,
+        workflow_id,
+        fields=METADATA_FIELDS,
+        max_concurrent_requests=max_concurrent_requests,
+    ):
+        if "subWorkflowId" in process:
+            continue
+
+        for log_name in LOG_NAMES:
+            yield {
+                "Call Name": name,
+                "Attempt": process.get("attempt"),
+                "Shard": process.get("shardIndex"),
+                "Log Name": log_name,
+                "Location": process.get(log_name, ""),
+            }
+
+
+def sort_key(log: Dict[str, Any]) -> Tuple[str, int, int, int]:
+    """Orders logs by call name, then shard, attempt and log name (calls that
+    aren't scattered have no shard)."""
+
+    shard = log.get("Shard")
+    attempt = log.get("Attempt")
+    return (
+        log["Call Name"],
+        -1 if shard is None else int(shard),
+        0 if attempt is None else int(attempt),
+        LOG_NAMES.index(log["Log Name"]),
+    )
+
+
+async def get_logs(
+    cromwell: api.CromwellAPI,
+    workflow_id: str,
+    max_concurrent_requests: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Get logs from a workflow ID.
+
+    Args:
+        cromwell (api.CromwellAPI): Cromwell API
+        workflow_id (str): Workflow ID
+        max_concurrent_requests (int, optional): Maximum number of metadata
+        requests in flight at once.
 
     Returns:
-        List[Dict]: List of log files for the workflow
+        List[Dict]: List of log files for the workflow, sorted by `sort_key`
+        (metadata is fetched concurrently, so logs are found in no particular
+        order).
     """
-    metadata = await cromwell.get_workflows_metadata(workflow_id)
-    results: List[Dict[str, str]] = []
-    for name, cur_call in metadata["calls"].items():
-        for process in cur_call:
-            if "subWorkflowId" in process:
-                results += await get_logs(cromwell, process.get("subWorkflowId"))
-                continue
-
-            attempt = process.get("attempt")
-            shard = process.get("shardIndex")
-
-            stdout = process.get("stdout", "")
-            stderr = process.get("stderr", "")
-            results.append(
-                {
-                    "Call Name": name,
-                    "Attempt": attempt,
-                    "Shard": shard,
-                    "Log Name": "stdout",
-                    "Location": stdout,
-                }
-            )
-            results.append(
-                {
-                    "Call Name": name,
-                    "Attempt": attempt,
-                    "Shard": shard,
-                    "Log Name": "stderr",
-                    "Location": stderr,
-                }
-            )
-    return results
+
+    logs = [
+        log
+        async for log in iter_logs(
+            cromwell, workflow_id, max_concurrent_requests=max_concurrent_requests
+        )
+    ]
+    return sorted(logs, key=sort_key)
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -59,7 +104,11 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
     Args:
         args (Dict): Arguments parsed from the command line.
     """
-    results = await get_logs(cromwell, args["workflow-id"])
+    results = await get_logs(
+        cromwell,
+        args["workflow-id"],
+        max_concurrent_requests=args.get("max_concurrent_requests"),
+    )
     if args.get("output_prefix"):
         for result in results:
             result["Location"] = args["output_prefix"] + result["Location"]
@@ -79,9 +128,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "logs", aliases=["l"], help="Find all reported logs for a given workflow."
-    )
+    subcommand = add_parser(subparser, "logs")
     subcommand.add_argument("workflow-id", help="Cromwell workflow ID.")
     subcommand.add_argument(
         "-c", "--call-name", help="Call name from the Cromwell workflow instance."
@@ -91,5 +138,6 @@ def register_subparser(
         help="Any valid `tablefmt` for python-tabulate.",
         default="fancy_grid",
     )
+    _args.add_max_concurrent_requests_arg(subcommand)
     subcommand.set_defaults(func=call)
     return subcommand
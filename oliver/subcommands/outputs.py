@@ -3,6 +3,7 @@ import argparse
 from typing import Any, Dict, List, Optional
 
 from ..lib import api, reporting
+from ..subcommands import add_parser
 
 
 async def get_outputs(
@@ -42,9 +43,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "outputs", aliases=["o"], help="Find all reported outputs for a given workflow."
-    )
+    subcommand = add_parser(subparser, "outputs")
     subcommand.add_argument("workflow-id", help="Cromwell workflow ID.")
     subcommand.add_argument(
         "--grid-style",
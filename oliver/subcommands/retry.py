@@ -1,12 +1,25 @@
 import argparse
 import json
 
-from typing import Any, cast, Dict
+from typing import Any, cast, Dict, Tuple
+from logzero import logger
 
-from ..lib import api, args as _args, errors, reporting, utils, workflows as _workflows
+from ..lib import (
+    api,
+    args as _args,
+    concurrency,
+    errors,
+    scheduling,
+    utils,
+    workflows as _workflows,
+)
 from ..lib.parsing import parse_workflow_inputs
+from ..subcommands import add_parser
 
+METADATA_FIELDS = ["submittedFiles"]
 
+
+# pylint: disable=too-many-branches
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
     """Execute the subcommand.
 
@@ -63,44 +76,123 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         ) in ["yes", "y"]:
             errors.report("User cancelled submission.", fatal=True, exitcode=0)
 
-    results = []
-    for w in workflows:
-        metadata = await cromwell.get_workflows_metadata(w["id"])
-
-        workflowUrl = metadata.get("submittedFiles", {}).get("workflowUrl", {})
-        workflowInputs = metadata.get("submittedFiles", {}).get("inputs", {})
-        workflowOptions = metadata.get("submittedFiles", {}).get("options", {})
-        workflowLabels = metadata.get("submittedFiles", {}).get("labels", {})
-        workflow_args = {}
-        (
-            workflow_args["workflowInputs"],
-            workflow_args["workflowOptions"],
-            workflow_args["workflowLabels"],
-        ) = parse_workflow_inputs(
-            args.get("workflowInputs", []),
-            inputs=json.loads(workflowInputs),
-            options=json.loads(workflowOptions),
-            labels=json.loads(workflowLabels),
-            job_name=args.get("job_name"),
-            job_group=args.get("job_group"),
-            output_dir=args.get("output_dir"),
+    # each workflow moves through three stages: fetching its metadata,
+    # re-parsing its inputs and resubmitting it. Up to
+    # `max_concurrent_requests` workflows are in flight at once, so metadata
+    # for some workflows is fetched while others are being submitted, and
+    # submissions are spaced out to protect the Cromwell server.
+    submissions = concurrency.RateLimiter(args.get("submissions_per_second"))
+    scheduler = scheduling.get_scheduler(cromwell, args)
+
+    async def resubmit(workflow: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = await cromwell.get_workflows_metadata(
+            workflow["id"], fields=METADATA_FIELDS
         )
+        workflow_url, workflow_args = prepare_resubmission(args, metadata)
 
         if args.get("dry_run"):
-            for key, value in workflow_args.items():
-                print(f"{key} = {value}")
+            return {"Retry Of": workflow["id"], **workflow_args}
+
+        # workflows submitted on hold don't load the server until they are
+        # released, so only their release is held back.
+        if scheduler and not args.get("on_hold"):
+            await scheduler.acquire()
+        await submissions.wait()
+        resp = await cromwell.post_workflows(
+            workflowUrl=workflow_url,
+            workflowInputs=cast(Dict[str, str], workflow_args["workflowInputs"]),
+            workflowOptions=cast(Dict[str, str], workflow_args["workflowOptions"]),
+            labels=cast(Dict[str, str], workflow_args["workflowLabels"]),
+            workflowOnHold=args.get("on_hold", False),
+            fatal=False,
+        )
+        return {"Retry Of": workflow["id"], **resp}
+
+    async def resubmit_or_report(workflow: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await resubmit(workflow)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return {"Retry Of": workflow["id"], "status": "error", "message": str(e)}
+
+    failed = 0
+    held = []
+    async for _, result in concurrency.iter_with_limit(
+        resubmit_or_report,
+        workflows,
+        limit=args.get("max_concurrent_requests"),
+        description="workflow resubmissions",
+    ):
+        if result.get("status") == "error":
+            failed += 1
+            logger.error(
+                "Could not resubmit %s: %s", result["Retry Of"], result["message"]
+            )
             continue
 
-        results.append(
-            await cromwell.post_workflows(
-                workflowUrl=workflowUrl,
-                workflowInputs=cast(Dict[str, str], workflow_args["workflowInputs"]),
-                workflowOptions=cast(Dict[str, str], workflow_args["workflowOptions"]),
-                labels=cast(Dict[str, str], workflow_args["workflowLabels"]),
+        if args.get("on_hold") and result.get("id"):
+            held.append(result["id"])
+
+        if args.get("ndjson"):
+            print(json.dumps(result), flush=True)
+        elif args.get("dry_run"):
+            print(f"# {result.pop('Retry Of')}")
+            for key, value in result.items():
+                print(f"{key} = {value}")
+        else:
+            print(
+                f"{result['Retry Of']} -> {result.get('id')} ({result.get('status')})"
             )
+
+    if scheduler and held:
+        logger.info("Releasing %d workflows as the server has room.", len(held))
+        await scheduler.release_holds(
+            held, max_concurrent_requests=args.get("max_concurrent_requests")
+        )
+        print(f"Released {len(held)} workflows.")
+
+    if failed:
+        errors.report(
+            f"{failed} of {len(workflows)} workflows could not be resubmitted.",
+            fatal=True,
+            exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
         )
 
-    reporting.print_dicts_as_table(results)
+
+def prepare_resubmission(
+    args: Dict[str, Any], metadata: Dict[str, Any]
+) -> Tuple[str, Dict[str, Any]]:
+    """Rebuilds the submission for a workflow from its metadata.
+
+    Args:
+        args (Dict): Arguments parsed from the command line.
+        metadata (Dict): Metadata of the workflow being resubmitted, including
+        `submittedFiles`.
+
+    Returns:
+        Tuple[str, Dict]: The workflow URL and the inputs, options and labels
+        to resubmit it with.
+    """
+
+    submitted_files = metadata.get("submittedFiles", {})
+    workflowUrl = submitted_files.get("workflowUrl", {})
+    workflowInputs = submitted_files.get("inputs", {})
+    workflowOptions = submitted_files.get("options", {})
+    workflowLabels = submitted_files.get("labels", {})
+    workflow_args = {}
+    (
+        workflow_args["workflowInputs"],
+        workflow_args["workflowOptions"],
+        workflow_args["workflowLabels"],
+    ) = parse_workflow_inputs(
+        args.get("workflowInputs", []),
+        inputs=json.loads(workflowInputs),
+        options=json.loads(workflowOptions),
+        labels=json.loads(workflowLabels),
+        job_name=args.get("job_name"),
+        job_group=args.get("job_group"),
+        output_dir=args.get("output_dir"),
+    )
+    return workflowUrl, workflow_args
 
 
 def register_subparser(
@@ -112,11 +204,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "retry",
-        aliases=["re"],
-        help="Resubmit a workflow with the same parameters. By default, only restarts workflows which are 'Failed' or 'Aborted'.",
-    )
+    subcommand = add_parser(subparser, "retry")
     scope_predicate = subcommand.add_mutually_exclusive_group(required=True)
     _args.add_batches_group(scope_predicate)
     _args.add_batches_interval_arg(subcommand)
@@ -166,5 +254,14 @@ def register_subparser(
         help="Any valid `tablefmt` for python-tabulate.",
         default="fancy_grid",
     )
+    subcommand.add_argument(
+        "--ndjson",
+        help="Print each resubmitted workflow as a line of JSON instead of a table.",
+        default=False,
+        action="store_true",
+    )
+    _args.add_max_concurrent_requests_arg(subcommand)
+    _args.add_submissions_per_second_arg(subcommand)
+    _args.add_scheduling_group(subcommand)
     subcommand.set_defaults(func=call)
     return subcommand
@@ -3,6 +3,9 @@ import argparse
 from typing import Any, Dict
 
 from ..lib import api, errors, reporting
+from ..subcommands import add_parser
+
+METADATA_FIELDS = ["calls.attempt", "calls.shardIndex", "calls.runtimeAttributes"]
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -12,7 +15,9 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         args (Dict): Arguments parsed from the command line.
     """
 
-    metadata = await cromwell.get_workflows_metadata(args["workflow-id"])
+    metadata = await cromwell.get_workflows_metadata(
+        args["workflow-id"], fields=METADATA_FIELDS
+    )
     if not metadata.get("calls"):
         reporting.print_error_as_table(metadata["status"], metadata["message"])
         return
@@ -66,11 +71,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "runtime",
-        aliases=["ru"],
-        help="Get the runtime attributes used for a specific call.",
-    )
+    subcommand = add_parser(subparser, "runtime")
     subcommand.add_argument("workflow-id", help="Cromwell workflow ID.")
     subcommand.add_argument(
         "call-name", help="Name of the call executed within the workflow."
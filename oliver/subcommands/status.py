@@ -12,6 +12,9 @@ from ..lib import (
     oliver,
     workflows as _workflows,
 )
+from ..subcommands import add_parser
+
+METADATA_FIELDS = ["labels", "status", "calls.executionStatus", "calls.start"]
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -47,9 +50,12 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         opt_into_reporting_succeeded_jobs=args["show_succeeded_jobs"],
     )
 
-    metadatas = {
-        w["id"]: await cromwell.get_workflows_metadata(w["id"]) for w in workflows
-    }
+    metadatas = await _workflows.get_metadatas(
+        cromwell,
+        [w["id"] for w in workflows],
+        max_concurrent_requests=args.get("max_concurrent_requests"),
+        fields=METADATA_FIELDS,
+    )
 
     call_names_to_consider = args.get("failed_calls")
     if call_names_to_consider:
@@ -57,7 +63,7 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         for workflow in workflows:
             keep_workflow = False
             for call_name, calls in (
-                metadatas.get(workflow.get("id"), {}).get("calls", {}).items()
+                metadatas.get(workflow.get("id", ""), {}).get("calls", {}).items()
             ):
                 if call_name in call_names_to_consider:
                     # pylint: disable=R1729
@@ -93,11 +99,7 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "status",
-        aliases=["st"],
-        help="Report various statistics about a running Cromwell server.",
-    )
+    subcommand = add_parser(subparser, "status")
 
     view = subcommand.add_mutually_exclusive_group()
     view.add_argument(
@@ -152,6 +154,7 @@ def register_subparser(
         type=str,
         help="Filter by workflow name matching argument.",
     )
+    _args.add_max_concurrent_requests_arg(subcommand)
     subcommand.add_argument(
         "-r",
         "--running",
@@ -4,11 +4,18 @@ Input files can be passed or inputs can be directly added via the command line.
 """
 
 import argparse
+import asyncio
+import json
 
-from typing import Any, Dict
+from typing import Any, Dict, List
+from logzero import logger
 
-from ..lib import api, args as _args, errors, reporting
-from ..lib.parsing import parse_workflow, parse_workflow_inputs
+from ..lib import api, args as _args, concurrency, errors, reporting, scheduling
+from ..lib.parsing import parse_manifest, parse_workflow, parse_workflow_inputs
+from ..subcommands import add_parser
+
+# maximum number of workflows from a manifest sent in one request.
+BATCH_SIZE = 100
 
 
 async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
@@ -29,6 +36,10 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         )
         return
 
+    if args.get("manifest"):
+        await submit_manifest(args, cromwell, workflow_inputs)
+        return
+
     workflow_args: Dict[str, Any] = parse_workflow(args["workflow"])
     (
         workflow_args["workflowInputs"],
@@ -41,15 +52,228 @@ async def call(args: Dict[str, Any], cromwell: api.CromwellAPI) -> None:
         output_dir=args.get("output_dir"),
     )
     workflow_args["workflowDependencies"] = args.get("dependencies")
+    workflow_args["workflowOnHold"] = args.get("on_hold", False)
 
     if args.get("dry_run"):
         for key, value in workflow_args.items():
             print(f"{key} = {value}")
         return
 
+    scheduler = scheduling.get_scheduler(cromwell, args)
+    if scheduler and not args.get("on_hold"):
+        await scheduler.acquire()
+
     results = [await cromwell.post_workflows(**workflow_args)]
     reporting.print_dicts_as_table(results, args["grid_style"])
 
+    if scheduler and args.get("on_hold"):
+        await release_holds(scheduler, results, args)
+
+
+async def release_holds(
+    scheduler: scheduling.BackpressureScheduler,
+    results: List[Dict[str, Any]],
+    args: Dict[str, Any],
+) -> None:
+    """Releases the workflows that were just submitted on hold in waves."""
+
+    workflow_ids = [r["id"] for r in results if r.get("id")]
+    logger.info("Releasing %d workflows as the server has room.", len(workflow_ids))
+    await scheduler.release_holds(
+        workflow_ids, max_concurrent_requests=args.get("max_concurrent_requests")
+    )
+    print(f"Released {len(workflow_ids)} workflows.")
+
+
+def read_workflow_files(workflow_args: Dict[str, Any]) -> None:
+    """Reads the workflow source and dependencies into memory so they can be
+    reused across many requests rather than read again for each one."""
+
+    for key in api.FILE_PARAMS:
+        if isinstance(workflow_args.get(key), str):
+            with open(workflow_args[key], mode="rb") as f:
+                workflow_args[key] = f.read()
+
+
+def group_manifest_rows(
+    rows: List[Dict[str, Dict[str, Any]]], batch_size: int
+) -> List[List[int]]:
+    """Groups manifest rows into requests.
+
+    Cromwell's batch endpoint applies the same options to every workflow in a
+    batch, so only rows sharing their options can be sent together. Each group
+    is split into chunks of at most `batch_size` rows.
+
+    Returns:
+        List[List[int]]: Indices into `rows` for each request.
+    """
+
+    groups: Dict[str, List[int]] = {}
+    for idx, row in enumerate(rows):
+        groups.setdefault(json.dumps(row["options"], sort_keys=True), []).append(idx)
+
+    requests = []
+    for indices in groups.values():
+        for i in range(0, len(indices), max(batch_size, 1)):
+            requests.append(indices[i : i + batch_size])
+    return requests
+
+
+def shared_labels(labels: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Returns the labels that have the same value in every dict in `labels`."""
+
+    return {
+        k: v for k, v in labels[0].items() if all(l.get(k) == v for l in labels[1:])
+    }
+
+
+# pylint: disable=too-many-locals
+async def submit_manifest(
+    args: Dict[str, Any], cromwell: api.CromwellAPI, workflow_inputs: List[str]
+) -> None:
+    """Submits one workflow for each row of the manifest in `args`.
+
+    Inputs, options and labels given on the command line are shared by every
+    row, and the values in a row take precedence over them.
+
+    Args:
+        args (Dict): Arguments parsed from the command line.
+        cromwell (api.CromwellAPI): Cromwell API to submit the workflows to.
+        workflow_inputs (List[str]): Inputs given on the command line.
+    """
+
+    shared = [
+        json.loads(s)
+        for s in parse_workflow_inputs(
+            workflow_inputs,
+            job_name=args.get("job_name"),
+            job_group=args.get("job_group"),
+            output_dir=args.get("output_dir"),
+        )
+    ]
+    rows = [
+        {
+            key: {**base, **row[key]}
+            for key, base in zip(["inputs", "options", "labels"], shared)
+        }
+        for row in parse_manifest(args["manifest"])
+    ]
+
+    workflow_args: Dict[str, Any] = parse_workflow(args["workflow"])
+    workflow_args["workflowDependencies"] = args.get("dependencies")
+    workflow_args["workflowOnHold"] = args.get("on_hold", False)
+
+    batch_size = 1 if args.get("no_batch") else args.get("batch_size") or BATCH_SIZE
+    requests = group_manifest_rows(rows, batch_size)
+
+    if args.get("dry_run"):
+        for request_number, indices in enumerate(requests, start=1):
+            for idx in indices:
+                print(f"# request {request_number}, row {idx + 1}")
+                for key, value in rows[idx].items():
+                    print(f"{key} = {json.dumps(value)}")
+        return
+
+    read_workflow_files(workflow_args)
+    submissions = concurrency.RateLimiter(args.get("submissions_per_second"))
+    scheduler = scheduling.get_scheduler(cromwell, args)
+
+    async def submit_row(idx: int) -> Dict[str, Any]:
+        single_args: Dict[str, Any] = {
+            "workflowInputs": json.dumps(rows[idx]["inputs"]),
+            "workflowOptions": json.dumps(rows[idx]["options"]),
+            "labels": json.dumps(rows[idx]["labels"]),
+        }
+        try:
+            result = await cromwell.post_workflows(
+                **workflow_args, **single_args, fatal=False
+            )
+        except api.APIError as e:
+            return {"Row": idx + 1, "status": "error", "message": str(e)}
+        return {"Row": idx + 1, **result}
+
+    async def add_labels(
+        idx: int, result: Dict[str, Any], labels: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        missing = {k: v for k, v in rows[idx]["labels"].items() if k not in labels}
+        row = {"Row": idx + 1, **result}
+        if not result.get("id") or not missing:
+            return row
+        try:
+            await cromwell.patch_workflows_labels(result["id"], missing, fatal=False)
+        except api.APIError as e:
+            row["message"] = f"Could not add labels {', '.join(missing)}: {e}"
+        return row
+
+    async def submit(indices: List[int]) -> List[Dict[str, Any]]:
+        # workflows submitted on hold don't load the server until they are
+        # released, so only their release is held back.
+        if scheduler and not args.get("on_hold"):
+            await scheduler.acquire(len(indices))
+        await submissions.wait(len(indices))
+
+        # a lone workflow is sent to the regular endpoint rather than as a
+        # batch of one.
+        if len(indices) == 1:
+            return [await submit_row(indices[0])]
+
+        # rows are grouped by their options, but labels are also shared by
+        # every workflow in a batch, so any labels specific to a row (such as
+        # its job name) are added once the workflow has been created.
+        labels = shared_labels([rows[idx]["labels"] for idx in indices])
+        try:
+            results = await cromwell.post_workflows_batch(
+                workflowInputs=[rows[idx]["inputs"] for idx in indices],
+                workflowOptions=rows[indices[0]]["options"],
+                labels=labels,
+                fatal=False,
+                **workflow_args,
+            )
+        except api.APIError as e:
+            # find out which rows were rejected by submitting them one by one.
+            logger.warning(
+                "A batch of %d workflows was rejected (%s). Submitting them one at a time.",
+                len(indices),
+                e,
+            )
+            return list(await asyncio.gather(*[submit_row(idx) for idx in indices]))
+
+        return list(
+            await asyncio.gather(
+                *[
+                    add_labels(idx, result, labels)
+                    for idx, result in zip(indices, results)
+                ]
+            )
+        )
+
+    logger.info("Submitting %d workflows in %d requests.", len(rows), len(requests))
+    results = await concurrency.gather_with_limit(
+        submit,
+        requests,
+        limit=args.get("max_concurrent_requests"),
+        description="submission requests",
+    )
+    submitted = [r for request in results for r in request]
+    reporting.print_dicts_as_table(submitted, args["grid_style"])
+
+    if scheduler and args.get("on_hold"):
+        await release_holds(scheduler, submitted, args)
+
+    failed = [r for r in submitted if r.get("status") == "error"]
+    unlabelled = [
+        r for r in submitted if r.get("status") != "error" and r.get("message")
+    ]
+    for result in failed + unlabelled:
+        logger.error("Row %d: %s", result["Row"], result["message"])
+    if failed or unlabelled:
+        errors.report(
+            f"{len(failed)} of {len(rows)} workflows could not be submitted and "
+            f"{len(unlabelled)} are missing some of their labels.",
+            fatal=True,
+            exitcode=errors.ERROR_UNEXPECTED_RESPONSE,
+        )
+
 
 # _SubParsersAction is the return type by add_subparser
 def register_subparser(
@@ -61,10 +285,25 @@ def register_subparser(
         subparser (argparse._SubParsersAction): Subparsers action.
     """
 
-    subcommand = subparser.add_parser(
-        "submit", aliases=["su"], help="Submit a workflow to the Cromwell server."
-    )
+    subcommand = add_parser(subparser, "submit")
     subcommand.add_argument("workflow", help="The workflow to run (URL or file).")
+    subcommand.add_argument(
+        "-m",
+        "--manifest",
+        help="Tab-separated file with one row per workflow to submit. Columns are "
+        "inputs, `%%label` columns, `@option` columns, `job_name` or `job_group`.",
+    )
+    subcommand.add_argument(
+        "--batch-size",
+        help=f"Maximum number of workflows from a manifest to submit in a single request (default: {BATCH_SIZE}).",
+        type=int,
+    )
+    subcommand.add_argument(
+        "--no-batch",
+        help="Submit each workflow from a manifest in its own request.",
+        default=False,
+        action="store_true",
+    )
     subcommand.add_argument(
         "workflowInputs",
         nargs="*",
@@ -93,5 +332,8 @@ def register_subparser(
         type=str,
         default=None,
     )
+    _args.add_max_concurrent_requests_arg(subcommand)
+    _args.add_submissions_per_second_arg(subcommand)
+    _args.add_scheduling_group(subcommand)
     subcommand.set_defaults(func=call)
     return subcommand
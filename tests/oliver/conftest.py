@@ -0,0 +1,54 @@
+import pytest_asyncio
+
+from aiohttp import web
+
+from oliver.lib import api
+
+
+@pytest_asyncio.fixture
+async def unix_server(tmp_path):
+    """Starts an HTTP server on a unix socket that serves the given routes
+    (such as `[web.get(path, handler)]`) and returns the socket's path. Servers
+    are stopped when the test finishes."""
+
+    runners = []
+
+    async def start(routes, name="server.sock"):
+        app = web.Application()
+        app.add_routes(routes)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        runners.append(runner)
+        socket_path = str(tmp_path / name)
+        await web.UnixSite(runner, socket_path).start()
+        return socket_path
+
+    yield start
+
+    for runner in runners:
+        await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def cromwell_server(unix_server):
+    """Starts a stand-in Cromwell server with the given routes and returns a
+    `CromwellAPI` connected to it. Any other keyword arguments are passed to
+    `CromwellAPI`."""
+
+    clients = []
+
+    async def start(routes, **kwargs):
+        socket_path = await unix_server(routes, name="cromwell.sock")
+        cromwell = api.CromwellAPI(
+            server="http://localhost",
+            version="v1",
+            session=api.create_session(unix_socket=socket_path),
+            **kwargs,
+        )
+        clients.append(cromwell)
+        return cromwell
+
+    yield start
+
+    for cromwell in clients:
+        await cromwell.close()
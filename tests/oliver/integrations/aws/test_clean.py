@@ -0,0 +1,65 @@
+import boto3
+import pytest
+
+from moto import mock_aws
+
+from oliver.integrations.aws import clean
+from oliver.lib import utils, workflows
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+    async def get_workflows(*_, **__):
+        return [{"id": "wf1"}, {"id": "wf2"}]
+
+    monkeypatch.setattr(workflows, "get_workflows", get_workflows)
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="outputs")
+        for key in ["wf1/a", "wf1/b", "wf2/a"]:
+            client.put_object(
+                Bucket="outputs", Key=f"cromwell-execution/w/{key}", Body=b"xy"
+            )
+        yield client
+
+
+def make_args(**kwargs):
+    args = {"workflow-root-folder": "s3://outputs/cromwell-execution/w/"}
+    args.update(kwargs)
+    return args
+
+
+@pytest.mark.asyncio
+async def test_execute_asks_before_deleting(client, monkeypatch, capsys):
+    questions = []
+
+    def answer(question):
+        questions.append(question)
+        return "n"
+
+    monkeypatch.setattr(utils, "_input", answer)
+    with pytest.raises(SystemExit) as e:
+        await clean.call(make_args(execute=True), None)
+    assert e.value.code == 0
+    assert questions == [
+        "Wishing to delete 3 objects (6 B) for 2 workflows. Continue? (y/n) "
+    ]
+    assert client.list_objects_v2(Bucket="outputs")["KeyCount"] == 3
+
+    monkeypatch.setattr(utils, "_input", lambda _: "y")
+    await clean.call(make_args(execute=True), None)
+    assert client.list_objects_v2(Bucket="outputs")["KeyCount"] == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_with_yes_does_not_ask(client, monkeypatch):
+    def answer(_):
+        raise AssertionError("should not ask")
+
+    monkeypatch.setattr(utils, "_input", answer)
+    await clean.call(make_args(execute=True, yes=True), None)
+    assert client.list_objects_v2(Bucket="outputs")["KeyCount"] == 0
@@ -0,0 +1,188 @@
+from botocore.exceptions import ClientError
+
+from oliver.integrations.aws import debug
+
+
+class FakeBatchClient:
+    def __init__(self):
+        self.requests = []
+
+    def describe_jobs(self, jobs):
+        self.requests.append(jobs)
+        return {"jobs": [{"jobId": i} for i in jobs if i != "expired"]}
+
+
+def test_batch_job_descriptions_are_chunked_and_cached():
+    client = FakeBatchClient()
+    descriptions = debug.BatchJobDescriptions(client, max_workers=4)
+
+    ids = [f"job-{i}" for i in range(250)]
+    descriptions.fetch(ids + ids[:10] + ["expired"])
+    assert sorted(len(r) for r in client.requests) == [51, 100, 100]
+    assert descriptions.get("job-42") == {"jobId": "job-42"}
+    assert descriptions.get("expired") is None
+
+    descriptions.fetch(ids[:50])
+    assert len(client.requests) == 3
+
+
+class ThrottledBatchClient(FakeBatchClient):
+    def describe_jobs(self, jobs):
+        if "job-0" in jobs:
+            raise ClientError(
+                {"Error": {"Code": "TooManyRequestsException", "Message": "Slow down"}},
+                "DescribeJobs",
+            )
+        return super().describe_jobs(jobs)
+
+
+def test_batch_job_descriptions_keep_chunks_that_succeed():
+    descriptions = debug.BatchJobDescriptions(ThrottledBatchClient(), max_workers=2)
+
+    descriptions.fetch([f"job-{i}" for i in range(250)])
+    assert descriptions.get("job-0") is None
+    assert descriptions.get("job-99") is None
+    assert descriptions.get("job-100") == {"jobId": "job-100"}
+    assert len(descriptions.jobs) == 150
+
+
+class FakePaginator:
+    def __init__(self, queues):
+        self.queues = queues
+        self.pages_read = 0
+
+    def paginate(self, jobQueue, filters):
+        assert filters == [{"name": "BEFORE_CREATED_AT", "values": ["4980000"]}]
+        # newest first, as AWS returns them when filtering.
+        jobs = sorted(self.queues[jobQueue], key=lambda j: -j["createdAt"])
+        for i in range(0, len(jobs), 2):
+            self.pages_read += 1
+            yield {"jobSummaryList": jobs[i : i + 2]}
+
+
+class FakeListingClient:
+    def __init__(self, queues):
+        self.paginator = FakePaginator(queues)
+
+    def get_paginator(self, name):
+        assert name == "list_jobs"
+        return self.paginator
+
+
+def test_get_aws_batch_jobs_filters_and_stops_early():
+    def job(i, created, status="FAILED", reason=""):
+        return {
+            "jobId": str(i),
+            "jobName": f"job-{i}",
+            "createdAt": created * 1000,
+            "startedAt": created * 1000 + 10000,
+            "stoppedAt": created * 1000 + 20000,
+            "status": status,
+            "statusReason": reason,
+        }
+
+    client = FakeListingClient(
+        {
+            "a": [job(i, 1000 + i * 100) for i in range(40)],
+            "b": [
+                job(100, 2000, "SUCCEEDED"),
+                job(101, 2000, "SUCCEEDED", "Essential container in task exited"),
+                job(102, 2000, "RUNNABLE"),
+            ],
+        }
+    )
+    args = {"queue": ["a", "b"], "status": ["SUCCEEDED", "FAILED"]}
+
+    jobs = debug.get_aws_batch_jobs(args, client, 2000, 4980)
+    assert sorted(int(j["id"]) for j in jobs) == list(range(10, 40)) + [101]
+    # queue "a" stops being read once jobs are older than the window.
+    assert client.paginator.pages_read < 20 + 2
+
+
+class FakeLogsClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.throttled = False
+
+    def get_log_events(self, logStreamName, startFromHead, nextToken=None, **kwargs):
+        if not self.throttled:
+            self.throttled = True
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException"}}, "GetLogEvents"
+            )
+        if logStreamName not in self.pages:
+            raise ClientError(
+                {"Error": {"Code": "ResourceNotFoundException"}}, "GetLogEvents"
+            )
+        if not startFromHead:
+            return {"events": self.pages[logStreamName][-1][-kwargs["limit"] :]}
+
+        i = int(nextToken or 0)
+        pages = self.pages[logStreamName]
+        return {
+            "events": pages[i] if i < len(pages) else [],
+            "nextForwardToken": str(min(i + 1, len(pages))),
+        }
+
+
+def test_write_log_stream_follows_every_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(debug.time, "sleep", lambda _: None)
+    pages = [[{"message": f"{p}-{e}"} for e in range(3)] for p in range(3)]
+    client = FakeLogsClient({"job/stream-proxy": pages})
+
+    path = str(tmp_path / "logs.txt")
+    assert debug.write_log_stream(client, "job/stream", path)
+    with open(path, encoding="utf-8") as f:
+        assert f.read().split() == [f"{p}-{e}" for p in range(3) for e in range(3)]
+
+    assert debug.write_log_stream(client, "job/stream", path, tail=2)
+    with open(path, encoding="utf-8") as f:
+        assert f.read().split() == ["2-1", "2-2"]
+
+    assert not debug.write_log_stream(client, "missing", path)
+
+
+def test_batch_job_index_picks_the_best_match():
+    jobs = [
+        {"id": "1", "name": "wf-align_reads-1", "created": 1000},
+        {"id": "2", "name": "wf-align_reads-2", "created": 1090},
+        {"id": "3", "name": "wf-align-3", "created": 1010},
+        {"id": "4", "name": "wf-align_reads-4", "created": 5000},
+        {"id": "5", "name": "wf-sort-5", "created": 1000},
+    ]
+    index = debug.BatchJobIndex(jobs, tolerance=100)
+
+    assert [j["id"] for j in index.candidates("align_reads", 1005)] == [
+        "1",
+        "3",
+        "2",
+    ]
+    assert index.match("align_reads", 1005)["id"] == "2"
+    assert index.match("align_reads", 1000)["id"] == "1"
+    assert index.match("align_reads", 3000) is None
+    assert index.match("ali", 1000)["id"] == "1"
+
+
+def test_write_logs_reports_each_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(debug.time, "sleep", lambda _: None)
+    descriptions = debug.BatchJobDescriptions(FakeBatchClient())
+    descriptions.jobs = {
+        "1": {"jobId": "1", "container": {"logStreamName": "ok"}},
+        "2": {"jobId": "2", "container": {"logStreamName": "broken"}},
+    }
+    logs_client = FakeLogsClient({"ok": [[{"message": "done"}]]})
+    candidates = [
+        ({"workflow_id": "wf", "name": f"call{i}"}, [{"id": i}])
+        for i in ["1", "2", "3"]
+    ]
+
+    results = debug.write_logs(
+        descriptions, logs_client, candidates, str(tmp_path), max_workers=3
+    )
+    assert [r["Status"] for r in results] == ["Succeeded", "Failed", "Failed"]
+    assert "broken" in results[1]["Message"]
+    with open(
+        tmp_path / "wf" / "call1" / "batch-job-1" / "cloudwatch-logs.txt",
+        encoding="utf-8",
+    ) as f:
+        assert f.read() == "done\n"
@@ -0,0 +1,170 @@
+import os
+
+import boto3
+import pytest
+
+from moto import mock_aws
+
+from oliver.integrations.aws import s3
+from oliver.lib import transfer
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="outputs")
+        client.create_bucket(Bucket="results")
+        yield client
+
+
+def test_transfers_are_executed_once(client, tmp_path):
+    client.put_object(Bucket="outputs", Key="wf/a.bam", Body=b"a" * 1024)
+    client.put_object(Bucket="outputs", Key="wf/b.bam", Body=b"b" * 1024)
+    pairs = [
+        ("s3://outputs/wf/a.bam", "s3://results/run/a.bam"),
+        ("s3://outputs/wf/b.bam", str(tmp_path / "run" / "b.bam")),
+    ]
+
+    manifest = s3.load_manifest(client, "s3://results/run/")
+    results = s3.plan_transfers(client, pairs, manifest)
+    assert [r["status"] for r in results] == ["pending", "pending"]
+
+    s3.execute_transfers(client, results, manifest, max_bandwidth=1024 * 1024)
+    s3.save_manifest(client, "s3://results/run/", manifest)
+    assert [r["status"] for r in results] == ["copied", "copied"]
+
+    copied = client.head_object(Bucket="results", Key="run/a.bam")
+    assert copied["ServerSideEncryption"] == "AES256"
+    assert os.path.getsize(tmp_path / "run" / "b.bam") == 1024
+
+    manifest = s3.load_manifest(client, "s3://results/run/")
+    results = s3.plan_transfers(client, pairs, manifest)
+    assert [r["status"] for r in results] == ["skipped", "skipped"]
+    assert transfer.summarize(results)["Skipped"] == 2
+
+
+def test_local_copies_are_compared_by_etag(client, tmp_path):
+    client.put_object(Bucket="outputs", Key="wf/a.bam", Body=b"a" * 1024)
+    client.put_object(Bucket="outputs", Key="wf/b.bam", Body=b"b" * 1024)
+    dest_a = tmp_path / "run" / "a.bam"
+    dest_b = tmp_path / "run" / "b.bam"
+    pairs = [
+        ("s3://outputs/wf/a.bam", str(dest_a)),
+        ("s3://outputs/wf/b.bam", str(dest_b)),
+    ]
+
+    # a file of the right size that the manifest knows nothing about.
+    dest_a.parent.mkdir()
+    dest_a.write_bytes(b"x" * 1024)
+    manifest = s3.load_manifest(client, str(tmp_path / "run"))
+    results = s3.plan_transfers(client, pairs, manifest)
+    assert [r["status"] for r in results] == ["pending", "pending"]
+    s3.execute_transfers(client, results, manifest)
+    assert dest_a.read_bytes() == b"a" * 1024
+
+    # the object changed on S3 but kept its size.
+    client.put_object(Bucket="outputs", Key="wf/b.bam", Body=b"c" * 1024)
+    manifest = s3.load_manifest(client, str(tmp_path / "run"))
+    results = s3.plan_transfers(client, pairs, manifest)
+    assert [r["status"] for r in results] == ["skipped", "pending"]
+
+
+def test_execute_transfers_records_transfers_that_cannot_start(client, tmp_path):
+    client.put_object(Bucket="outputs", Key="wf/a.bam", Body=b"a")
+    client.put_object(Bucket="outputs", Key="wf/b.bam", Body=b"b")
+    pairs = [
+        ("s3://outputs/wf/a.bam", str(tmp_path / "blocked" / "a.bam")),
+        ("s3://outputs/wf/b.bam", str(tmp_path / "run" / "b.bam")),
+    ]
+
+    manifest = s3.load_manifest(client, str(tmp_path / "run"))
+    results = s3.plan_transfers(client, pairs, manifest)
+    assert [r["status"] for r in results] == ["pending", "pending"]
+    # a file now stands where the folder for the first download should be.
+    (tmp_path / "blocked").write_text("")
+    s3.execute_transfers(client, results, manifest)
+    assert [r["status"] for r in results] == ["failed", "copied"]
+
+    manifest = s3.load_manifest(client, str(tmp_path / "run"))
+    statuses = {e["destination"]: e["status"] for e in manifest.entries.values()}
+    assert statuses == {pairs[0][1]: "failed", pairs[1][1]: "copied"}
+
+
+def test_plan_transfers_rejects_shared_destinations(client, tmp_path):
+    client.put_object(Bucket="outputs", Key="wf/shard-0/out.bam", Body=b"0")
+    client.put_object(Bucket="outputs", Key="wf/shard-1/out.bam", Body=b"1")
+    client.put_object(Bucket="outputs", Key="wf/other.bam", Body=b"2")
+    pairs = [
+        ("s3://outputs/wf/shard-0/out.bam", "s3://results/run/out.bam"),
+        ("s3://outputs/wf/shard-1/out.bam", "s3://results/run/out.bam"),
+        ("s3://outputs/wf/other.bam", "s3://results/run/other.bam"),
+    ]
+
+    manifest = s3.load_manifest(client, "s3://results/run/")
+    results = s3.plan_transfers(client, pairs, manifest)
+    assert [r["status"] for r in results] == ["failed", "failed", "pending"]
+    assert "2 files would be copied to" in results[0]["error"]
+
+
+def test_delete_prefixes(client):
+    for i in range(1500):
+        client.put_object(Bucket="outputs", Key=f"wf1/call/{i}", Body=b"x")
+    client.put_object(Bucket="outputs", Key="wf2/a", Body=b"xyz")
+    client.put_object(Bucket="outputs", Key="wf3/a", Body=b"keep")
+    prefixes = ["s3://outputs/wf1/", "s3://outputs/wf2/", "s3://outputs/missing/"]
+
+    results = s3.delete_prefixes(client, prefixes, dry_run=True)
+    assert [(r["Objects"], r["Bytes"]) for r in results] == [
+        (1500, 1500),
+        (1, 3),
+        (0, 0),
+    ]
+    assert client.list_objects_v2(Bucket="outputs")["KeyCount"] == 1000
+
+    results = s3.delete_prefixes(client, prefixes, max_workers=2)
+    assert not any(r.get("Errors") for r in results)
+    remaining = client.list_objects_v2(Bucket="outputs")["Contents"]
+    assert [o["Key"] for o in remaining] == ["wf3/a"]
+
+
+def test_delete_prefixes_reports_errors(client):
+    client.put_object(Bucket="outputs", Key="wf1/a", Body=b"x")
+
+    results = s3.delete_prefixes(
+        client, ["s3://missing-bucket/wf1/", "s3://outputs/wf1/"]
+    )
+    assert results[0]["Errors"] == 1
+    assert results[1] == {"Prefix": "s3://outputs/wf1/", "Objects": 1, "Bytes": 1}
+    assert client.list_objects_v2(Bucket="outputs")["KeyCount"] == 0
+
+
+def test_delete_prefixes_only_counts_deleted_objects(client, monkeypatch):
+    for i in range(4):
+        client.put_object(Bucket="outputs", Key=f"wf1/{i}", Body=b"x" * (i + 1))
+    delete_objects = client.delete_objects
+
+    def partially_delete(Bucket, Delete):
+        # S3 reports keys it couldn't delete (e.g. AccessDenied) individually.
+        kept = [o for o in Delete["Objects"] if o["Key"] in ("wf1/1", "wf1/3")]
+        response = delete_objects(
+            Bucket=Bucket,
+            Delete={"Objects": [o for o in Delete["Objects"] if o not in kept]},
+        )
+        response["Errors"] = [
+            {"Key": o["Key"], "Code": "AccessDenied", "Message": "Access Denied"}
+            for o in kept
+        ]
+        return response
+
+    monkeypatch.setattr(client, "delete_objects", partially_delete)
+    results = s3.delete_prefixes(client, ["s3://outputs/wf1/"])
+
+    assert results == [
+        {"Prefix": "s3://outputs/wf1/", "Objects": 2, "Bytes": 4, "Errors": 2}
+    ]
+    remaining = client.list_objects_v2(Bucket="outputs")["Contents"]
+    assert [o["Key"] for o in remaining] == ["wf1/1", "wf1/3"]
@@ -0,0 +1,123 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from aiohttp import web
+
+from oliver.integrations.azure import aggregate
+from oliver.lib import api, transfer
+
+# blobs served by the stand-in storage account, keyed by path.
+BLOBS = {
+    "/cromwell-executions/wf/call-a/a.bam": (b"a" * 3000000, "0x1"),
+    "/cromwell-executions/wf/call-b/b file.vcf": (b"b" * 10, "0x2"),
+}
+
+
+async def start_blob_service(unix_server, requests):
+    async def handler(request):
+        requests.append(request)
+        if request.query.get("sig") != "secret":
+            return web.Response(status=403)
+        path = request.path[len("/devstoreaccount1") :]
+        if path not in BLOBS:
+            return web.Response(status=404)
+        body, etag = BLOBS[path]
+        if request.headers.get("If-None-Match") == f'"{etag}"':
+            return web.Response(status=304)
+        return web.Response(body=body, headers={"ETag": f'"{etag}"'})
+
+    return await unix_server([web.get("/devstoreaccount1/{path:.*}", handler)])
+
+
+@pytest.mark.asyncio
+async def test_download_all_resumes_from_manifest(tmp_path, unix_server):
+    requests = []
+    socket_path = await start_blob_service(unix_server, requests)
+    dest = tmp_path / "results"
+    pairs = aggregate.get_transfers(
+        str(dest), list(BLOBS) + ["/cromwell-executions/wf/missing.txt"]
+    )
+
+    async def download_all():
+        manifest = transfer.Manifest.load(str(dest / transfer.MANIFEST_NAME))
+        async with aiohttp.ClientSession(
+            connector=aiohttp.UnixConnector(path=socket_path)
+        ) as session:
+            downloader = aggregate.BlobDownloader(
+                session,
+                "http://localhost/devstoreaccount1",
+                sas_token="sig=secret",
+                manifest=manifest,
+            )
+            return await downloader.download_all(pairs, max_concurrent_requests=2)
+
+    results = await download_all()
+    assert [r["status"] for r in results] == ["copied", "copied", "failed"]
+    assert (dest / "a.bam").read_bytes() == BLOBS[
+        "/cromwell-executions/wf/call-a/a.bam"
+    ][0]
+    assert (dest / "b file.vcf").read_bytes() == b"b" * 10
+
+    requests.clear()
+    results = await download_all()
+    assert [r["status"] for r in results] == ["skipped", "skipped", "failed"]
+    assert all(
+        "If-None-Match" in r.headers for r in requests if "missing" not in r.path
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_is_not_cut_off_while_data_arrives(tmp_path, unix_server):
+    async def handler(request):
+        response = web.StreamResponse(headers={"ETag": '"0x3"'})
+        await response.prepare(request)
+        for _ in range(5):
+            await asyncio.sleep(0.2)
+            await response.write(b"c" * 10)
+        await response.write_eof()
+        return response
+
+    socket_path = await unix_server([web.get("/devstoreaccount1/{path:.*}", handler)])
+
+    # the whole body takes longer than the read timeout, but each chunk
+    # arrives well within it.
+    async with api.create_session(
+        read_timeout=0.5, compress_responses=False, unix_socket=socket_path
+    ) as session:
+        assert session.timeout.total is None
+        downloader = aggregate.BlobDownloader(
+            session, "http://localhost/devstoreaccount1"
+        )
+        result = await downloader.download(("/wf/slow.bam", str(tmp_path / "slow.bam")))
+    assert result["status"] == "copied"
+    assert (tmp_path / "slow.bam").read_bytes() == b"c" * 50
+    assert not (tmp_path / ("slow.bam" + transfer.PARTIAL_SUFFIX)).exists()
+
+
+@pytest.mark.asyncio
+async def test_download_all_rejects_shared_destinations(tmp_path, unix_server):
+    requests = []
+    socket_path = await start_blob_service(unix_server, requests)
+    pairs = aggregate.get_transfers(
+        str(tmp_path / "results"),
+        [
+            "/cromwell-executions/wf/call-a/shard-0/a.bam",
+            "/cromwell-executions/wf/call-a/shard-1/a.bam",
+            "/cromwell-executions/wf/call-b/b file.vcf",
+        ],
+    )
+
+    async with api.create_session(
+        compress_responses=False, unix_socket=socket_path
+    ) as session:
+        downloader = aggregate.BlobDownloader(
+            session, "http://localhost/devstoreaccount1", sas_token="sig=secret"
+        )
+        results = await downloader.download_all(pairs)
+    assert [r["status"] for r in results] == ["failed", "failed", "copied"]
+    assert "2 files would be downloaded to" in results[0]["error"]
+    assert [r.path for r in requests] == [
+        "/devstoreaccount1/cromwell-executions/wf/call-b/b file.vcf"
+    ]
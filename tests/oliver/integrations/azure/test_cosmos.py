@@ -0,0 +1,128 @@
+import os
+import stat
+
+from oliver.integrations.azure import cosmos
+
+
+def test_credential_cache_expires(tmp_path, monkeypatch):
+    credentials = cosmos.CredentialCache(location=str(tmp_path), ttl_hours=1)
+    assert credentials.get("db", "rg") is None
+
+    credentials.put("db", "rg", "https://db.documents.azure.com", "secret")
+    assert credentials.get("db", "rg") == ("https://db.documents.azure.com", "secret")
+    assert stat.S_IMODE(os.stat(credentials.location).st_mode) == 0o600
+
+    now = cosmos.time.time()
+    monkeypatch.setattr(cosmos.time, "time", lambda: now + 3601)
+    assert credentials.get("db", "rg") is None
+
+
+def test_credential_cache_is_private_even_if_replacing_a_readable_file(tmp_path):
+    credentials = cosmos.CredentialCache(location=str(tmp_path), ttl_hours=1)
+    for path in [credentials.location, credentials.location + ".tmp"]:
+        with open(path, mode="w", encoding="utf-8") as f:
+            f.write("{}")
+        os.chmod(path, 0o644)
+
+    credentials.put("db", "rg", "https://db.documents.azure.com", "secret")
+    assert stat.S_IMODE(os.stat(credentials.location).st_mode) == 0o600
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [cosmos.CREDENTIALS_FILE_NAME, cosmos.CREDENTIALS_FILE_NAME + ".tmp"]
+    )
+
+
+def test_get_cosmos_api_reuses_credentials_and_clients(tmp_path, monkeypatch):
+    lookups = []
+
+    def fetch_credentials(cosmos_name, resource_group):
+        lookups.append((cosmos_name, resource_group))
+        return "https://db.documents.azure.com", "secret"
+
+    class FakeCosmosAPI:
+        def __init__(self, endpoint, key):
+            self.server = endpoint
+            self.key = key
+
+    monkeypatch.setattr(cosmos, "fetch_credentials", fetch_credentials)
+    monkeypatch.setattr(cosmos, "CosmosAPI", FakeCosmosAPI)
+    monkeypatch.setattr(cosmos, "_clients", {})
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv(cosmos.COSMOS_KEY_ENV, raising=False)
+    args = {"cosmos_account_name": "db", "azure_resource_group": "rg"}
+
+    client = cosmos.get_cosmos_api(args)
+    assert cosmos.get_cosmos_api(args) is client
+    monkeypatch.setattr(cosmos, "_clients", {})
+    assert cosmos.get_cosmos_api(args).key == "secret"
+    assert lookups == [("db", "rg")]
+    # the credentials are kept next to the config, not in the metadata cache.
+    assert os.path.exists(tmp_path / cosmos.CREDENTIALS_FILE_NAME)
+
+    cosmos.get_cosmos_api({**args, "refresh_credentials": True})
+    assert len(lookups) == 2
+
+    direct = cosmos.get_cosmos_api({"cosmos_endpoint": "https://x", "cosmos_key": "k"})
+    assert direct.server == "https://x" and len(lookups) == 2
+
+    monkeypatch.setenv(cosmos.COSMOS_KEY_ENV, "from-env")
+    direct = cosmos.get_cosmos_api({"cosmos_endpoint": "https://x"})
+    assert direct.key == "from-env" and len(lookups) == 2
+
+
+class FakePages:
+    def __init__(self, pages):
+        self.pages = pages
+        self.continuation_token = None
+
+    def __iter__(self):
+        for i, page in enumerate(self.pages):
+            self.continuation_token = str(i + 1)
+            yield iter(page)
+
+
+class FakeContainer:
+    def __init__(self):
+        self.kwargs = {}
+
+    def get_database_client(self, database_id):
+        assert database_id == "TES"
+        return self
+
+    def get_container_client(self, container_id):
+        assert container_id == "Tasks"
+        return self
+
+    def query_items(self, **kwargs):
+        self.kwargs = kwargs
+        return self
+
+    def by_page(self):
+        return FakePages([[{"name": "a"}, {"name": "b"}], [{"name": "c"}]])
+
+
+def test_query_is_paginated_and_projected():
+    api = cosmos.CosmosAPI.__new__(cosmos.CosmosAPI)
+    api.client = FakeContainer()
+
+    items = api.query(
+        where="WHERE STARTSWITH(r.description, @prefix)",
+        fields=cosmos.TABLE_FIELDS,
+        parameters=[{"name": "@prefix", "value": "abcd1234"}],
+        page_size=2,
+    )
+    assert [i["name"] for i in items] == ["a", "b", "c"]
+    assert api.client.kwargs["query"].startswith("SELECT r.name, r.state")
+    assert api.client.kwargs["max_item_count"] == 2
+
+
+def test_write_json_streams_items(tmp_path):
+    items = ({"name": n} for n in ["a", "b"])
+    with open(tmp_path / "out.json", mode="w", encoding="utf-8") as f:
+        cosmos.write_json(items, f)
+    with open(tmp_path / "out.json", encoding="utf-8") as f:
+        assert cosmos.json.load(f) == [{"name": "a"}, {"name": "b"}]
+
+    with open(tmp_path / "out.ndjson", mode="w", encoding="utf-8") as f:
+        cosmos.write_json([{"name": "a"}, {"name": "b"}], f, ndjson=True)
+    with open(tmp_path / "out.ndjson", encoding="utf-8") as f:
+        assert f.read() == '{"name": "a"}\n{"name": "b"}\n'
@@ -1,8 +1,9 @@
 import json
 
 import pytest
+from aiohttp import web
 
-from oliver.lib import api
+from oliver.lib import api, cache, retry
 
 
 def test_none_values_with_dict():
@@ -11,6 +12,20 @@ def test_none_values_with_dict():
     assert d == {"foo": "bar"}
 
 
+def test_metadata_projection():
+    assert api.metadata_projection(
+        ["labels", "submittedFiles.inputs", "calls.executionStatus", "calls.start"]
+    ) == ["executionStatus", "id", "labels", "start", "status", "submittedFiles"]
+
+
+def test_metadata_projection_drops_keys_covered_by_prefix():
+    assert api.metadata_projection(["calls.stdout", "calls.std"]) == [
+        "id",
+        "status",
+        "std",
+    ]
+
+
 @pytest.mark.asyncio
 async def test_get_workflows():
     cromwell = api.CromwellAPI(server="http://cromwell:8000", version="v1")
@@ -23,6 +38,31 @@ async def test_get_workflows():
     await cromwell.close()
 
 
+@pytest.mark.asyncio
+async def test_iter_workflows_query_pages_through_results():
+    cromwell = api.CromwellAPI(server="http://cromwell:8000", version="v1")
+    workflows = [{"id": str(i)} for i in range(5)]
+    requested_pages = []
+
+    async def fake_api_call(_route, params=None, **_kwargs):
+        page, page_size = params["page"], params["pageSize"]
+        requested_pages.append(page)
+        start = (page - 1) * page_size
+        return 200, {
+            "results": workflows[start : start + page_size],
+            "totalResultsCount": len(workflows),
+        }
+
+    # pylint: disable=W0212
+    cromwell._api_call = fake_api_call
+    results = [w async for w in cromwell.iter_workflows_query(page_size=2)]
+
+    assert results == workflows
+    assert sorted(requested_pages) == [1, 2, 3]
+
+    await cromwell.close()
+
+
 @pytest.mark.asyncio
 async def test_api_get():
     cromwell = api.CromwellAPI(server="http://httpbin:80", version="v1")
@@ -143,10 +183,28 @@ async def test_errors_on_post_workflows_no_workflow_source():
 
 
 @pytest.mark.asyncio
-async def test_post_workflows_batch_not_implemented():
-    with pytest.raises(NotImplementedError):
-        cromwell = api.CromwellAPI(server="http://cromwell:8000", version="v1")
-        await cromwell.post_workflows_batch()
+async def test_post_workflows_batch(cromwell_server):
+    received = {}
+
+    async def handler(request):
+        form = await request.post()
+        for key, value in form.items():
+            received[key] = value.file.read()
+        return web.json_response(
+            [{"id": "a", "status": "Submitted"}, {"id": "b", "status": "Submitted"}]
+        )
+
+    cromwell = await cromwell_server([web.post("/api/workflows/v1/batch", handler)])
+    results = await cromwell.post_workflows_batch(
+        workflowInputs=[{"x": 1}, {"x": 2}],
+        workflowSource=b"workflow w {}",
+        labels={"oliver-job-group": "cohort"},
+    )
+
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert json.loads(received["workflowInputs"]) == [{"x": 1}, {"x": 2}]
+    assert received["workflowSource"] == b"workflow w {}"
+    assert json.loads(received["labels"]) == {"oliver-job-group": "cohort"}
 
 
 @pytest.mark.asyncio
@@ -157,17 +215,21 @@ async def test_get_workflows_labels_not_implemented():
 
 
 @pytest.mark.asyncio
-async def test_patch_workflows_labels_not_implemented():
-    with pytest.raises(NotImplementedError):
-        cromwell = api.CromwellAPI(server="http://cromwell:8000", version="v1")
-        await cromwell.patch_workflows_labels()
-
-
-@pytest.mark.asyncio
-async def test_post_workflows_release_hold_not_implemented():
-    with pytest.raises(NotImplementedError):
-        cromwell = api.CromwellAPI(server="http://cromwell:8000", version="v1")
-        await cromwell.post_workflows_release_hold()
+async def test_patch_workflows_labels(tmp_path, cromwell_server):
+    async def handler(request):
+        labels = await request.json()
+        return web.json_response({"id": request.match_info["id"], "labels": labels})
+
+    metadata_cache = cache.MetadataCache(location=str(tmp_path / "cache"))
+    metadata_cache.put("labels", "http://localhost", "a", {"labels": {}})
+    cromwell = await cromwell_server(
+        [web.patch("/api/workflows/v1/{id}/labels", handler)],
+        metadata_cache=metadata_cache,
+    )
+    result = await cromwell.patch_workflows_labels("a", {"oliver-job-name": "x"})
+    assert result == {"id": "a", "labels": {"oliver-job-name": "x"}}
+    # the workflow's cached metadata has the old labels.
+    assert metadata_cache.get("labels") is None
 
 
 @pytest.mark.asyncio
@@ -203,3 +265,65 @@ async def test_get_workflows_backends_not_implemented():
     with pytest.raises(NotImplementedError):
         cromwell = api.CromwellAPI(server="http://cromwell:8000", version="v1")
         await cromwell.get_workflows_backends()
+
+
+@pytest.mark.asyncio
+async def test_create_session_applies_connector_options():
+    session = api.create_session(limit_per_host=4, keepalive_timeout=30)
+
+    assert session.connector.limit_per_host == 4
+    assert session.headers.get("Accept-Encoding") == "gzip, deflate"
+    # no overall limit, but a request can't hang forever.
+    assert session.timeout.total is None
+    assert session.timeout.connect == api.DEFAULT_CONNECT_TIMEOUT
+    assert session.timeout.sock_read == api.DEFAULT_READ_TIMEOUT
+
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_api_call_over_unix_socket(cromwell_server):
+    async def handler(_):
+        return web.json_response({"results": [{"id": "abc"}]})
+
+    cromwell = await cromwell_server([web.get("/api/workflows/v1/query", handler)])
+    assert await cromwell.get_workflows_query() == [{"id": "abc"}]
+
+
+@pytest.mark.asyncio
+async def test_api_call_retries_transient_errors(cromwell_server):
+    responses = [web.Response(status=503), web.json_response({"results": []})]
+
+    async def handler(_):
+        return responses.pop(0)
+
+    cromwell = await cromwell_server(
+        [web.get("/api/workflows/v1/query", handler)],
+        retry_policy=retry.RetryPolicy(base_delay=0.01),
+    )
+    assert await cromwell.get_workflows_query() == []
+    assert cromwell.retry_policy.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_count_workflows_query_and_release_hold(cromwell_server):
+    async def query(request):
+        assert request.query["pageSize"] == "1"
+        return web.json_response({"results": [{"id": "a"}], "totalResultsCount": 42})
+
+    async def release(request):
+        return web.json_response(
+            {"id": request.match_info["id"], "status": "Submitted"}
+        )
+
+    cromwell = await cromwell_server(
+        [
+            web.get("/api/workflows/v1/query", query),
+            web.post("/api/workflows/v1/{id}/releaseHold", release),
+        ]
+    )
+    assert await cromwell.count_workflows_query(statuses=["Running"]) == 42
+    assert await cromwell.post_workflows_release_hold("a") == {
+        "id": "a",
+        "status": "Submitted",
+    }
@@ -0,0 +1,68 @@
+from oliver.lib import cache
+
+
+def test_cache_roundtrip(tmp_path):
+    metadata_cache = cache.MetadataCache(location=str(tmp_path))
+    key = metadata_cache.key("http://cromwell:8000", "abc", {})
+
+    assert metadata_cache.get(key) is None
+    metadata_cache.put(key, "http://cromwell:8000", "abc", {"status": "Succeeded"})
+    assert metadata_cache.get(key) == {"status": "Succeeded"}
+
+    metadata_cache.close()
+
+
+def test_cache_key_includes_projection():
+    key = cache.MetadataCache.key
+
+    assert key("s", "abc", {"includeKey": ["a", "b"]}) == key(
+        "s", "abc", {"includeKey": ["b", "a"]}
+    )
+    assert key("s", "abc", {"includeKey": ["a"]}) != key("s", "abc", {})
+    assert key("s", "abc", {}) != key("t", "abc", {})
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    metadata_cache = cache.MetadataCache(location=str(tmp_path))
+    payload = {"status": "Succeeded", "data": "x" * 100}
+
+    metadata_cache.put("first", "s", "first", payload)
+    metadata_cache.put("second", "s", "second", payload)
+    metadata_cache.get("first")
+
+    # only room for a single entry.
+    metadata_cache.max_size = 50
+    metadata_cache.put("third", "s", "third", payload)
+
+    assert metadata_cache.get("second") is None
+    assert metadata_cache.get("first") is None
+    assert metadata_cache.get("third") == payload
+
+    metadata_cache.close()
+
+
+def test_cache_is_disabled_when_location_is_unusable(tmp_path):
+    location = tmp_path / "not-a-directory"
+    location.write_text("")
+    metadata_cache = cache.MetadataCache(location=str(location))
+
+    metadata_cache.put("key", "s", "abc", {"status": "Succeeded"})
+    assert metadata_cache.disabled
+    assert metadata_cache.get("key") is None
+
+    metadata_cache.close()
+
+
+def test_cache_invalidate_removes_every_projection(tmp_path):
+    metadata_cache = cache.MetadataCache(location=str(tmp_path))
+    metadata_cache.put("labels", "s", "abc", {"labels": {"a": "1"}})
+    metadata_cache.put("full", "s", "abc", {"status": "Succeeded"})
+    metadata_cache.put("other", "s", "def", {"status": "Succeeded"})
+
+    metadata_cache.invalidate("s", "abc")
+
+    assert metadata_cache.get("labels") is None
+    assert metadata_cache.get("full") is None
+    assert metadata_cache.get("other") == {"status": "Succeeded"}
+
+    metadata_cache.close()
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from oliver.lib import concurrency
+
+
+@pytest.mark.asyncio
+async def test_gather_with_limit_preserves_order():
+    async def double(x):
+        # finish in reverse order to ensure results are not returned in completion order.
+        await asyncio.sleep((10 - x) / 1000)
+        return x * 2
+
+    results = await concurrency.gather_with_limit(double, range(10), limit=4)
+    assert results == [x * 2 for x in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_gather_with_limit_respects_limit():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def track(_):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+
+    await concurrency.gather_with_limit(track, range(50), limit=5)
+    assert max_in_flight == 5
+
+
+@pytest.mark.asyncio
+async def test_gather_with_limit_empty():
+    async def identity(x):
+        return x
+
+    assert await concurrency.gather_with_limit(identity, []) == []
+
+
+@pytest.mark.asyncio
+async def test_iter_with_limit_yields_in_completion_order():
+    async def slow_first(x):
+        await asyncio.sleep((3 - x) / 100)
+        return x * 2
+
+    results = [r async for r in concurrency.iter_with_limit(slow_first, range(3))]
+    assert results == [(2, 4), (1, 2), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_iter_with_limit_raises_errors():
+    async def fail(x):
+        if x == 1:
+            raise ValueError("boom")
+        await asyncio.sleep(0.01)
+        return x
+
+    with pytest.raises(ValueError):
+        async for _ in concurrency.iter_with_limit(fail, range(3)):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_out_calls():
+    limiter = concurrency.RateLimiter(100)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*[limiter.wait() for _ in range(5)])
+    assert loop.time() - start >= 0.035
@@ -0,0 +1,15 @@
+import json
+
+from oliver.lib import config
+
+
+def test_secrets_are_not_stored_in_config(tmp_path):
+    path = str(tmp_path / "oliver_config")
+    config.write_config({"cromwell_server": "http://x", "cosmos_key": "k"}, path)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"cromwell_server": "http://x"}
+
+    # a key written by an older version of oliver is ignored.
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump({"cromwell_server": "http://x", "cosmos_key": "k"}, f)
+    assert config.read_config(path) == {"cromwell_server": "http://x"}
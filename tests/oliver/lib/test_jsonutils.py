@@ -0,0 +1,19 @@
+from oliver.lib import jsonutils
+
+DOCUMENT = b"""{
+    "id": "abc",
+    "status": "Succeeded",
+    "calls": {"wf.task": [{"shardIndex": -1, "attempt": 1, "ratio": 0.5}]},
+    "labels": {"oliver-job-name": "foo"}
+}"""
+
+
+def test_loads():
+    assert jsonutils.loads(DOCUMENT)["calls"]["wf.task"][0]["ratio"] == 0.5
+
+
+def test_loads_keys():
+    assert jsonutils.loads_keys(DOCUMENT, ["status", "calls", "missing"]) == {
+        "status": "Succeeded",
+        "calls": {"wf.task": [{"shardIndex": -1, "attempt": 1, "ratio": 0.5}]},
+    }
@@ -0,0 +1,36 @@
+import pytest
+
+from oliver.lib import parsing
+
+
+def test_parse_manifest(tmp_path):
+    manifest = tmp_path / "samples.tsv"
+    manifest.write_text(
+        "job_name\tw.sample\tw.intervals\t%cohort\t@read_from_cache\n"
+        'a\tA.bam\t["chr1", "chr2"]\tone\tfalse\n'
+        "b\tB.bam\t\tone\t\n"
+    )
+
+    rows = parsing.parse_manifest(str(manifest))
+
+    assert rows == [
+        {
+            "inputs": {"w.sample": "A.bam", "w.intervals": ["chr1", "chr2"]},
+            "options": {"read_from_cache": "false"},
+            "labels": {"oliver-job-name": "a", "cohort": "one"},
+        },
+        {
+            "inputs": {"w.sample": "B.bam"},
+            "options": {},
+            "labels": {"oliver-job-name": "b", "cohort": "one"},
+        },
+    ]
+
+
+@pytest.mark.parametrize("row", ["A.bam\tone\textra\n", "A.bam\n"])
+def test_parse_manifest_rejects_rows_not_matching_header(tmp_path, row):
+    manifest = tmp_path / "samples.tsv"
+    manifest.write_text("w.sample\t%cohort\n" + row)
+
+    with pytest.raises(SystemExit):
+        parsing.parse_manifest(str(manifest))
@@ -0,0 +1,47 @@
+import email.utils
+import time
+
+import pytest
+
+from oliver.lib import retry
+
+
+def test_parse_retry_after_seconds():
+    assert retry.parse_retry_after("3") == 3.0
+    assert retry.parse_retry_after("-1") == 0.0
+
+
+def test_parse_retry_after_http_date():
+    when = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 50 < retry.parse_retry_after(when) <= 60
+
+
+def test_parse_retry_after_invalid():
+    assert retry.parse_retry_after(None) is None
+    assert retry.parse_retry_after("soon") is None
+
+
+def test_delay_is_bounded():
+    policy = retry.RetryPolicy(base_delay=1, max_delay=4)
+    for attempt in range(10):
+        assert 0 <= policy.delay(attempt) <= min(4, 2**attempt)
+
+
+def test_delay_honours_retry_after():
+    assert retry.RetryPolicy().delay(0, "7") == 7.0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_after_failures():
+    breaker = retry.CircuitBreaker(window=4, threshold=0.75, cooldown=0.05)
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.trips == 0
+
+    breaker.record(False)
+    assert breaker.trips == 1
+
+    start = time.monotonic()
+    await breaker.wait()
+    assert time.monotonic() - start >= 0.04
@@ -0,0 +1,53 @@
+import pytest
+
+from oliver.lib import scheduling
+
+
+class FakeCromwell:
+    def __init__(self, active):
+        self.active = active
+        self.polls = 0
+        self.released = []
+
+    async def count_workflows_query(self, statuses=None, **kwargs):
+        self.polls += 1
+        assert statuses == scheduling.ACTIVE_STATUSES
+        count = self.active
+        # the server finishes some work between polls.
+        self.active = max(self.active - 2, 0)
+        return count
+
+    async def post_workflows_release_hold(self, workflow_id):
+        self.released.append(workflow_id)
+        return {"id": workflow_id, "status": "Submitted"}
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_below_high_water_mark():
+    cromwell = FakeCromwell(active=5)
+    scheduler = scheduling.BackpressureScheduler(cromwell, 4, poll_interval=0)
+
+    await scheduler.acquire()
+    # 5 active -> wait; 3 active -> room for one more.
+    assert cromwell.polls == 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_counts_released_workflows_between_polls():
+    cromwell = FakeCromwell(active=0)
+    scheduler = scheduling.BackpressureScheduler(cromwell, 2, poll_interval=60)
+
+    await scheduler.acquire()
+    await scheduler.acquire()
+    assert cromwell.polls == 1
+    assert scheduler._active == 2  # pylint: disable=protected-access
+
+
+@pytest.mark.asyncio
+async def test_release_holds():
+    cromwell = FakeCromwell(active=0)
+    scheduler = scheduling.BackpressureScheduler(cromwell, 10, poll_interval=0)
+
+    results = await scheduler.release_holds(["a", "b", "c"])
+    assert [r["id"] for r in results] == ["a", "b", "c"]
+    assert sorted(cromwell.released) == ["a", "b", "c"]
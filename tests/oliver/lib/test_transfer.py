@@ -0,0 +1,113 @@
+import csv
+import os
+
+from oliver.lib import transfer
+
+
+def make_file(path, content=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_copy_files_copies_then_skips(tmp_path):
+    source = make_file(tmp_path / "src" / "a.bam", b"x" * 100000)
+    destination = str(tmp_path / "dest" / "a.bam")
+    manifest = str(tmp_path / "dest" / transfer.MANIFEST_NAME)
+
+    results = transfer.copy_files(
+        [(source, destination)], manifest=transfer.Manifest.load(manifest)
+    )
+    assert results[0]["status"] == "copied"
+    with open(destination, "rb") as f:
+        assert f.read() == b"x" * 100000
+    assert not os.path.exists(destination + transfer.PARTIAL_SUFFIX)
+
+    results = transfer.copy_files([(source, destination)])
+    assert results[0]["status"] == "skipped"
+
+    with open(manifest, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f, delimiter="\t"))
+    assert rows[0]["source"] == source
+    assert rows[0]["status"] == "copied"
+
+
+def test_manifest_resumes_and_detects_changes(tmp_path):
+    a = make_file(tmp_path / "src" / "a.bam")
+    b = make_file(tmp_path / "src" / "b.bam")
+    dest = tmp_path / "dest"
+    location = str(dest / transfer.MANIFEST_NAME)
+
+    # an interrupted run leaves only the journal behind.
+    manifest = transfer.Manifest.load(location)
+    results = transfer.copy_files([(a, str(dest / "a.bam"))], manifest=manifest)
+    with open(location, mode="a", encoding="utf-8") as f:
+        f.write(f"{b}\t{dest / 'b.bam'}\t4\tmtime:0\tpending\t\n")
+
+    manifest = transfer.Manifest.load(location)
+    assert manifest.entries[str(dest / "b.bam")]["status"] == "pending"
+    # the copy doesn't keep the source's mtime, so only the manifest knows
+    # that it is complete.
+    os.utime(dest / "a.bam", (0, 0))
+    assert transfer.is_transferred(a, str(dest / "a.bam"), manifest)
+    assert not transfer.is_transferred(b, str(dest / "b.bam"), manifest)
+
+    results = transfer.copy_files(
+        [(a, str(dest / "a.bam")), (b, str(dest / "b.bam"))], manifest=manifest
+    )
+    assert [r["status"] for r in results] == ["skipped", "copied"]
+
+    # a changed source is copied again.
+    os.utime(a, (1, 1))
+    assert not transfer.Manifest.load(location).is_complete(
+        a, str(dest / "a.bam"), *transfer.fingerprint(a)
+    )
+
+    with open(location, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f, delimiter="\t"))
+    assert len(rows) == 2
+
+
+def test_copy_files_hardlink(tmp_path):
+    source = make_file(tmp_path / "src" / "a.vcf")
+    destination = str(tmp_path / "dest" / "a.vcf")
+
+    transfer.copy_files([(source, destination)], mode="hardlink")
+    assert os.stat(source).st_ino == os.stat(destination).st_ino
+
+
+def test_copy_files_reflink_falls_back_to_copy(tmp_path):
+    source = make_file(tmp_path / "src" / "a.vcf")
+    destination = str(tmp_path / "dest" / "a.vcf")
+
+    results = transfer.copy_files([(source, destination)], mode="reflink")
+    assert results[0]["status"] == "copied"
+    with open(destination, "rb") as f:
+        assert f.read() == b"data"
+
+
+def test_copy_files_reports_failures(tmp_path):
+    results = transfer.copy_files(
+        [(str(tmp_path / "missing"), str(tmp_path / "dest" / "missing"))]
+    )
+    assert results[0]["status"] == "failed"
+    assert transfer.summarize(results)["Failed"] == 1
+
+
+def test_copy_files_rejects_shared_destinations(tmp_path):
+    shard_0 = make_file(tmp_path / "src" / "shard-0" / "out.bam", b"0")
+    shard_1 = make_file(tmp_path / "src" / "shard-1" / "out.bam", b"1")
+    other = make_file(tmp_path / "src" / "shard-1" / "other.bam")
+    pairs = [
+        (path, str(tmp_path / "dest" / os.path.basename(path)))
+        for path in (shard_0, shard_1, other)
+    ]
+
+    assert transfer.duplicate_destinations(pairs) == {
+        str(tmp_path / "dest" / "out.bam"): [shard_0, shard_1]
+    }
+
+    results = transfer.copy_files(pairs)
+    assert [r["status"] for r in results] == ["failed", "failed", "copied"]
+    assert "2 files would be copied to" in results[0]["error"]
+    assert not os.path.exists(tmp_path / "dest" / "out.bam")
@@ -0,0 +1,158 @@
+import pytest
+
+from aiohttp import web
+
+from oliver.lib import workflows
+
+
+class FakeCromwell:
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    async def iter_workflows_query(self, statuses=None, submission=None, **kwargs):
+        self.queries.append({"statuses": statuses, "submission": submission, **kwargs})
+        # cromwell returns the most recent workflows first.
+        for w in reversed(self.results):
+            if (not statuses or w["status"] in statuses) and (
+                not submission or w["submission"] >= submission
+            ):
+                yield dict(w)
+
+    async def post_workflows_abort(self, workflow_id, fatal=True):
+        for w in self.results:
+            if w["id"] == workflow_id and w["status"] in ("Running", "Submitted"):
+                return {"id": workflow_id, "status": "Aborting"}
+        return {"status": "error", "message": f"Couldn't abort {workflow_id}."}
+
+
+WORKFLOWS = [
+    {"id": "a", "status": "Succeeded", "submission": "2020-01-01T00:00:00.000Z"},
+    {"id": "b", "status": "Failed", "submission": "2020-01-01T00:01:00.000Z"},
+    {"id": "c", "status": "Failed", "submission": "2020-01-01T01:00:00.000Z"},
+    {"id": "d", "status": "Running", "submission": "2020-01-01T01:01:00.000Z"},
+]
+
+
+@pytest.mark.asyncio
+async def test_get_workflows_sends_statuses_to_server():
+    cromwell = FakeCromwell(WORKFLOWS)
+    results = await workflows.get_workflows(
+        cromwell, opt_into_reporting_failed_jobs=True
+    )
+
+    assert [w["id"] for w in results] == ["b", "c"]
+    assert len(cromwell.queries) == 1
+    assert cromwell.queries[0]["statuses"] == ["Failed"]
+
+
+@pytest.mark.asyncio
+async def test_get_workflows_batches_before_filtering_statuses():
+    cromwell = FakeCromwell(WORKFLOWS)
+    results = await workflows.get_workflows(
+        cromwell,
+        batches=[1],
+        batch_interval_mins=5,
+        opt_into_reporting_failed_jobs=True,
+    )
+
+    assert [(w["id"], w["batch"], w["status"]) for w in results] == [("c", 1, "Failed")]
+    assert [q["statuses"] for q in cromwell.queries] == [None, ["Failed"]]
+    assert cromwell.queries[1]["submission"] == "2020-01-01T01:00:00.000Z"
+
+
+@pytest.mark.asyncio
+async def test_get_workflows_all_batches_uses_single_query():
+    cromwell = FakeCromwell(WORKFLOWS)
+    results = await workflows.get_workflows(
+        cromwell, batches=True, batch_interval_mins=5
+    )
+
+    assert [(w["id"], w["batch"]) for w in results] == [
+        ("a", 0),
+        ("b", 0),
+        ("c", 1),
+        ("d", 1),
+    ]
+    assert all("status" in w for w in results)
+    assert len(cromwell.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_abort_workflows_reports_each_result():
+    cromwell = FakeCromwell(WORKFLOWS)
+    streamed = []
+    results = await workflows.abort_workflows(
+        cromwell, ["d", "a"], max_concurrent_requests=2, on_result=streamed.append
+    )
+
+    assert results == [
+        {"Workflow ID": "d", "Status": "Aborting"},
+        {"Workflow ID": "a", "Status": "error", "Message": "Couldn't abort a."},
+    ]
+    assert sorted(r["Workflow ID"] for r in streamed) == ["a", "d"]
+
+
+@pytest.mark.asyncio
+async def test_abort_workflows_continues_past_unknown_workflow(cromwell_server):
+    async def abort(request):
+        if request.match_info["id"] == "unknown":
+            return web.json_response(
+                {"status": "fail", "message": "Unrecognized workflow ID: unknown"},
+                status=404,
+            )
+        return web.json_response({"id": request.match_info["id"], "status": "Aborting"})
+
+    cromwell = await cromwell_server([web.post("/api/workflows/v1/{id}/abort", abort)])
+    results = await workflows.abort_workflows(cromwell, ["a", "unknown", "b"])
+
+    assert [(r["Workflow ID"], r["Status"]) for r in results] == [
+        ("a", "Aborting"),
+        ("unknown", "error"),
+        ("b", "Aborting"),
+    ]
+    assert "Unrecognized workflow ID" in results[1]["Message"]
+
+
+class FakeMetadataCromwell:
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.requests = []
+
+    async def get_workflows_metadata(self, workflow_id, fields=None):
+        self.requests.append((workflow_id, fields))
+        return self.metadata[workflow_id]
+
+
+@pytest.mark.asyncio
+async def test_iter_calls_walks_sub_workflows_once():
+    cromwell = FakeMetadataCromwell(
+        {
+            "root": {
+                "calls": {
+                    "scatter": [{"subWorkflowId": "sub"}, {"subWorkflowId": "sub"}],
+                    "task": [{"stdout": "root.out"}],
+                }
+            },
+            "sub": {"calls": {"inner": [{"stdout": "sub.out"}]}},
+        }
+    )
+
+    calls = [
+        (workflow_id, name, c.get("stdout"))
+        async for workflow_id, name, c in workflows.iter_calls(
+            cromwell, "root", fields=["calls.stdout"]
+        )
+    ]
+
+    assert sorted(calls, key=str) == sorted(
+        [
+            ("root", "scatter", None),
+            ("root", "scatter", None),
+            ("root", "task", "root.out"),
+            ("sub", "inner", "sub.out"),
+        ],
+        key=str,
+    )
+    assert [r[0] for r in cromwell.requests] == ["root", "sub"]
+    assert cromwell.requests[0][1] == ["calls.stdout", "calls.subWorkflowId"]
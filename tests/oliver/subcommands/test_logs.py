@@ -0,0 +1,39 @@
+import pytest
+
+from oliver.lib import workflows
+from oliver.subcommands import logs
+
+# calls in the order they might arrive from concurrent metadata requests.
+CALLS = [
+    ("sub", "w.sub.b", {"attempt": 1, "shardIndex": -1}),
+    ("wf", "w.a", {"attempt": 2, "shardIndex": 1}),
+    ("wf", "w.a", {"attempt": 1, "shardIndex": 10}),
+    ("wf", "w.a", {"attempt": 1, "shardIndex": 1}),
+    ("wf", "w.sub", {"subWorkflowId": "sub"}),
+    ("wf", "w.a", {"attempt": 1, "shardIndex": 2}),
+]
+
+
+@pytest.mark.asyncio
+async def test_get_logs_sorts_by_call_shard_and_attempt(monkeypatch):
+    async def iter_calls(*_, **__):
+        for call in CALLS:
+            yield call
+
+    monkeypatch.setattr(workflows, "iter_calls", iter_calls)
+    results = await logs.get_logs(None, "wf")
+
+    assert [
+        (r["Call Name"], r["Shard"], r["Attempt"], r["Log Name"]) for r in results
+    ] == [
+        ("w.a", 1, 1, "stdout"),
+        ("w.a", 1, 1, "stderr"),
+        ("w.a", 1, 2, "stdout"),
+        ("w.a", 1, 2, "stderr"),
+        ("w.a", 2, 1, "stdout"),
+        ("w.a", 2, 1, "stderr"),
+        ("w.a", 10, 1, "stdout"),
+        ("w.a", 10, 1, "stderr"),
+        ("w.sub.b", -1, 1, "stdout"),
+        ("w.sub.b", -1, 1, "stderr"),
+    ]
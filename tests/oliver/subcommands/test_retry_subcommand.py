@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from aiohttp import web
+
+from oliver.lib import workflows
+from oliver.subcommands import retry
+
+WORKFLOW_IDS = ["wf-0", "wf-1", "wf-2", "wf-3"]
+
+
+def make_args(**kwargs):
+    args = {
+        "workflow": "wf",
+        "all": False,
+        "dry_run": False,
+        "yes": True,
+        "workflowInputs": [],
+        "submissions_per_second": 0,
+        "max_concurrent_requests": 2,
+    }
+    args.update(kwargs)
+    return args
+
+
+@pytest.mark.asyncio
+async def test_retry_continues_past_rejected_submission(
+    monkeypatch, capsys, cromwell_server
+):
+    async def metadata(request):
+        inputs = {"w.x": request.match_info["id"]}
+        return web.json_response(
+            {
+                "id": request.match_info["id"],
+                "status": "Failed",
+                "submittedFiles": {
+                    "workflowUrl": "https://example.com/w.wdl",
+                    "inputs": json.dumps(inputs),
+                    "options": "{}",
+                    "labels": "{}",
+                },
+            }
+        )
+
+    async def submit(request):
+        form = await request.post()
+        inputs = json.loads(form["workflowInputs"].file.read())
+        if inputs["w.x"] == "wf-2":
+            return web.json_response(
+                {"status": "fail", "message": "Invalid inputs"}, status=400
+            )
+        return web.json_response({"id": "new-" + inputs["w.x"], "status": "Submitted"})
+
+    async def get_workflows(*_, **__):
+        return [{"id": i} for i in WORKFLOW_IDS]
+
+    monkeypatch.setattr(workflows, "get_workflows", get_workflows)
+    cromwell = await cromwell_server(
+        [
+            web.get("/api/workflows/v1/{id}/metadata", metadata),
+            web.post("/api/workflows/v1", submit),
+        ]
+    )
+
+    with pytest.raises(SystemExit):
+        await retry.call(make_args(), cromwell)
+    out = capsys.readouterr().out
+    for i in ["wf-0", "wf-1", "wf-3"]:
+        assert f"{i} -> new-{i} (Submitted)" in out
+    assert "wf-2 ->" not in out
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from aiohttp import web
+
+from oliver.subcommands import submit
+
+
+@pytest.mark.asyncio
+async def test_submit_manifest_reports_rejected_rows(tmp_path, capsys, cromwell_server):
+    batches = []
+
+    def rejected(inputs):
+        return inputs["w.sample"] == "bad.bam"
+
+    async def post_batch(request):
+        form = await request.post()
+        inputs = json.loads(form["workflowInputs"].file.read())
+        batches.append([i["w.sample"] for i in inputs])
+        if any(rejected(i) for i in inputs):
+            return web.json_response(
+                {"status": "fail", "message": "Invalid inputs"}, status=400
+            )
+        return web.json_response(
+            [{"id": i["w.sample"], "status": "Submitted"} for i in inputs]
+        )
+
+    async def post_one(request):
+        form = await request.post()
+        inputs = json.loads(form["workflowInputs"].file.read())
+        if rejected(inputs):
+            return web.json_response(
+                {"status": "fail", "message": "Invalid inputs"}, status=400
+            )
+        return web.json_response({"id": inputs["w.sample"], "status": "Submitted"})
+
+    async def patch_labels(request):
+        if request.match_info["id"] == "c.bam":
+            return web.json_response(
+                {"status": "fail", "message": "Unknown workflow"}, status=404
+            )
+        return web.json_response({"id": request.match_info["id"]})
+
+    cromwell = await cromwell_server(
+        [
+            web.post("/api/workflows/v1/batch", post_batch),
+            web.post("/api/workflows/v1", post_one),
+            web.patch("/api/workflows/v1/{id}/labels", patch_labels),
+        ]
+    )
+    manifest = tmp_path / "samples.tsv"
+    manifest.write_text(
+        "job_name\tw.sample\n" "a\ta.bam\n" "b\tbad.bam\n" "c\tc.bam\n" "d\td.bam\n"
+    )
+    args = {
+        "workflow": "https://example.com/w.wdl",
+        "manifest": str(manifest),
+        "workflowInputs": [],
+        "batch_size": 2,
+        "submissions_per_second": 0,
+        "grid_style": "plain",
+    }
+
+    with pytest.raises(SystemExit):
+        await submit.submit_manifest(args, cromwell, [])
+    out = capsys.readouterr().out
+    assert sorted(batches) == [["a.bam", "bad.bam"], ["c.bam", "d.bam"]]
+    # every row is reported, including the one rejected and the one whose job
+    # name could not be added.
+    rows = [line.split() for line in out.splitlines()[1:]]
+    assert [r[0] for r in rows] == ["1", "2", "3", "4"]
+    assert "a.bam" in rows[0] and "d.bam" in rows[3]
+    assert "error" in rows[1]
+    assert "labels" in rows[2]
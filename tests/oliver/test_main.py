@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+from oliver import __main__ as oliver_main, subcommands
+
+
+@pytest.mark.parametrize("name", list(subcommands.SUBCOMMANDS))
+def test_lazy_registration_matches_subcommand(name):
+    # the placeholder name, aliases and help text must match what the
+    # subcommand registers itself, or `oliver --help` would be wrong.
+    lazy = oliver_main.build_parser().format_help()
+    assert oliver_main.build_parser(name).format_help() == lazy
+
+
+def test_merge_config_keeps_explicit_values():
+    args = oliver_main.parse_args(["--max-retries", "0", "st"])
+    oliver_main.merge_config(
+        args,
+        {
+            "max_retries": 5,
+            "read_timeout": 60.0,
+            "no_cache": True,
+            "cromwell_server": "x",
+        },
+    )
+    assert args["max_retries"] == 0
+    assert args["read_timeout"] == 60.0
+    assert args["no_cache"] is True
+    assert args["cromwell_server"] == "x"
+
+
+def test_parse_args_resolves_aliases():
+    args = oliver_main.parse_args(["st", "-a"])
+    assert args["subcommand"] == "status"
+    assert args["show_aborted_jobs"]
+
+
+def test_parse_args_only_imports_selected_subcommand():
+    script = (
+        "import sys; from oliver.__main__ import parse_args; "
+        "parse_args(['config', 'get', 'cromwell_server']); "
+        "print(sorted(m for m in ('boto3', 'azure.cosmos', 'pendulum', 'tabulate', "
+        "'oliver.subcommands.status') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"